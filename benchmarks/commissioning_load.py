@@ -0,0 +1,215 @@
+"""
+End-to-end commissioning throughput against a BluebirdCommissioner running over a fake BlueZ.
+
+A private dbus-daemon is started and FakeBluez claims org.bluez on it. The commissioner then
+runs in a child process on the same bus. Simulated centrals each read the public key, write a
+TLV payload and poll their own status every --poll seconds until it is JOINED or FAILED, with
+--concurrency of them in flight at once. The commissioner admits --max-in-flight payloads at once
+(by default as many as there are centrals) and keeps a session for every central in flight.
+
+The report gives sessions/sec and end-to-end latency percentiles of the sessions that reached a
+final status, the final status of every central, client-side errors, and the commissioner's own
+admission and offload stats, so shed payloads show up next to the throughput they cost.
+Requires dbus-python, PyGObject and dbus-daemon.
+
+    python benchmarks/commissioning_load.py --sessions 2000 --concurrency 32 --output pi4-load.json
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+# Imported first: common puts the repo root on sys.path for the bluebird imports below.
+from common import emit, platform_info, summarize
+
+import dbus
+import dbus.bus
+from dbus.mainloop.glib import DBusGMainLoop
+from gi.repository import GLib
+
+from bluebird import ClientExchangeHandler, CurveType
+from bluebird.ble.fake import FakeBluez, PrivateBus
+from bluebird.ble.ble import CHARACTERISTIC_UUID_PAYLOAD, CHARACTERISTIC_UUID_PUBLIC_KEY, CHARACTERISTIC_UUID_STATUS
+from bluebird.ble.ble import CHARACTERISTIC_UUID_STATS
+from bluebird.ble.session import CommissioningStatus
+from bluebird.util import CommissioningFields
+
+
+# IDLE after the write was answered means the commissioner no longer holds a status for the central.
+FINAL_STATUSES = (CommissioningStatus.JOINED.value, CommissioningStatus.FAILED.value, CommissioningStatus.IDLE.value)
+
+
+def serve(address: str, curve_type: CurveType, max_in_flight: int, max_sessions: int) -> int:
+    from bluebird.ble import BluebirdCommissioner
+    from bluebird.ble.session import SessionTable
+    from bluebird.server import AdmissionControl, ServerExchangeHandler, ReplayGuard
+
+    DBusGMainLoop(set_as_default=True)
+    commissioner = BluebirdCommissioner(
+        bus=dbus.bus.BusConnection(address),
+        exchange_handler=ServerExchangeHandler(curve_type, replay_guard=ReplayGuard()),
+        admission=AdmissionControl(curve_type, max_in_flight=max_in_flight),
+    )
+    commissioner.sessions = SessionTable(max_sessions=max_sessions)
+    status = commissioner._commissioning_service.status_characteristic
+    status.MAX_DEVICES = max(status.MAX_DEVICES, 2 * max_sessions)
+    # A loop of our own, so SIGTERM can stop it.
+    loop = GLib.MainLoop()
+    GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGTERM, loop.quit)
+    commissioner.register()
+    loop.run()
+    commissioner.unregister()
+    return 0
+
+
+class LoadGenerator:
+    def __init__(self, bluez: FakeBluez, curve_type: CurveType, sessions: int, concurrency: int, poll: float, loop):
+        self.bluez = bluez
+        self.client = ClientExchangeHandler(curve_type)
+        self.fields = CommissioningFields("bench-network", "bench-password")
+        self.sessions = sessions
+        self.concurrency = concurrency
+        self.poll_ms = max(1, int(poll * 1000))
+        self.loop = loop
+        self.started = 0
+        self.finished = 0
+        self.latencies = []
+        self.statuses = {}
+        self.errors = {}
+        self.server_stats = None
+        self.start_time = None
+        self.elapsed = None
+
+    def run(self):
+        self.start_time = time.perf_counter()
+        for _ in range(min(self.concurrency, self.sessions)):
+            self._start_central()
+
+    def _start_central(self):
+        index = self.started
+        self.started += 1
+        device = self.bluez.device_path(index + 1)
+        t0 = time.perf_counter()
+
+        def failed(stage):
+            def handler(error):
+                name = f"{stage}: {error.get_dbus_name()}"
+                self.errors[name] = self.errors.get(name, 0) + 1
+                self._finish()
+            return handler
+
+        def read_status():
+            self.bluez.read_value(CHARACTERISTIC_UUID_STATUS, device, status_read, failed("status"))
+            return False
+
+        def status_read(value):
+            # The write is answered once the payload is decrypted; joining is reported afterwards.
+            status = value[0] if value else None
+            if status not in FINAL_STATUSES:
+                GLib.timeout_add(self.poll_ms, read_status)
+                return
+            self.latencies.append(time.perf_counter() - t0)
+            name = CommissioningStatus(status).name
+            self.statuses[name] = self.statuses.get(name, 0) + 1
+            self._finish()
+
+        def written():
+            read_status()
+
+        def key_read(public_key):
+            payload = self.client.create_encrypted_fields_payload(self.fields, bytes(public_key))
+            self.bluez.write_value(CHARACTERISTIC_UUID_PAYLOAD, payload, device, written, failed("write"))
+
+        self.bluez.read_value(CHARACTERISTIC_UUID_PUBLIC_KEY, device, key_read, failed("key"))
+
+    def _finish(self):
+        self.finished += 1
+        if self.started < self.sessions:
+            self._start_central()
+        elif self.finished == self.sessions:
+            self.elapsed = time.perf_counter() - self.start_time
+            self._read_server_stats()
+
+    def _read_server_stats(self):
+        def stats_read(value):
+            self.server_stats = json.loads(bytes(value))
+            self.loop.quit()
+
+        def stats_failed(error):
+            sys.stderr.write(f"Could not read the commissioner's stats: {error.get_dbus_name()}\n")
+            self.loop.quit()
+
+        device = self.bluez.device_path(self.sessions + 1)
+        self.bluez.read_value(CHARACTERISTIC_UUID_STATS, device, stats_read, stats_failed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Commissioning sessions/sec over a fake BlueZ")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16, help="Centrals in flight at once")
+    parser.add_argument("--max-in-flight", type=int, help="Payloads the commissioner decrypts at once, "
+                        "AdmissionControl's max_in_flight (default: --concurrency)")
+    parser.add_argument("--poll", type=float, default=0.01, help="Seconds between status reads while joining")
+    parser.add_argument("--curve", choices=[c.value for c in CurveType], default=CurveType.CURVE25519.value)
+    parser.add_argument("--timeout", type=int, default=300, help="Seconds before the run is abandoned")
+    parser.add_argument("--output", default="-", help="JSON output file, - for stdout")
+    parser.add_argument("--serve", metavar="ADDRESS", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    curve_type = CurveType(args.curve)
+    max_in_flight = args.max_in_flight or args.concurrency
+    if args.serve:
+        return serve(args.serve, curve_type, max_in_flight, args.concurrency)
+
+    DBusGMainLoop(set_as_default=True)
+    loop = GLib.MainLoop()
+    with PrivateBus() as address:
+        bluez = FakeBluez(dbus.bus.BusConnection(address))
+        generator = LoadGenerator(bluez, curve_type, args.sessions, args.concurrency, args.poll, loop)
+        bluez.adapter.on_application = lambda app: generator.run()
+        child = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--serve", address, "--curve", args.curve,
+             "--concurrency", str(args.concurrency), "--max-in-flight", str(max_in_flight)],
+            env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)),
+        )
+        GLib.timeout_add_seconds(args.timeout, loop.quit)
+        try:
+            loop.run()
+        finally:
+            child.terminate()
+            child.wait()
+        if generator.start_time is None:
+            sys.stderr.write("Commissioner did not register an application\n")
+            return 1
+        if generator.elapsed is None:
+            sys.stderr.write(f"Timed out after {generator.finished} of {args.sessions} sessions\n")
+            generator.elapsed = time.perf_counter() - generator.start_time
+
+    report = {
+        "benchmark": "commissioning_load",
+        "platform": platform_info(),
+        "config": {
+            "sessions": args.sessions,
+            "concurrency": args.concurrency,
+            "max_in_flight": max_in_flight,
+            "poll_interval_s": args.poll,
+            "curve": args.curve,
+        },
+        "completed": len(generator.latencies),
+        "sessions_per_sec": len(generator.latencies) / generator.elapsed if generator.elapsed else 0.0,
+        "latency": summarize(generator.latencies),
+        "statuses": generator.statuses,
+        "errors": generator.errors,
+        "admission": (generator.server_stats or {}).get("admission"),
+        "offload": (generator.server_stats or {}).get("offload"),
+        "join_offload": (generator.server_stats or {}).get("join_offload"),
+        "duration_s": generator.elapsed,
+    }
+    emit(report, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Shared helpers for the bluebird benchmark scripts.
+"""
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+# The scripts are run straight from a source checkout, so the bluebird package next to this
+# directory is made importable without installing it or setting PYTHONPATH. Each script imports
+# this module before anything from bluebird.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list of samples.
+    """
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, min(len(sorted_samples) - 1, int(round(pct / 100.0 * len(sorted_samples))) - 1))
+    return sorted_samples[rank]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    Reduces per-operation latencies in seconds to ops/sec and p50/p99/max in microseconds.
+    """
+    samples = sorted(samples)
+    total = sum(samples)
+    return {
+        "iterations": len(samples),
+        "ops_per_sec": len(samples) / total if total else 0.0,
+        "p50_us": percentile(samples, 50) * 1e6,
+        "p99_us": percentile(samples, 99) * 1e6,
+        "max_us": samples[-1] * 1e6 if samples else 0.0,
+    }
+
+
+def measure(fn: Callable[[], Any], iterations: int, warmup: int = 10, allocations: bool = True) -> Dict[str, float]:
+    """
+    Times fn once per iteration and, in a separate pass so tracing does not skew latency,
+    records the peak Python heap growth of a single call. Allocations made inside OpenSSL
+    are not visible to tracemalloc.
+
+    Returns:
+        Dict[str, float]: The summarize() fields plus "alloc_peak_bytes".
+    """
+    for _ in range(warmup):
+        fn()
+
+    clock = time.perf_counter
+    samples = []
+    for _ in range(iterations):
+        start = clock()
+        fn()
+        samples.append(clock() - start)
+    result = summarize(samples)
+
+    if allocations:
+        peaks = []
+        tracemalloc.start()
+        try:
+            for _ in range(max(1, min(iterations, 200))):
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                fn()
+                peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        finally:
+            tracemalloc.stop()
+        result["alloc_peak_bytes"] = sum(peaks) / len(peaks)
+
+    return result
+
+
+def platform_info() -> Dict[str, str]:
+    """
+    Identifies the machine a result file came from so gateways can be compared.
+    """
+    info = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "release": platform.release(),
+        "processor": platform.processor(),
+        "node": platform.node(),
+    }
+    try:
+        import cryptography
+        info["cryptography"] = cryptography.__version__
+    except ImportError:
+        pass
+    try:
+        with open("/proc/device-tree/model") as f:
+            info["model"] = f.read().strip("\x00\n")
+    except OSError:
+        pass
+    return info
+
+
+def emit(report: Dict[str, Any], output: Optional[str]) -> None:
+    """
+    Writes the report as JSON to output, or to stdout when output is None or "-".
+    """
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if output in (None, "-"):
+        sys.stdout.write(text + "\n")
+    else:
+        with open(output, "w") as f:
+            f.write(text + "\n")
@@ -0,0 +1,94 @@
+"""
+Benchmarks the bluebird crypto hot paths per curve and per message size.
+
+Stages: keygen, ECDH, HKDF, AES-GCM encrypt/decrypt, the client payload, the server
+decrypt_payload and the full round trip. Results are written as JSON.
+
+    python benchmarks/crypto_bench.py --iterations 2000 --output pi4.json
+"""
+import argparse
+import os
+import sys
+import time
+
+# Imported first: common puts the repo root on sys.path for the bluebird imports below.
+from common import emit, measure, platform_info
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from bluebird import ClientExchangeHandler, ServerExchangeHandler, CurveType
+from bluebird.server.crypto import HKDF_INFO
+
+DEFAULT_SIZES = [16, 64, 256]
+
+
+def hkdf(shared_key: bytes) -> bytes:
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=HKDF_INFO).derive(shared_key)
+
+
+def bench_curve(curve_type: CurveType, sizes, iterations: int, warmup: int):
+    server = ServerExchangeHandler(curve_type)
+    client = ClientExchangeHandler(curve_type)
+    _, server_public_key = server.generate_key_pair()
+    _, client_public_key = client.generate_key_pair()
+    shared_key = server.derive_shared_key(client_public_key)
+    derived_key = hkdf(shared_key)
+    aesgcm = AESGCM(derived_key)
+    nonce = os.urandom(12)
+
+    stages = {
+        "keygen": measure(server.generate_key_pair, iterations, warmup),
+    }
+    # generate_key_pair rotated the server key above; restore a consistent pair.
+    _, server_public_key = server.generate_key_pair()
+    stages["ecdh"] = measure(lambda: server.derive_shared_key(client_public_key), iterations, warmup)
+    stages["hkdf"] = measure(lambda: hkdf(shared_key), iterations, warmup)
+
+    per_size = {}
+    for size in sizes:
+        msg = "x" * size
+        plaintext = msg.encode()
+        ciphertext = aesgcm.encrypt(nonce, plaintext, None)
+        payload = client.create_encrypted_payload(msg, server_public_key)
+
+        def round_trip():
+            server.decrypt_payload(ClientExchangeHandler(curve_type).create_encrypted_payload(msg, server_public_key))
+
+        per_size[str(size)] = {
+            "aesgcm_encrypt": measure(lambda: aesgcm.encrypt(nonce, plaintext, None), iterations, warmup),
+            "aesgcm_decrypt": measure(lambda: aesgcm.decrypt(nonce, ciphertext, None), iterations, warmup),
+            "create_encrypted_payload": measure(
+                lambda: client.create_encrypted_payload(msg, server_public_key), iterations, warmup
+            ),
+            "decrypt_payload": measure(lambda: server.decrypt_payload(payload), iterations, warmup),
+            "round_trip": measure(round_trip, iterations, warmup),
+        }
+    stages["by_message_size"] = per_size
+    return stages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark bluebird crypto hot paths")
+    parser.add_argument("--curves", nargs="+", choices=[c.value for c in CurveType], default=[c.value for c in CurveType])
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES, help="Message sizes in bytes")
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--output", default="-", help="JSON output file, - for stdout")
+    args = parser.parse_args(argv)
+
+    started = time.time()
+    report = {
+        "benchmark": "crypto",
+        "platform": platform_info(),
+        "config": {"iterations": args.iterations, "warmup": args.warmup, "sizes": args.sizes},
+        "results": {c: bench_curve(CurveType(c), args.sizes, args.iterations, args.warmup) for c in args.curves},
+    }
+    report["duration_s"] = time.time() - started
+    emit(report, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Measures the cold-start import cost of bluebird modules and fails when a budget is exceeded.
+
+Each target is imported in a fresh interpreter with -X importtime, and the median cumulative
+time is compared against its budget. It also checks that a bare "import bluebird" does not load
+the heavy dependencies that are meant to load lazily.
+
+    python benchmarks/import_bench.py --runs 15 --budget bluebird=40 --output imports.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from common import REPO_ROOT, emit, platform_info
+
+DEFAULT_TARGETS = ["bluebird", "bluebird.client", "bluebird.server.crypto", "bluebird.ble.ble"]
+DEFAULT_BUDGETS_MS = {"bluebird": 40.0}
+LAZY_DEPENDENCIES = ["cryptography", "dbus", "gi", "requests", "multiprocessing", "concurrent.futures.process"]
+
+
+def _child_env():
+    # Only the repo root is added, so the child's import times are not skewed by a long sys.path.
+    pythonpath = os.environ.get("PYTHONPATH")
+    return dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + pythonpath if pythonpath else REPO_ROOT)
+
+
+def import_time_us(module: str) -> int:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=_child_env(),
+    )
+    if proc.returncode != 0:
+        raise ImportError(proc.stderr.strip().splitlines()[-1])
+    cumulative_us = None
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.strip() == module:
+            cumulative_us = int(cumulative)
+    if cumulative_us is None:
+        raise ImportError(f"{module} was already imported at interpreter startup")
+    return cumulative_us
+
+
+def loaded_modules(module: str):
+    proc = subprocess.run(
+        [sys.executable, "-c", f"import json, sys, {module}; print(json.dumps(sorted(sys.modules)))"],
+        capture_output=True, text=True, check=True, env=_child_env(),
+    )
+    return json.loads(proc.stdout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark bluebird import time")
+    parser.add_argument("--targets", nargs="+", default=DEFAULT_TARGETS)
+    parser.add_argument("--runs", type=int, default=11)
+    parser.add_argument("--budget", action="append", default=[], metavar="MODULE=MS",
+                        help="Median import budget in milliseconds, repeatable")
+    parser.add_argument("--output", default="-", help="JSON output file, - for stdout")
+    args = parser.parse_args(argv)
+
+    budgets = dict(DEFAULT_BUDGETS_MS)
+    for entry in args.budget:
+        module, _, ms = entry.partition("=")
+        budgets[module] = float(ms)
+
+    results = {}
+    failures = []
+    for target in args.targets:
+        try:
+            samples = [import_time_us(target) / 1000.0 for _ in range(args.runs)]
+        except ImportError as e:
+            results[target] = {"error": str(e)}
+            continue
+        result = {
+            "median_ms": statistics.median(samples),
+            "min_ms": min(samples),
+            "max_ms": max(samples),
+            "runs": len(samples),
+        }
+        budget = budgets.get(target)
+        if budget is not None:
+            result["budget_ms"] = budget
+            if result["median_ms"] > budget:
+                failures.append(f"{target}: {result['median_ms']:.1f} ms > {budget:.1f} ms budget")
+        results[target] = result
+
+    eager = [
+        name for name in loaded_modules("bluebird")
+        if any(name == dep or name.startswith(dep + ".") for dep in LAZY_DEPENDENCIES)
+    ]
+    if eager:
+        failures.append(f"import bluebird loaded lazy dependencies: {', '.join(sorted(eager))}")
+
+    emit({
+        "benchmark": "import",
+        "platform": platform_info(),
+        "results": results,
+        "eagerly_loaded": eager,
+        "failures": failures,
+    }, args.output)
+    for failure in failures:
+        sys.stderr.write(failure + "\n")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Join latency through the network backends, against their offline stand-ins.
+
+--backend wpa runs WpaSupplicantBackend against a FakeWpaSupplicant in the same process.
+--backend nm runs NetworkManagerBackend against a FakeNetworkManager in a child process on a
+private dbus-daemon. Each attempt goes through NetworkApplier, so the figures include the
+timeout wrapper and the verification polls. The fake joins after --latency seconds, so the
+reported overhead_us is what the backend adds on top of the radio. --fresh opens a new backend,
+and so a new daemon connection, for every attempt instead of reusing one.
+
+    python benchmarks/join_bench.py --backend wpa --attempts 200 --latency 0.05 --output pi4-join.json
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Imported first: common puts the repo root on sys.path for the bluebird imports below.
+from common import emit, platform_info, summarize
+
+from bluebird.network.apply import NetworkApplier
+from bluebird.util import CommissioningFields
+
+FIELDS = CommissioningFields("bench-network", "bench-password", country="US")
+
+
+def serve_nm(address: str, latency: float) -> None:
+    import dbus.bus
+    import dbus.mainloop.glib
+    from gi.repository import GLib
+    from bluebird.network.fake_nm import FakeNetworkManager
+
+    dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
+    manager = FakeNetworkManager(dbus.bus.BusConnection(address), join_latency=latency)
+    sys.stdout.write("ready\n")
+    sys.stdout.flush()
+    GLib.MainLoop().run()
+    del manager
+
+
+async def run_attempts(make_backend, attempts: int, fresh: bool, timeout: float):
+    latencies, failures = [], {}
+    applier = NetworkApplier(make_backend(), timeout=timeout)
+    started = time.perf_counter()
+    for _ in range(attempts):
+        if fresh:
+            await applier.aclose()
+            applier = NetworkApplier(make_backend(), timeout=timeout)
+        result = await applier.apply(FIELDS)
+        if result.joined:
+            latencies.append(result.elapsed)
+        else:
+            failures[result.error] = failures.get(result.error, 0) + 1
+    elapsed = time.perf_counter() - started
+    await applier.aclose()
+    return elapsed, latencies, failures
+
+
+async def bench_wpa(args):
+    from bluebird.network.fake import FakeWpaSupplicant
+    from bluebird.network.wpa import WpaSupplicantBackend
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "wlan0")
+        supplicant = await FakeWpaSupplicant(join_latency=args.latency).start(path)
+        try:
+            return await run_attempts(
+                lambda: WpaSupplicantBackend(path, poll_interval=args.poll, save_config=False),
+                args.attempts, args.fresh, args.timeout,
+            )
+        finally:
+            supplicant.close()
+
+
+def bench_nm(args):
+    import dbus.bus
+    from bluebird.ble.fake import PrivateBus
+    from bluebird.network.nm import NetworkManagerBackend
+
+    with PrivateBus() as address:
+        child = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--serve-nm", address, "--latency", str(args.latency)],
+            stdout=subprocess.PIPE, text=True, env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)),
+        )
+        try:
+            if child.stdout.readline().strip() != "ready":
+                raise RuntimeError("FakeNetworkManager did not start")
+            return asyncio.run(run_attempts(
+                lambda: NetworkManagerBackend(bus=dbus.bus.BusConnection(address), poll_interval=args.poll),
+                args.attempts, args.fresh, args.timeout,
+            ))
+        finally:
+            child.terminate()
+            child.wait()
+            child.stdout.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Join latency through the network backends")
+    parser.add_argument("--backend", choices=["wpa", "nm"], default="wpa")
+    parser.add_argument("--attempts", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds the stand-in takes to join")
+    parser.add_argument("--poll", type=float, default=0.01, help="Backend poll interval in seconds")
+    parser.add_argument("--timeout", type=float, default=10.0, help="NetworkApplier timeout in seconds")
+    parser.add_argument("--fresh", action="store_true", help="Open a new daemon connection per attempt")
+    parser.add_argument("--output", default="-", help="JSON output file, - for stdout")
+    parser.add_argument("--serve-nm", metavar="ADDRESS", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.serve_nm:
+        serve_nm(args.serve_nm, args.latency)
+        return 0
+
+    if args.backend == "wpa":
+        elapsed, latencies, failures = asyncio.run(bench_wpa(args))
+    else:
+        elapsed, latencies, failures = bench_nm(args)
+
+    latency = summarize(latencies)
+    report = {
+        "benchmark": "join",
+        "platform": platform_info(),
+        "config": {
+            "backend": args.backend,
+            "attempts": args.attempts,
+            "join_latency_s": args.latency,
+            "poll_interval_s": args.poll,
+            "fresh_connections": args.fresh,
+        },
+        "joined": len(latencies),
+        "latency": latency,
+        "overhead_us": {
+            "p50": latency["p50_us"] - args.latency * 1e6,
+            "p99": latency["p99_us"] - args.latency * 1e6,
+        },
+        "failures": failures,
+        "duration_s": elapsed,
+    }
+    emit(report, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Commissioning throughput over the socket transport.
+
+A CommissioningServer runs in a child process on a Unix socket (or TCP with --tcp). Clients
+built on ClientExchangeHandler open --concurrency connections at a time; each one reads the
+public key, writes a TLV payload and waits for the status. The report gives sessions/sec and
+connect-to-status latency percentiles.
+
+    python benchmarks/socket_bench.py --sessions 20000 --concurrency 1000 --output pi4-socket.json
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Imported first: common puts the repo root on sys.path for the bluebird imports below.
+from common import emit, platform_info, summarize
+
+from bluebird.client.transport import CommissioningClient, RequestRefusedError
+from bluebird.util import CommissioningFields, CurveType
+
+
+async def serve(address: str, curve_type: CurveType) -> None:
+    from bluebird.server import CommissioningServer, ServerExchangeHandler, ReplayGuard
+
+    server = CommissioningServer(ServerExchangeHandler(curve_type, replay_guard=ReplayGuard()), max_connections=65536)
+    if address.startswith("tcp:"):
+        await server.start_tcp("127.0.0.1", int(address[4:]))
+    else:
+        await server.start_unix(address)
+    sys.stdout.write("ready\n")
+    sys.stdout.flush()
+    await server.serve_forever()
+
+
+async def run_load(address: str, curve_type: CurveType, sessions: int, concurrency: int):
+    fields = CommissioningFields("bench-network", "bench-password")
+    latencies, statuses, errors = [], {}, {}
+    remaining = iter(range(sessions))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                if address.startswith("tcp:"):
+                    client = await CommissioningClient.open_tcp("127.0.0.1", int(address[4:]))
+                else:
+                    client = await CommissioningClient.open_unix(address)
+                async with client:
+                    status = await client.commission(fields, curve_type)
+            except (OSError, RequestRefusedError, asyncio.IncompleteReadError) as e:
+                name = type(e).__name__
+                errors[name] = errors.get(name, 0) + 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            statuses[status.name] = statuses.get(status.name, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, sessions))))
+    return time.perf_counter() - started, latencies, statuses, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Commissioning sessions/sec over the socket transport")
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=256, help="Connections open at once")
+    parser.add_argument("--curve", choices=[c.value for c in CurveType], default=CurveType.CURVE25519.value)
+    parser.add_argument("--tcp", type=int, metavar="PORT", help="Use TCP on 127.0.0.1:PORT instead of a Unix socket")
+    parser.add_argument("--output", default="-", help="JSON output file, - for stdout")
+    parser.add_argument("--serve", metavar="ADDRESS", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    curve_type = CurveType(args.curve)
+    if args.serve:
+        asyncio.run(serve(args.serve, curve_type))
+        return 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        address = f"tcp:{args.tcp}" if args.tcp else os.path.join(directory, "bluebird.sock")
+        child = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--serve", address, "--curve", args.curve],
+            stdout=subprocess.PIPE, text=True, env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)),
+        )
+        try:
+            if child.stdout.readline().strip() != "ready":
+                sys.stderr.write("Server did not start\n")
+                return 1
+            elapsed, latencies, statuses, errors = asyncio.run(
+                run_load(address, curve_type, args.sessions, args.concurrency)
+            )
+        finally:
+            child.terminate()
+            child.wait()
+            child.stdout.close()
+
+    report = {
+        "benchmark": "socket",
+        "platform": platform_info(),
+        "config": {
+            "sessions": args.sessions,
+            "concurrency": args.concurrency,
+            "curve": args.curve,
+            "transport": "tcp" if args.tcp else "unix",
+        },
+        "completed": len(latencies),
+        "sessions_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+        "latency": summarize(latencies),
+        "statuses": statuses,
+        "errors": errors,
+        "duration_s": elapsed,
+    }
+    emit(report, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
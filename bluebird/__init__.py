@@ -1,3 +1,15 @@
 from .util import CurveType
-from .client import ClientExchangeHandler
-from .server import ServerExchangeHandler
\ No newline at end of file
+from ._lazy import lazy_attributes
+
+# The crypto and BLE modules pull in cryptography, dbus and GLib, so they load on first use.
+__all__ = ["CurveType", "ClientExchangeHandler", "ServerExchangeHandler", "configure_logging", "Secret"]
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    "ClientExchangeHandler": ".client",
+    "ServerExchangeHandler": ".server",
+    "configure_logging": ".log",
+    "Secret": ".log",
+    "client": ".client",
+    "server": ".server",
+    "ble": ".ble",
+    "metrics": ".metrics",
+})
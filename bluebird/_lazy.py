@@ -0,0 +1,28 @@
+import importlib
+
+
+def lazy_attributes(package, attributes):
+    """
+    Builds module-level __getattr__ and __dir__ functions (PEP 562) that import the submodule
+    providing an attribute only when the attribute is first accessed.
+
+    Args:
+        package (str): __name__ of the package the functions are installed in.
+        attributes (dict): Public attribute name -> relative submodule name. An attribute that
+            maps to its own name is the submodule itself.
+    """
+    namespace = importlib.import_module(package).__dict__
+
+    def __getattr__(name):
+        submodule = attributes.get(name)
+        if submodule is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        module = importlib.import_module(submodule, package)
+        value = module if submodule == "." + name else getattr(module, name)
+        namespace[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(namespace) | set(attributes))
+
+    return __getattr__, __dir__
@@ -1 +1,7 @@
-from .ble import BluebirdCommissioner
\ No newline at end of file
+from .._lazy import lazy_attributes
+
+__all__ = ["BluebirdCommissioner", "AsyncBluebirdCommissioner"]
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    "BluebirdCommissioner": ".ble",
+    "AsyncBluebirdCommissioner": ".aio",
+})
@@ -0,0 +1,170 @@
+import asyncio
+import collections
+import logging
+from gi.repository import GLib
+from .ble import BluebirdCommissioner
+from .session import SessionState, CommissioningStatus
+
+try:
+    from gi.events import GLibEventLoop  # PyGObject >= 3.50
+except ImportError:
+    GLibEventLoop = None
+
+logger = logging.getLogger(__name__)
+
+
+def _is_glib_loop(loop):
+    return GLibEventLoop is not None and isinstance(loop, GLibEventLoop)
+
+
+class AsyncBluebirdCommissioner(BluebirdCommissioner):
+    """
+    asyncio front end for BluebirdCommissioner.
+
+    When the running loop comes from gi.events.GLibEventLoopPolicy, D-Bus callbacks are
+    dispatched by asyncio itself. On any other loop a small task drains the default GLib main
+    context every PUMP_INTERVAL seconds, so no extra thread is needed either way.
+
+        asyncio.set_event_loop_policy(gi.events.GLibEventLoopPolicy())  # optional
+
+        applier = NetworkApplier(NetworkManagerBackend())
+        async with AsyncBluebirdCommissioner() as commissioner:
+            credentials = await commissioner.wait_for_credentials()
+            result = await applier.apply(fields_from_params(credentials))
+            await commissioner.report(credentials["device"], result.joined)
+
+    A bus may be passed in, e.g. dbus.bus.BusConnection(address) for a private dbus-daemon.
+    """
+
+    PUMP_INTERVAL = 0.01
+
+    def __init__(self, bus=None, scan_source=None, exchange_handler=None, admission=None, offload=None, network=None):
+        BluebirdCommissioner.__init__(self, bus, scan_source, exchange_handler, admission, offload, network)
+        self._loop = None
+        self._pump_task = None
+        self._ad_registered = None
+        self._app_registered = None
+        self._credentials = None
+        self._ready = collections.deque()
+
+    async def start(self):
+        """
+        Registers with BlueZ and returns once both the advertisement and the application are registered.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._ad_registered = self._loop.create_future()
+        self._app_registered = self._loop.create_future()
+        self._credentials = self._loop.create_future()
+        if not _is_glib_loop(self._loop):
+            self._pump_task = self._loop.create_task(self._pump_glib())
+
+        try:
+            self.register()
+            await asyncio.gather(self._ad_registered, self._app_registered)
+        except BaseException:
+            await self.stop()
+            raise
+
+    async def wait_for_credentials(self, timeout=None):
+        """
+        Waits until a central has written every commissioning parameter and returns a copy of them,
+        with the central's device path under "device". Centrals that complete their parameters
+        while earlier ones are still being applied are returned by later calls, in order.
+        Cancelling the wait leaves the commissioner running.
+        """
+        if self._credentials is None:
+            raise RuntimeError("start() must be awaited first")
+        while not self._ready:
+            if self._credentials.done():
+                self._credentials = self._loop.create_future()
+            await asyncio.wait_for(asyncio.shield(self._credentials), timeout)
+        return self._ready.popleft()
+
+    async def report(self, device, joined):
+        """
+        Reports the outcome of applying credentials returned by wait_for_credentials. The device's
+        session moves to DONE or FAILED and its central is notified JOINED or FAILED; a failure
+        also rotates the key pair, as BluebirdCommissioner does.
+
+        Raises:
+            ValueError: If the device has no session being commissioned, e.g. it was reported already.
+        """
+        session = self.sessions.get(str(device))
+        if session is None or session.state is not SessionState.COMMISSIONING:
+            raise ValueError(f"No commissioning in progress for {device}")
+        self._on_commissioned(session, bool(joined))
+
+    async def stop(self):
+        """
+        Unregisters from BlueZ, stops pumping GLib and cancels any pending wait_for_credentials.
+        """
+        try:
+            self.unregister()
+        except Exception as e:
+            logger.warning("Failed to unregister from BlueZ: %s", e)
+
+        self._ready.clear()
+        for future in (self._ad_registered, self._app_registered, self._credentials):
+            if future is not None and not future.done():
+                future.cancel()
+
+        if self._pump_task is not None:
+            self._pump_task.cancel()
+            try:
+                await self._pump_task
+            except asyncio.CancelledError:
+                pass
+            self._pump_task = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    async def _pump_glib(self):
+        context = GLib.MainContext.default()
+        while True:
+            while context.pending():
+                context.iteration(False)
+            await asyncio.sleep(self.PUMP_INTERVAL)
+
+    def _on_parameters_ready(self, session):
+        # Applying the credentials is left to the awaiting caller, which hands the outcome back
+        # through report(); until then the central sees JOINING.
+        session.transition(SessionState.COMMISSIONING)
+        self._commissioning_service.status_characteristic.set_status(session.device, CommissioningStatus.JOINING)
+        self._ready.append(dict(session.params, device=session.device))
+        _resolve(self._credentials)
+
+    def close(self):
+        logger.info("Shutting off commissioner")
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.create_task(self.stop())
+
+    def register_ad_cb(self):
+        BluebirdCommissioner.register_ad_cb(self)
+        _resolve(self._ad_registered)
+
+    def register_app_cb(self):
+        BluebirdCommissioner.register_app_cb(self)
+        _resolve(self._app_registered)
+
+    def register_ad_error_cb(self, error):
+        logger.critical("Failed to register advertisement: %s", error)
+        _reject(self._ad_registered, error)
+
+    def register_app_error_cb(self, error):
+        logger.critical("Failed to register application: %s", error)
+        _reject(self._app_registered, error)
+
+
+def _resolve(future):
+    if future is not None and not future.done():
+        future.set_result(None)
+
+
+def _reject(future, error):
+    if future is not None and not future.done():
+        future.set_exception(error)
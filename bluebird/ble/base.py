@@ -19,12 +19,40 @@ LE_ADVERTISEMENT_IFACE = "org.bluez.LEAdvertisement1"
 SERVICE_UUID = "A07498CA-AD5B-474E-940D-16F1FBE7E8CD"
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-logHandler = logging.StreamHandler()
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-logHandler.setFormatter(formatter)
-logger.addHandler(logHandler)
-logger.setLevel(logging.DEBUG)
+
+class CharacteristicValue:
+    """
+    Holds a characteristic value as a pre-built dbus.ByteArray.
+
+    The value is converted once per set() instead of element by element on every ReadValue,
+    and set() swaps a single reference, so a reader on the main loop sees either the old or the
+    new value even when another thread publishes it.
+    """
+    __slots__ = ("_value",)
+
+    def __init__(self, initial=b""):
+        self._value = dbus.ByteArray(bytes(initial))
+
+    def set(self, data):
+        self._value = dbus.ByteArray(bytes(data))
+
+    def get(self):
+        return self._value
+
+    def read(self, options):
+        """
+        Serves a ReadValue call, honoring the BlueZ "offset" option.
+        """
+        value = self._value
+        offset = int(options.get("offset", 0))
+        if offset == 0:
+            return value
+        if offset > len(value):
+            raise InvalidOffsetException()
+        return dbus.ByteArray(value[offset:])
+
+    def __len__(self):
+        return len(self._value)
 
 class BaseApplication(dbus.service.Object):
     """
@@ -34,31 +62,41 @@ class BaseApplication(dbus.service.Object):
     def __init__(self, bus):
         self.path = "/"
         self.services = []
+        self._managed_objects = None
         dbus.service.Object.__init__(self, bus, self.path)
 
-        
-
     def get_path(self):
         return dbus.ObjectPath(self.path)
 
     def add_service(self, service):
         self.services.append(service)
+        service.application = self
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Drops the cached GetManagedObjects response; called whenever the object tree changes.
+        """
+        self._managed_objects = None
+
+    def get_managed_objects(self):
+        if self._managed_objects is None:
+            response = dbus.Dictionary({}, signature="oa{sa{sv}}")
+            for service in self.services:
+                response[service.get_path()] = service.get_properties()
+                chrcs = service.get_characteristics()
+                for chrc in chrcs:
+                    response[chrc.get_path()] = chrc.get_properties()
+                    descs = chrc.get_descriptors()
+                    for desc in descs:
+                        response[desc.get_path()] = desc.get_properties()
+            self._managed_objects = response
+        return self._managed_objects
 
     @dbus.service.method(DBUS_OM_IFACE, out_signature="a{oa{sa{sv}}}")
     def GetManagedObjects(self):
-        response = {}
-        logger.info("GetManagedObjects")
-
-        for service in self.services:
-            response[service.get_path()] = service.get_properties()
-            chrcs = service.get_characteristics()
-            for chrc in chrcs:
-                response[chrc.get_path()] = chrc.get_properties()
-                descs = chrc.get_descriptors()
-                for desc in descs:
-                    response[desc.get_path()] = desc.get_properties()
-
-        return response
+        logger.debug("GetManagedObjects")
+        return self.get_managed_objects()
 
 class BaseService(dbus.service.Object):
     """
@@ -73,24 +111,37 @@ class BaseService(dbus.service.Object):
         self.uuid = uuid
         self.primary = primary
         self.characteristics = []
+        self.application = None
+        self._properties = None
         dbus.service.Object.__init__(self, bus, self.path)
 
     def get_properties(self):
-        return {
-            GATT_SERVICE_IFACE: {
-                "UUID": self.uuid,
-                "Primary": self.primary,
-                "Characteristics": dbus.Array(
-                    self.get_characteristic_paths(), signature="o"
-                ),
+        if self._properties is None:
+            self._properties = {
+                GATT_SERVICE_IFACE: dbus.Dictionary({
+                    "UUID": self.uuid,
+                    "Primary": self.primary,
+                    "Characteristics": dbus.Array(
+                        self.get_characteristic_paths(), signature="o"
+                    ),
+                }, signature="sv")
             }
-        }
+        return self._properties
+
+    def invalidate(self):
+        """
+        Drops the cached properties of this service and the application's object tree.
+        """
+        self._properties = None
+        if self.application is not None:
+            self.application.invalidate()
 
     def get_path(self):
         return dbus.ObjectPath(self.path)
 
     def add_characteristic(self, characteristic):
         self.characteristics.append(characteristic)
+        self.invalidate()
 
     def get_characteristic_paths(self):
         result = []
@@ -120,23 +171,34 @@ class BaseCharacteristic(dbus.service.Object):
         self.service = service
         self.flags = flags
         self.descriptors = []
+        self._properties = None
         dbus.service.Object.__init__(self, bus, self.path)
 
     def get_properties(self):
-        return {
-            GATT_CHRC_IFACE: {
-                "Service": self.service.get_path(),
-                "UUID": self.uuid,
-                "Flags": self.flags,
-                "Descriptors": dbus.Array(self.get_descriptor_paths(), signature="o"),
+        if self._properties is None:
+            self._properties = {
+                GATT_CHRC_IFACE: dbus.Dictionary({
+                    "Service": self.service.get_path(),
+                    "UUID": self.uuid,
+                    "Flags": dbus.Array(self.flags, signature="s"),
+                    "Descriptors": dbus.Array(self.get_descriptor_paths(), signature="o"),
+                }, signature="sv")
             }
-        }
+        return self._properties
+
+    def invalidate(self):
+        """
+        Drops the cached properties of this characteristic and everything above it.
+        """
+        self._properties = None
+        self.service.invalidate()
 
     def get_path(self):
         return dbus.ObjectPath(self.path)
 
     def add_descriptor(self, descriptor):
         self.descriptors.append(descriptor)
+        self.invalidate()
 
     def get_descriptor_paths(self):
         result = []
@@ -159,7 +221,9 @@ class BaseCharacteristic(dbus.service.Object):
         logger.info("Default ReadValue called, returning error")
         raise NotSupportedException()
 
-    @dbus.service.method(GATT_CHRC_IFACE, in_signature="aya{sv}")
+    # byte_arrays delivers "ay" as a dbus.ByteArray (bytes) instead of a list of dbus.Byte,
+    # so payloads can be parsed with a memoryview without converting element by element.
+    @dbus.service.method(GATT_CHRC_IFACE, in_signature="aya{sv}", byte_arrays=True)
     def WriteValue(self, value, options):
         logger.info("Default WriteValue called, returning error")
         raise NotSupportedException()
@@ -189,16 +253,19 @@ class BaseDescriptor(dbus.service.Object):
         self.uuid = uuid
         self.flags = flags
         self.chrc = characteristic
+        self._properties = None
         dbus.service.Object.__init__(self, bus, self.path)
 
     def get_properties(self):
-        return {
-            GATT_DESC_IFACE: {
-                "Characteristic": self.chrc.get_path(),
-                "UUID": self.uuid,
-                "Flags": self.flags,
+        if self._properties is None:
+            self._properties = {
+                GATT_DESC_IFACE: dbus.Dictionary({
+                    "Characteristic": self.chrc.get_path(),
+                    "UUID": self.uuid,
+                    "Flags": dbus.Array(self.flags, signature="s"),
+                }, signature="sv")
             }
-        }
+        return self._properties
 
     def get_path(self):
         return dbus.ObjectPath(self.path)
@@ -222,8 +289,14 @@ class BaseDescriptor(dbus.service.Object):
 
 class BaseAdvertisement(dbus.service.Object):
     PATH_BASE = "/org/bluez/example/advertisement"
+    # Assigning any of these drops the cached GetAll response.
+    PROPERTY_ATTRIBUTES = frozenset((
+        "ad_type", "service_uuids", "manufacturer_data", "solicit_uuids",
+        "service_data", "local_name", "include_tx_power", "data",
+    ))
 
     def __init__(self, bus, index, advertising_type):
+        self._properties = None
         self.path = self.PATH_BASE + str(index)
         self.bus = bus
         self.ad_type = advertising_type
@@ -236,8 +309,21 @@ class BaseAdvertisement(dbus.service.Object):
         self.data = None
         dbus.service.Object.__init__(self, bus, self.path)
 
+    def __setattr__(self, name, value):
+        dbus.service.Object.__setattr__(self, name, value)
+        if name in self.PROPERTY_ATTRIBUTES:
+            dbus.service.Object.__setattr__(self, "_properties", None)
+
+    def invalidate(self):
+        self._properties = None
+
     def get_properties(self):
-        properties = dict()
+        if self._properties is None:
+            self._properties = self._build_properties()
+        return self._properties
+
+    def _build_properties(self):
+        properties = dbus.Dictionary({}, signature="sv")
         properties["Type"] = self.ad_type
         if self.service_uuids is not None:
             properties["ServiceUUIDs"] = dbus.Array(self.service_uuids, signature="s")
@@ -267,21 +353,25 @@ class BaseAdvertisement(dbus.service.Object):
         if not self.service_uuids:
             self.service_uuids = []
         self.service_uuids.append(uuid)
+        self.invalidate()
 
     def add_solicit_uuid(self, uuid):
         if not self.solicit_uuids:
             self.solicit_uuids = []
         self.solicit_uuids.append(uuid)
+        self.invalidate()
 
     def add_manufacturer_data(self, manuf_code, data):
         if not self.manufacturer_data:
             self.manufacturer_data = dbus.Dictionary({}, signature="qv")
         self.manufacturer_data[manuf_code] = dbus.Array(data, signature="y")
+        self.invalidate()
 
     def add_service_data(self, uuid, data):
         if not self.service_data:
             self.service_data = dbus.Dictionary({}, signature="sv")
         self.service_data[uuid] = dbus.Array(data, signature="y")
+        self.invalidate()
 
     def add_local_name(self, name):
         if not self.local_name:
@@ -292,18 +382,19 @@ class BaseAdvertisement(dbus.service.Object):
         if not self.data:
             self.data = dbus.Dictionary({}, signature="yv")
         self.data[ad_type] = dbus.Array(data, signature="y")
+        self.invalidate()
 
     @dbus.service.method(DBUS_PROP_IFACE, in_signature="s", out_signature="a{sv}")
     def GetAll(self, interface):
-        logger.info("GetAll")
+        logger.debug("GetAll")
         if interface != LE_ADVERTISEMENT_IFACE:
             raise InvalidArgsException()
-        logger.info("returning props")
+        logger.debug("returning props")
         return self.get_properties()[LE_ADVERTISEMENT_IFACE]
 
     @dbus.service.method(LE_ADVERTISEMENT_IFACE, in_signature="", out_signature="")
     def Release(self):
-        logger.info("%s: Released!" % self.path)
+        logger.info("%s: Released!", self.path)
 
 class InvalidArgsException(dbus.exceptions.DBusException):
     _dbus_error_name = "org.freedesktop.DBus.Error.InvalidArgs"
@@ -317,5 +408,8 @@ class NotPermittedException(dbus.exceptions.DBusException):
 class InvalidValueLengthException(dbus.exceptions.DBusException):
     _dbus_error_name = "org.bluez.Error.InvalidValueLength"
 
+class InvalidOffsetException(dbus.exceptions.DBusException):
+    _dbus_error_name = "org.bluez.Error.InvalidOffset"
+
 class FailedException(dbus.exceptions.DBusException):
     _dbus_error_name = "org.bluez.Error.Failed"
\ No newline at end of file
@@ -4,13 +4,23 @@ import dbus.service
 import dbus.exceptions
 from gi.repository import GLib
 import dbus.mainloop.glib
-import struct
-import requests
-import array
+import json
 import logging
-from enum import Enum
-from .base import BaseService, BaseCharacteristic, BaseAdvertisement, BaseApplication
-from .util import find_adapter
+import time
+from .. import metrics
+from ..log import Secret
+from .base import BaseService, BaseCharacteristic, BaseAdvertisement, BaseApplication, CharacteristicValue
+from .base import InvalidOffsetException, InvalidValueLengthException, NotPermittedException, NotSupportedException, FailedException
+from .reassembly import WriteReassembler, InvalidOffsetError, ValueTooLongError
+from .session import SessionTable, SessionState, CommissioningStatus
+from ..network.scan import WifiScanCache, NmcliScanSource
+from ..server.crypto import ServerExchangeHandler
+from ..server.replay import ReplayGuard, ReplayedPayloadError
+from ..server.admission import AdmissionControl, AdmissionError
+from ..server.resumption import TicketIssuer, InvalidTicketError
+from ..util import CurveType, CommissioningFields, is_tlv
+from .util import AdapterDiscovery
+from .offload import MainLoopOffload
 
 GATT_SERVICE_IFACE = "org.bluez.GattService1"
 GATT_CHRC_IFACE = "org.bluez.GattCharacteristic1"
@@ -35,16 +45,13 @@ CHARACTERISTIC_UUID_SSID = "51FF12BB-3ED8-46E5-AD5B-D64E2FEC021B"
 CHARACTERISTIC_UUID_PAYLOAD = "bfc0c92f-317d-4ba9-976b-cc11ce77b4ca"
 CHARACTERISTIC_UUID_AVALIABLE_SSIDS = "51FF12BB-3ED8-46E5-AD5B-D64E2F21B21B"
 CHARACTERISTIC_UUID_PUBLIC_KEY = "bfc0c92f-317d-4ba9-976b-cc11ce77b21B"
+CHARACTERISTIC_UUID_STATUS = "bfc0c92f-317d-4ba9-976b-cc11ce77b5a7"
+CHARACTERISTIC_UUID_RESUMPTION = "bfc0c92f-317d-4ba9-976b-cc11ce77b7e1"
+CHARACTERISTIC_UUID_STATS = "bfc0c92f-317d-4ba9-976b-cc11ce77b8d3"
 
 AGENT_PATH = "/commission/agent"
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-logHandler = logging.StreamHandler()
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-logHandler.setFormatter(formatter)
-logger.addHandler(logHandler)
-logger.setLevel(logging.DEBUG)
 
 class CommissioningService(BaseService):
     def __init__(self, bus, index):
@@ -53,11 +60,17 @@ class CommissioningService(BaseService):
         self.payload_characteristic = PayloadCharacteristic(bus, 1, self)
         self.available_ssids_characteristic = AvaliableSsidsCharacteristic(bus, 2, self)
         self.public_key_characteristic = PublicKeyCharacteristic(bus, 3, self)
+        self.status_characteristic = StatusCharacteristic(bus, 4, self)
+        self.resumption_characteristic = ResumptionCharacteristic(bus, 5, self)
+        self.stats_characteristic = StatsCharacteristic(bus, 6, self)
 
         self.add_characteristic(self.ssid_characteristic)
         self.add_characteristic(self.payload_characteristic)
         self.add_characteristic(self.available_ssids_characteristic)
         self.add_characteristic(self.public_key_characteristic)
+        self.add_characteristic(self.status_characteristic)
+        self.add_characteristic(self.resumption_characteristic)
+        self.add_characteristic(self.stats_characteristic)
 
 class SsidCharacteristic(BaseCharacteristic):
     description = b"Plaintext SSID"
@@ -66,20 +79,21 @@ class SsidCharacteristic(BaseCharacteristic):
         BaseCharacteristic.__init__(
             self, bus, index, CHARACTERISTIC_UUID_SSID, ["encrypt-read", "encrypt-write"], service,
         )
-        self.value = [0x0000]
+        self.value = CharacteristicValue(b"\x00")
         self._write_handler = None  # Default to None
 
     def set_write_handler(self, handler):
         self._write_handler = handler
 
     def WriteValue(self, value, options):
-        if self._write_handler:
-            self._write_handler(value, options)
-        else:
-            logger.warning("Write handler for SSID not set")
+        with metrics.timer("gatt_write_ssid"):
+            if self._write_handler:
+                self._write_handler(value, options)
+            else:
+                logger.warning("Write handler for SSID not set")
 
     def ReadValue(self, options):
-        return self.value
+        return self.value.read(options)
 
     """
     def WriteValue(self, value, options):
@@ -92,33 +106,114 @@ class SsidCharacteristic(BaseCharacteristic):
 
 class PayloadCharacteristic(BaseCharacteristic):
     description = b"Encrypted Password (With AES and ECC)"
+    SETTLE_MS = 100  # completes long writes whose length is a multiple of the chunk size
+    STAGE = "gatt_write_payload"
 
-    def __init__(self, bus, index, service):
+    def __init__(self, bus, index, service, uuid=CHARACTERISTIC_UUID_PAYLOAD):
         BaseCharacteristic.__init__(
-            self, bus, index, CHARACTERISTIC_UUID_PAYLOAD, ["encrypt-read", "encrypt-write"], service,
+            self, bus, index, uuid, ["encrypt-read", "encrypt-write"], service,
         )
-        self.value = [0x0000]
+        self.value = CharacteristicValue(b"\x00")
         self._write_handler = None  # Default to None
+        self._reassembler = WriteReassembler()
+        self._settle_timers = {}
 
     def set_write_handler(self, handler):
         self._write_handler = handler
 
-    def WriteValue(self, value, options):
-        if self._write_handler:
-            self._write_handler(value, options)
+    # Asynchronous so the handler can answer the write after work done off the main loop.
+    @dbus.service.method(GATT_CHRC_IFACE, in_signature="aya{sv}", byte_arrays=True,
+                         async_callbacks=("reply_handler", "error_handler"))
+    def WriteValue(self, value, options, reply_handler=None, error_handler=None):
+        if options.get("prepare-authorize", False):
+            reply_handler()
+            return  # authorization of a prepared write, the value follows on execute
+
+        device = str(options.get("device", ""))
+        offset = int(options.get("offset", 0))
+        mtu = options.get("mtu")
+        self._cancel_settle(device)
+        try:
+            complete = self._reassembler.write(device, value, offset, int(mtu) if mtu is not None else None)
+        except InvalidOffsetError as e:
+            logger.warning("Rejected payload chunk from %s: %s", device, e)
+            error_handler(InvalidOffsetException())
+            return
+        except ValueTooLongError as e:
+            logger.warning("Rejected payload chunk from %s: %s", device, e)
+            error_handler(InvalidValueLengthException())
+            return
+
+        if complete is not None:
+            self._deliver(complete, options, reply_handler, error_handler)
         else:
+            reply_handler()
+            self._settle_timers[device] = GLib.timeout_add(self.SETTLE_MS, self._settle, device, options)
+
+    def _settle(self, device, options):
+        self._settle_timers.pop(device, None)
+        complete = self._reassembler.flush(device)
+        if complete is not None:
+            # The chunks were already acknowledged, so a rejection can only be logged.
+            self._deliver(complete, options, None, lambda e: logger.warning("Payload from %s rejected: %s", device, e))
+        return False
+
+    def _cancel_settle(self, device):
+        timer = self._settle_timers.pop(device, None)
+        if timer is not None:
+            GLib.source_remove(timer)
+
+    def _deliver(self, value, options, reply_handler, error_handler):
+        """
+        Passes a complete value to the write handler as handler(value, options, done). The
+        handler calls done() or done(exception) exactly once, possibly later from the main loop.
+        """
+        started = time.perf_counter()
+
+        def done(error=None):
+            metrics.observe(self.STAGE, time.perf_counter() - started)
+            if error is None:
+                if reply_handler is not None:
+                    reply_handler()
+            elif error_handler is not None:
+                error_handler(error)
+
+        if not self._write_handler:
             logger.warning("Write handler for Payload not set")
+            done()
+            return
+        try:
+            self._write_handler(value, options, done)
+        except dbus.exceptions.DBusException as e:
+            done(e)
 
     def ReadValue(self, options):
-        return self.value
+        return self.value.read(options)
 
-    """def WriteValue(self, value, options):
-        logger.info("auto off write: " + repr(value))
-        cmd = bytes(value)
+class ResumptionCharacteristic(PayloadCharacteristic):
+    """
+    Reads return the resumption ticket issued to the reading device. Writes take a resumed
+    payload, reassembled like PayloadCharacteristic writes.
+    """
+    description = b"Session Resumption"
+    STAGE = "gatt_write_resumed"
+    MAX_TICKETS = 32
 
-        # write it to machine
-        logger.info(f"writing {cmd} to machine")
-        self.value = value"""
+    def __init__(self, bus, index, service):
+        PayloadCharacteristic.__init__(self, bus, index, service, CHARACTERISTIC_UUID_RESUMPTION)
+        self._tickets = {}
+
+    def set_ticket(self, device, ticket):
+        self._tickets.pop(device, None)
+        self._tickets[device] = CharacteristicValue(ticket)
+        if len(self._tickets) > self.MAX_TICKETS:
+            del self._tickets[next(iter(self._tickets))]
+
+    def ReadValue(self, options):
+        ticket = self._tickets.get(str(options.get("device", "")))
+        if ticket is None:
+            raise NotPermittedException()
+        return ticket.read(options)
 
 class AvaliableSsidsCharacteristic(BaseCharacteristic):
     description = b"Avaliable SSIDs"
@@ -128,11 +223,16 @@ class AvaliableSsidsCharacteristic(BaseCharacteristic):
             self, bus, index, CHARACTERISTIC_UUID_AVALIABLE_SSIDS, ["secure-read"], service,
         )
 
-        self.value = [0xFF]
+        self.value = CharacteristicValue(b"\xff")
         #self.add_descriptor(CharacteristicUserDescriptionDescriptor(bus, 1, self)) Make a rescan characteristic?
 
+    def set_scan_cache(self, scan_cache):
+        # The scanner thread publishes each new blob; reads never scan.
+        self.value.set(scan_cache.blob)
+        scan_cache.subscribe(lambda diff: self.value.set(scan_cache.blob))
+
     def ReadValue(self, options):
-        return self.value
+        return self.value.read(options)
 
 class PublicKeyCharacteristic(BaseCharacteristic):
     description = b"Public Key"
@@ -142,10 +242,115 @@ class PublicKeyCharacteristic(BaseCharacteristic):
             self, bus, index, CHARACTERISTIC_UUID_PUBLIC_KEY, ["secure-read"], service,
         )
 
-        self.value = [0x69]
+        self.value = CharacteristicValue()
         #self.add_descriptor(CharacteristicUserDescriptionDescriptor(bus, 1, self)) Make a regen characteristic?
+
+    def ReadValue(self, options):
+        with metrics.timer("gatt_read_public_key"):
+            return self.value.read(options)
+
+class StatusCharacteristic(BaseCharacteristic):
+    """
+    Commissioning progress per central. A read returns the one-byte status of the reading device
+    (IDLE for a device without a session).
+
+    BlueZ sends every notification to every subscribed central, so a notification carries the
+    status byte followed by the 6-byte address of the device it belongs to, taken from its
+    object path; centrals ignore notifications for other addresses.
+    """
+    description = b"Commissioning Status"
+    COALESCE_MS = 50  # updates within this window are sent as one notification per device
+    MAX_DEVICES = 32
+
+    def __init__(self, bus, index, service):
+        BaseCharacteristic.__init__(
+            self, bus, index, CHARACTERISTIC_UUID_STATUS, ["encrypt-read", "notify"], service,
+        )
+
+        self._statuses = {}
+        self._idle = CharacteristicValue(bytes((CommissioningStatus.IDLE.value,)))
+        self._pending = set()
+        self.notifying = False
+        self._flush_timer = None
+
+    def set_status(self, device, status):
+        self._statuses.pop(device, None)
+        self._statuses[device] = (status, CharacteristicValue(bytes((status.value,))))
+        if len(self._statuses) > self.MAX_DEVICES:
+            evicted = next(iter(self._statuses))
+            del self._statuses[evicted]
+            self._pending.discard(evicted)
+        # BlueZ forwards PropertiesChanged only to centrals that enabled notifications,
+        # and StartNotify/StopNotify tell us whether any central is subscribed at all.
+        if self.notifying:
+            self._pending.add(device)
+            if self._flush_timer is None:
+                self._flush_timer = GLib.timeout_add(self.COALESCE_MS, self._flush)
+
+    def status_of(self, device):
+        entry = self._statuses.get(device)
+        return entry[0] if entry is not None else CommissioningStatus.IDLE
+
+    def flush(self):
+        """
+        Sends pending coalesced updates immediately, e.g. before the main loop stops.
+        """
+        if self._flush_timer is not None:
+            GLib.source_remove(self._flush_timer)
+            self._flush()
+
+    def _flush(self):
+        self._flush_timer = None
+        pending, self._pending = self._pending, set()
+        if self.notifying:
+            for device in pending:
+                entry = self._statuses.get(device)
+                if entry is not None:
+                    value = bytes((entry[0].value,)) + _device_address(device)
+                    self.PropertiesChanged(GATT_CHRC_IFACE, {"Value": dbus.ByteArray(value)}, [])
+        return False
+
     def ReadValue(self, options):
-        return self.value
+        entry = self._statuses.get(str(options.get("device", "")))
+        return (entry[1] if entry is not None else self._idle).read(options)
+
+    def StartNotify(self):
+        self.notifying = True
+
+    def StopNotify(self):
+        self.notifying = False
+        self._pending.clear()
+        if self._flush_timer is not None:
+            GLib.source_remove(self._flush_timer)
+            self._flush_timer = None
+
+class StatsCharacteristic(BaseCharacteristic):
+    """
+    Read-only JSON summary of bluebird.metrics: counters plus count, mean, p50, p99 and max
+    per stage. A read at offset 0 takes a new snapshot; long-read continuations page through it.
+    """
+    description = b"Commissioning Statistics"
+
+    def __init__(self, bus, index, service):
+        BaseCharacteristic.__init__(
+            self, bus, index, CHARACTERISTIC_UUID_STATS, ["encrypt-read"], service,
+        )
+        self.value = CharacteristicValue(b"{}")
+        self._sources = {}
+
+    def add_source(self, name, stats):
+        """
+        Adds stats(), e.g. a queue's depth counters, to every snapshot under name.
+        """
+        self._sources[name] = stats
+
+    def ReadValue(self, options):
+        if int(options.get("offset", 0)) == 0:
+            snapshot = metrics.snapshot(buckets=False)
+            for name, stats in self._sources.items():
+                snapshot[name] = stats()
+            self.value.set(json.dumps(snapshot, separators=(",", ":")).encode())
+        return self.value.read(options)
 
 class CommissioningAdvertisement(BaseAdvertisement):
     def __init__(self, bus, index):
@@ -159,34 +364,86 @@ class CommissioningAdvertisement(BaseAdvertisement):
         self.include_tx_power = True
 
 class BluebirdCommissioner():
-    def __init__(self):
+    """
+    Serves the commissioning service to any number of centrals, each with its own session.
+
+    start() runs until close(). With stop_after_join=True it also returns once a central has
+    joined a network and no other central's join is still running, for a one-shot setup.
+
+    Payloads are decrypted on offload and joins run on join_offload, so a join waiting on the
+    network for up to the applier's timeout never holds up decryption for other centrals.
+    """
+
+    def __init__(self, bus=None, scan_source=None, exchange_handler=None, admission=None, offload=None, network=None,
+                 stop_after_join=False, join_offload=None):
         dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
         self._mainloop = GLib.MainLoop()
-        self._bus = dbus.SystemBus()
-        self._adapter = find_adapter(self._bus)
+        self._bus = bus if bus is not None else dbus.SystemBus()
+        self.adapter_discovery = AdapterDiscovery.for_bus(self._bus)
+        self._adapter = self.adapter_discovery.find()
+        logger.info("Adapter lookup: %s", self.adapter_discovery.stats())
         self._adapter_obj = self._bus.get_object(BLUEZ_SERVICE_NAME, self._adapter)
         self._adapter_props = dbus.Interface(self._adapter_obj, "org.freedesktop.DBus.Properties")
         self._service_manager = dbus.Interface(self._adapter_obj, GATT_MANAGER_IFACE)
         self._advertising_manger = dbus.Interface(self._adapter_obj, LE_ADVERTISING_MANAGER_IFACE)
         self._bluez_obj = self._bus.get_object(BLUEZ_SERVICE_NAME, "/org/bluez")
         self._commissioning_service = CommissioningService(self._bus, 2)
+        self.stop_after_join = stop_after_join
+        self._joined = False
         self.app = None
-        self.params = {
-            "avaliable_ssids": None,
-            "ssid": None
-        }
+        self._advertisement = None
+        self._reap_timer = None
+        self.sessions = SessionTable()
+        if scan_source is None and NmcliScanSource.available():
+            scan_source = NmcliScanSource()
+        self.scan_cache = WifiScanCache(scan_source) if scan_source is not None else None
+        if self.scan_cache is not None:
+            self._commissioning_service.available_ssids_characteristic.set_scan_cache(self.scan_cache)
+        if exchange_handler is None:
+            exchange_handler = ServerExchangeHandler(
+                CurveType.CURVE25519, replay_guard=ReplayGuard(), ticket_issuer=TicketIssuer(),
+            )
+        self.exchange_handler = exchange_handler
+        # Every key rotation is published to the public key characteristic in one reference swap.
+        self.exchange_handler.subscribe_public_key(self._commissioning_service.public_key_characteristic.value.set)
+        if self.exchange_handler.public_key is None:
+            self.exchange_handler.generate_key_pair()
+        if admission is None:
+            admission = AdmissionControl(self.exchange_handler.curve_type)
+        self.admission = admission
+        self.offload = offload if offload is not None else MainLoopOffload()
+        # One radio joins one network at a time, so joins queue on a single worker.
+        self.join_offload = join_offload if join_offload is not None else MainLoopOffload(
+            max_workers=1, max_pending=16, name="join_offload",
+        )
+        stats = self._commissioning_service.stats_characteristic
+        stats.add_source("admission", self.admission.stats)
+        stats.add_source("offload", self.offload.stats)
+        stats.add_source("join_offload", self.join_offload.stats)
+        # Without a NetworkApplier, e.g. NetworkApplier(NetworkManagerBackend()), credentials are only logged.
+        self.network = network
+        if self.network is not None:
+            stats.add_source("network", self.network.stats)
     
     def start(self):
+        self.register()
+        self._mainloop.run()
+
+    def register(self):
+        """
+        Powers the adapter and registers the advertisement, GATT application and agent with BlueZ
+        without running a main loop. Registration results arrive through the register_*_cb callbacks.
+        """
         if not self._adapter:
             logger.critical("GattManager1 interface not found")
             sys.exit(1)
         
         self._adapter_props.Set("org.bluez.Adapter1", "Powered", dbus.Boolean(1))
-        advertisement = CommissioningAdvertisement(self._bus, 0)
+        self._advertisement = CommissioningAdvertisement(self._bus, 0)
         self.app = BaseApplication(self._bus)
         self.app.add_service(self._commissioning_service)
         self._advertising_manger.RegisterAdvertisement(
-            advertisement.get_path(),
+            self._advertisement.get_path(),
             {},
             reply_handler=self.register_ad_cb,
             error_handler=self.register_ad_error_cb,
@@ -199,39 +456,185 @@ class BluebirdCommissioner():
         )
         self._commissioning_service.ssid_characteristic.set_write_handler(self._handle_ssid_write)
         self._commissioning_service.payload_characteristic.set_write_handler(self._handle_password_write)
+        self._commissioning_service.resumption_characteristic.set_write_handler(self._handle_resumed_write)
         
         agent_manager = dbus.Interface(self._bluez_obj, "org.bluez.AgentManager1")
         agent_manager.RegisterAgent(AGENT_PATH, "NoInputNoOutput")
         agent_manager.RequestDefaultAgent(AGENT_PATH)
-        self._mainloop.run()
+        self._reap_timer = GLib.timeout_add_seconds(1, self._reap_sessions)
+        if self.scan_cache is not None:
+            self.scan_cache.start()
+
+    def unregister(self):
+        """
+        Withdraws the GATT application and advertisement from BlueZ.
+        """
+        if self.app is not None:
+            self._service_manager.UnregisterApplication(self.app.get_path())
+            self.app = None
+        if self._advertisement is not None:
+            self._advertising_manger.UnregisterAdvertisement(self._advertisement.get_path())
+            self._advertisement = None
+        if self._reap_timer is not None:
+            GLib.source_remove(self._reap_timer)
+            self._reap_timer = None
+        if self.scan_cache is not None:
+            self.scan_cache.stop()
+
+    def _session_for(self, options):
+        device = str(options.get("device", ""))
+        try:
+            return self.sessions.get_or_create(device)
+        except OverflowError as e:
+            logger.warning("Rejecting write from %s: %s", device, e)
+            raise NotPermittedException()
 
     def _handle_ssid_write(self, value, options):
         ssid = bytes(value).decode()  # Decode the written value
-        self.params["ssid"] = ssid
-        logger.info(f"SSID updated to: {ssid}")
-        self._check_parameters()
-
-    def _handle_password_write(self, value, options):
-        password = bytes(value).decode()  # Decode the written value
-        self.params["password"] = password
-        logger.info(f"Password updated to: {password}")
-        self._check_parameters()
-
-    def _check_parameters(self):
-        # Check if both parameters are provided
-        if all(self.params.values()):
-            logger.info("All parameters provided. Starting commissioning process.")
+        session = self._session_for(options)
+        logger.info("SSID updated to: %s for %s", ssid, session.device)
+        self._set_parameters(session, {"ssid": ssid})
+
+    def _handle_password_write(self, value, options, done):
+        session = self._session_for(options)
+        status = self._commissioning_service.status_characteristic
+        try:
+            admitted = self.admission.admit(session.device, value)
+        except AdmissionError as e:
+            # Shed traffic never reaches the key exchange, so it cannot force a rotation either.
+            logger.warning("Payload from %s shed (%s): %s", session.device, e.reason, e)
+            if e.reason == "length":
+                raise InvalidValueLengthException()
+            raise NotPermittedException()
+        status.set_status(session.device, CommissioningStatus.RECEIVED)
+
+        def decrypt():
+            with admitted:
+                plaintext, ticket = self.exchange_handler.decrypt_payload_with_ticket(value)
+            return _decode_parameters(plaintext), ticket
+
+        def decrypted(result):
+            params, ticket = result
+            if ticket is not None:
+                self._commissioning_service.resumption_characteristic.set_ticket(session.device, ticket)
+            try:
+                self._accept_parameters(session, params)
+            except dbus.exceptions.DBusException as e:
+                done(e)
+                return
+            done()
+
+        def failed(e):
+            if isinstance(e, ReplayedPayloadError):
+                # A replay says nothing about the key, so it does not trigger a rotation.
+                logger.warning("Replayed payload from %s rejected", session.device)
+                done(NotPermittedException())
+                return
+            logger.warning("Payload from %s could not be decrypted: %s", session.device, e)
+            status.set_status(session.device, CommissioningStatus.FAILED)
+            self.exchange_handler.generate_key_pair()
+            done(FailedException())
+
+        if not self.offload.submit(decrypt, decrypted, failed):
+            admitted.release()
+            logger.warning("Payload from %s refused: decrypt queue full %s", session.device, self.offload.stats())
+            raise NotPermittedException()
+
+    def _handle_resumed_write(self, value, options, done):
+        # Resumption is symmetric-only and cheap enough to stay on the main loop.
+        session = self._session_for(options)
+        if self.exchange_handler.ticket_issuer is None:
+            raise NotSupportedException()
+        status = self._commissioning_service.status_characteristic
+        status.set_status(session.device, CommissioningStatus.RECEIVED)
+        try:
+            params = _decode_parameters(self.exchange_handler.decrypt_resumed_payload(value))
+        except (InvalidTicketError, ReplayedPayloadError) as e:
+            # No key exchange took place, so there is nothing to rotate.
+            logger.warning("Resumed payload from %s rejected: %s", session.device, e)
+            raise NotPermittedException()
+        except ValueError as e:
+            logger.warning("Resumed payload from %s could not be decrypted: %s", session.device, e)
+            status.set_status(session.device, CommissioningStatus.FAILED)
+            raise FailedException()
+        logger.info("Session resumed by %s", session.device)
+        self._accept_parameters(session, params)
+        done()
+
+    def _accept_parameters(self, session, params):
+        status = self._commissioning_service.status_characteristic
+        status.set_status(session.device, CommissioningStatus.DECRYPTED)
+        if "ssid" in params:
+            logger.info("Fields received from %s for SSID: %s", session.device, params["ssid"])
+        logger.info("Password updated to: %s for %s", Secret(params["password"]), session.device)
+        self._set_parameters(session, params)
+
+    def _set_parameters(self, session, params):
+        try:
+            state = session.set_parameters(params)
+        except ValueError as e:
+            logger.warning("%s", e)
+            raise NotPermittedException()
+        if state is SessionState.READY:
+            logger.info("All parameters provided by %s. Starting commissioning process.", session.device)
+            self._on_parameters_ready(session)
+
+    def _on_parameters_ready(self, session):
+        # Joining can take seconds, so it runs on the join pool and the write that completed
+        # the parameters is answered right away; the outcome arrives as a status notification.
+        status = self._commissioning_service.status_characteristic
+        session.transition(SessionState.COMMISSIONING)
+        status.set_status(session.device, CommissioningStatus.JOINING)
+        params = dict(session.params)
+
+        def commission():
+            with metrics.timer("commission"):
+                return bool(self.commission_device(
+                    params["ssid"], params["password"], params.get("hidden", False),
+                    params.get("static_ip"), params.get("country"),
+                ))
+
+        def failed(e):
+            logger.error("Commissioning for %s failed: %s", session.device, e)
+            self._on_commissioned(session, False)
+
+        if not self.join_offload.submit(commission, lambda joined: self._on_commissioned(session, joined), failed):
+            failed(RuntimeError("commissioning queue full"))
+
+    def _on_commissioned(self, session, joined):
+        status = self._commissioning_service.status_characteristic
+        session.transition(SessionState.DONE if joined else SessionState.FAILED)
+        metrics.count("joined" if joined else "join_failed")
+        status.set_status(session.device, CommissioningStatus.JOINED if joined else CommissioningStatus.FAILED)
+        if joined:
+            status.flush()
+            self._bus.flush()
+            self._joined = True
+        else:
+            self.exchange_handler.generate_key_pair()
+        # Other centrals' joins are left to finish; their sessions would be lost with the loop.
+        if self.stop_after_join and self._joined and not any(
+            s.state is SessionState.COMMISSIONING for s in self.sessions
+        ):
             self._mainloop.quit()
-            self.commission_device()
 
-    def commission_device(self):
-        ssid = self.parameters["ssid"]
-        password = self.parameters["password"]
-        logger.info(f"Commissioning with SSID: {ssid} and Password: {password}")
-        # Add the actual commissioning logic here
+    def _reap_sessions(self):
+        for session in self.sessions.expire():
+            if not session.finished:
+                logger.info("Reclaimed abandoned commissioning session for %s", session.device)
+        return True
+
+    def commission_device(self, ssid, password, hidden=False, static_ip=None, country=None):
+        # Runs on a join_offload worker; apply_blocking() waits at most the applier's timeout.
+        if self.network is None:
+            logger.info("Commissioning with SSID: %s and Password: %s", ssid, Secret(password))
+            return True
+        return self.network.apply_blocking(CommissioningFields(ssid, password, hidden, static_ip, country)).joined
 
     def close(self):
         logger.info("Shutting off commissioner") 
+        self.offload.shutdown()
+        self.join_offload.shutdown()
         self._mainloop.quit()
 
     def register_ad_cb(self):
@@ -241,9 +644,24 @@ class BluebirdCommissioner():
         logger.info("Application registered")
 
     def register_ad_error_cb(self, error):
-        logger.critical("Failed to register advertisement: " + str(error))
+        logger.critical("Failed to register advertisement: %s", error)
         self._mainloop.quit()
     
     def register_app_error_cb(self, error):
-        logger.critical("Failed to register application: " + str(error))
-        self._mainloop.quit()
\ No newline at end of file
+        logger.critical("Failed to register application: %s", error)
+        self._mainloop.quit()
+
+
+def _device_address(device):
+    # BlueZ device paths end in dev_XX_XX_XX_XX_XX_XX.
+    try:
+        address = bytes.fromhex(device.rsplit("/dev_", 1)[1].replace("_", ""))
+    except (IndexError, ValueError):
+        return bytes(6)
+    return address if len(address) == 6 else bytes(6)
+
+
+def _decode_parameters(plaintext):
+    if is_tlv(plaintext):
+        return CommissioningFields.decode(plaintext)._asdict()
+    return {"password": plaintext.decode()}
@@ -0,0 +1,250 @@
+"""
+A stand-in for the org.bluez service, so BluebirdCommissioner, CommissioningService and
+BaseApplication can be exercised without a Bluetooth adapter.
+
+FakeBluez owns the org.bluez name on a private dbus-daemon and implements enough of Adapter1,
+GattManager1, LEAdvertisingManager1 and AgentManager1 for a commissioner to register. Like
+BlueZ, it reads the application's objects when it is registered and can then play any number
+of centrals by calling ReadValue and WriteValue on its characteristics.
+
+    with PrivateBus() as address:
+        DBusGMainLoop(set_as_default=True)
+        bluez = FakeBluez(dbus.bus.BusConnection(address))
+        # BluebirdCommissioner(bus=dbus.bus.BusConnection(address)) in this or another process
+"""
+import dbus
+import dbus.bus
+import dbus.service
+import dbus.exceptions
+import logging
+import os
+import subprocess
+from typing import Callable, Dict, List, Optional
+
+BLUEZ_SERVICE_NAME = "org.bluez"
+ADAPTER_IFACE = "org.bluez.Adapter1"
+GATT_MANAGER_IFACE = "org.bluez.GattManager1"
+GATT_CHRC_IFACE = "org.bluez.GattCharacteristic1"
+LE_ADVERTISING_MANAGER_IFACE = "org.bluez.LEAdvertisingManager1"
+AGENT_MANAGER_IFACE = "org.bluez.AgentManager1"
+DBUS_OM_IFACE = "org.freedesktop.DBus.ObjectManager"
+DBUS_PROP_IFACE = "org.freedesktop.DBus.Properties"
+
+ADAPTER_PATH = "/org/bluez/hci0"
+
+logger = logging.getLogger(__name__)
+
+
+class PrivateBus:
+    """
+    Runs a throwaway dbus-daemon with the session configuration and exposes its address.
+    Usable as a context manager that returns the address.
+    """
+
+    def __init__(self, executable: str = "dbus-daemon"):
+        self.executable = executable
+        self.address = None
+        self._process = None
+
+    def start(self) -> str:
+        self._process = subprocess.Popen(
+            [self.executable, "--session", "--nofork", "--nopidfile", "--print-address=1"],
+            stdout=subprocess.PIPE, text=True,
+        )
+        self.address = self._process.stdout.readline().strip()
+        if not self.address:
+            self.stop()
+            raise RuntimeError("dbus-daemon did not report an address")
+        return self.address
+
+    def stop(self) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.wait()
+            self._process.stdout.close()
+            self._process = None
+
+    def env(self) -> Dict[str, str]:
+        """
+        Returns a copy of os.environ pointing DBUS_SESSION_BUS_ADDRESS at this bus, for child processes.
+        """
+        return dict(os.environ, DBUS_SESSION_BUS_ADDRESS=self.address)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+class RegisteredApplication:
+    """
+    A GATT application registered through GattManager1, with the characteristics it exported.
+    """
+    __slots__ = ("sender", "path", "characteristics")
+
+    def __init__(self, sender: str, path: str, objects):
+        self.sender = sender
+        self.path = path
+        self.characteristics = {
+            str(props[GATT_CHRC_IFACE]["UUID"]).lower(): str(obj)
+            for obj, props in objects.items() if GATT_CHRC_IFACE in props
+        }
+
+
+class FakeObjectManager(dbus.service.Object):
+    def __init__(self, bus, managed_objects):
+        dbus.service.Object.__init__(self, bus, "/")
+        self._managed_objects = managed_objects
+
+    @dbus.service.method(DBUS_OM_IFACE, out_signature="a{oa{sa{sv}}}")
+    def GetManagedObjects(self):
+        return self._managed_objects()
+
+
+class FakeAgentManager(dbus.service.Object):
+    def __init__(self, bus):
+        dbus.service.Object.__init__(self, bus, "/org/bluez")
+        self.agents = {}
+        self.default_agent = None
+
+    @dbus.service.method(AGENT_MANAGER_IFACE, in_signature="os", sender_keyword="sender")
+    def RegisterAgent(self, agent, capability, sender=None):
+        self.agents[(sender, str(agent))] = str(capability)
+
+    @dbus.service.method(AGENT_MANAGER_IFACE, in_signature="o", sender_keyword="sender")
+    def RequestDefaultAgent(self, agent, sender=None):
+        if (sender, str(agent)) not in self.agents:
+            raise dbus.exceptions.DBusException("Agent is not registered", name="org.bluez.Error.DoesNotExist")
+        self.default_agent = (sender, str(agent))
+
+    @dbus.service.method(AGENT_MANAGER_IFACE, in_signature="o", sender_keyword="sender")
+    def UnregisterAgent(self, agent, sender=None):
+        self.agents.pop((sender, str(agent)), None)
+
+
+class FakeAdapter(dbus.service.Object):
+    def __init__(self, bus, path=ADAPTER_PATH, address="00:00:5E:00:53:00"):
+        dbus.service.Object.__init__(self, bus, path)
+        self.bus = bus
+        self.path = path
+        self.properties = {
+            "Address": dbus.String(address),
+            "Name": dbus.String("bluebird-fake"),
+            "Powered": dbus.Boolean(False),
+            "Discoverable": dbus.Boolean(False),
+        }
+        self.applications: List[RegisteredApplication] = []
+        self.advertisements = set()
+        self.on_application: Optional[Callable[[RegisteredApplication], None]] = None
+
+    def get_interfaces(self):
+        return {ADAPTER_IFACE: dict(self.properties), GATT_MANAGER_IFACE: {}, LE_ADVERTISING_MANAGER_IFACE: {}}
+
+    @dbus.service.method(DBUS_PROP_IFACE, in_signature="ss", out_signature="v")
+    def Get(self, interface, name):
+        if interface != ADAPTER_IFACE or name not in self.properties:
+            raise dbus.exceptions.DBusException("No such property", name="org.freedesktop.DBus.Error.InvalidArgs")
+        return self.properties[name]
+
+    @dbus.service.method(DBUS_PROP_IFACE, in_signature="s", out_signature="a{sv}")
+    def GetAll(self, interface):
+        return dict(self.properties) if interface == ADAPTER_IFACE else {}
+
+    @dbus.service.method(DBUS_PROP_IFACE, in_signature="ssv")
+    def Set(self, interface, name, value):
+        if interface != ADAPTER_IFACE or name not in self.properties:
+            raise dbus.exceptions.DBusException("No such property", name="org.freedesktop.DBus.Error.InvalidArgs")
+        self.properties[name] = value
+        self.PropertiesChanged(ADAPTER_IFACE, {name: value}, [])
+
+    @dbus.service.signal(DBUS_PROP_IFACE, signature="sa{sv}as")
+    def PropertiesChanged(self, interface, changed, invalidated):
+        pass
+
+    @dbus.service.method(GATT_MANAGER_IFACE, in_signature="oa{sv}", sender_keyword="sender",
+                         async_callbacks=("reply_handler", "error_handler"))
+    def RegisterApplication(self, application, options, sender=None, reply_handler=None, error_handler=None):
+        # BlueZ reads the whole object tree before it answers, and so does this.
+        path = str(application)
+
+        def registered(objects):
+            app = RegisteredApplication(sender, path, objects)
+            self.applications.append(app)
+            logger.info("Application %s registered by %s with %d characteristics", path, sender, len(app.characteristics))
+            reply_handler()
+            if self.on_application is not None:
+                self.on_application(app)
+
+        remote = dbus.Interface(self.bus.get_object(sender, path), DBUS_OM_IFACE)
+        remote.GetManagedObjects(reply_handler=registered, error_handler=error_handler)
+
+    @dbus.service.method(GATT_MANAGER_IFACE, in_signature="o", sender_keyword="sender")
+    def UnregisterApplication(self, application, sender=None):
+        self.applications = [a for a in self.applications if (a.sender, a.path) != (sender, str(application))]
+
+    @dbus.service.method(LE_ADVERTISING_MANAGER_IFACE, in_signature="oa{sv}", sender_keyword="sender")
+    def RegisterAdvertisement(self, advertisement, options, sender=None):
+        self.advertisements.add((sender, str(advertisement)))
+
+    @dbus.service.method(LE_ADVERTISING_MANAGER_IFACE, in_signature="o", sender_keyword="sender")
+    def UnregisterAdvertisement(self, advertisement, sender=None):
+        self.advertisements.discard((sender, str(advertisement)))
+
+
+class FakeBluez:
+    """
+    Owns org.bluez on the given bus and exports one adapter, hci0.
+
+    Centrals are simulated with read_value and write_value, which call the registered
+    application asynchronously with the same options BlueZ passes ("device", "mtu", "offset").
+    Both need a running GLib main loop.
+    """
+
+    def __init__(self, bus):
+        self.bus = bus
+        self._name = dbus.service.BusName(BLUEZ_SERVICE_NAME, bus, do_not_queue=True)
+        self.agent_manager = FakeAgentManager(bus)
+        self.adapter = FakeAdapter(bus)
+        self.object_manager = FakeObjectManager(bus, self._managed_objects)
+
+    def _managed_objects(self):
+        return {
+            dbus.ObjectPath("/org/bluez"): {AGENT_MANAGER_IFACE: {}},
+            dbus.ObjectPath(self.adapter.path): self.adapter.get_interfaces(),
+        }
+
+    @property
+    def application(self) -> Optional[RegisteredApplication]:
+        return self.adapter.applications[0] if self.adapter.applications else None
+
+    def device_path(self, index: int) -> str:
+        """
+        Returns a BlueZ style object path for the index-th simulated central.
+        """
+        octets = index.to_bytes(6, "big")
+        return f"{self.adapter.path}/dev_" + "_".join(f"{b:02X}" for b in octets)
+
+    def _characteristic(self, uuid: str):
+        app = self.application
+        if app is None:
+            raise RuntimeError("No application has been registered")
+        path = app.characteristics[uuid.lower()]
+        return dbus.Interface(self.bus.get_object(app.sender, path), GATT_CHRC_IFACE)
+
+    def read_value(self, uuid: str, device: str, reply_handler, error_handler, mtu: int = 517) -> None:
+        options = {"device": dbus.ObjectPath(device), "mtu": dbus.UInt16(mtu)}
+        self._characteristic(uuid).ReadValue(
+            options, reply_handler=reply_handler, error_handler=error_handler, byte_arrays=True,
+        )
+
+    def write_value(self, uuid: str, value: bytes, device: str, reply_handler, error_handler, mtu: int = 517) -> None:
+        options = {"device": dbus.ObjectPath(device), "mtu": dbus.UInt16(mtu), "type": dbus.String("request")}
+        self._characteristic(uuid).WriteValue(
+            dbus.ByteArray(value), options, reply_handler=reply_handler, error_handler=error_handler,
+        )
+
+    def close(self) -> None:
+        for obj in (self.object_manager, self.adapter, self.agent_manager):
+            obj.remove_from_connection()
+        self._name = None
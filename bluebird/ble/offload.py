@@ -0,0 +1,113 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .. import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class MainLoopOffload:
+    """
+    Runs blocking work (key exchange, decryption, joining a network) on a bounded thread pool
+    and delivers the outcome back on the GLib main loop with GLib.idle_add, so D-Bus calls from
+    other centrals and from bluetoothd keep being served meanwhile.
+
+    At most max_pending jobs are queued or running. submit() refuses further work instead of
+    queueing it without bound; stats() reports depth, peak depth and refusals so saturation is
+    visible. Queue wait and run time are recorded as the "<name>_wait" and "<name>_run" stages,
+    "offload_wait" and "offload_run" by default.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 8, name: str = "offload",
+                 idle_add: Optional[Callable[..., Any]] = None):
+        """
+        Args:
+            max_workers (int): Threads running jobs.
+            max_pending (int): Jobs queued or running before submit() refuses more.
+            name (str): Prefix of the metrics stages and worker thread names.
+            idle_add (Optional[Callable]): Schedules delivery on the main loop. Defaults to GLib.idle_add.
+        """
+        if idle_add is None:
+            from gi.repository import GLib
+            idle_add = GLib.idle_add
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.name = name
+        self._idle_add = idle_add
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"bluebird-{name}")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def submit(self, work: Callable[[], Any], on_result: Callable[[Any], None],
+               on_error: Callable[[Exception], None]) -> bool:
+        """
+        Queues work() on the pool. Its return value is passed to on_result, or the exception it
+        raised to on_error, on the main loop. Returns False without queueing when saturated.
+        """
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                metrics.count("offload_rejected")
+                return False
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+        queued = time.perf_counter()
+        self._executor.submit(self._run, work, on_result, on_error, queued)
+        return True
+
+    def _run(self, work, on_result, on_error, queued):
+        started = time.perf_counter()
+        metrics.observe(f"{self.name}_wait", started - queued)
+        with self._lock:
+            self.running += 1
+        try:
+            result = work()
+        except Exception as e:
+            self._idle_add(self._deliver, on_error, e, False)
+        else:
+            self._idle_add(self._deliver, on_result, result, True)
+        finally:
+            metrics.observe(f"{self.name}_run", time.perf_counter() - started)
+            with self._lock:
+                self.running -= 1
+
+    def _deliver(self, callback, value, ok):
+        with self._lock:
+            self.pending -= 1
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+        try:
+            callback(value)
+        except Exception:
+            logger.exception("Offloaded job callback failed")
+        return False
+
+    @property
+    def saturated(self) -> bool:
+        return self.pending >= self.max_pending
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "running": self.running,
+                "peak_pending": self.peak_pending,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,107 @@
+import time
+from typing import Callable, Dict, Optional
+
+ATT_DEFAULT_MTU = 23
+ATT_PREPARE_WRITE_OVERHEAD = 5
+ATT_MAX_VALUE_SIZE = 512
+
+
+class InvalidOffsetError(ValueError):
+    pass
+
+
+class ValueTooLongError(ValueError):
+    pass
+
+
+class _PendingWrite:
+    __slots__ = ("buffer", "length", "deadline")
+
+    def __init__(self, max_size: int, deadline: float):
+        self.buffer = bytearray(max_size)
+        self.length = 0
+        self.deadline = deadline
+
+
+class WriteReassembler:
+    """
+    Reassembles long (prepared) GATT writes that BlueZ delivers as a series of WriteValue calls
+    with increasing "offset" options, one preallocated buffer per connected device.
+
+    A value is complete when a chunk shorter than the link's maximum prepared-write chunk arrives.
+    A value whose length is an exact multiple of the chunk size is completed by flush(), which the
+    characteristic calls after a short settle delay. Partial values older than timeout are dropped.
+    """
+
+    def __init__(self, max_size: int = ATT_MAX_VALUE_SIZE, timeout: float = 5.0, max_pending: int = 8,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self._clock = clock
+        self._pending: Dict[str, _PendingWrite] = {}
+
+    def write(self, device: str, value: bytes, offset: int = 0, mtu: Optional[int] = None) -> Optional[memoryview]:
+        """
+        Stores one chunk for a device.
+
+        Returns the complete value once the final chunk has arrived, otherwise None. The returned
+        memoryview owns the device's buffer; the next write from that device gets a fresh one.
+
+        Raises InvalidOffsetError if the chunk would leave a gap and ValueTooLongError if the value
+        would exceed max_size.
+        """
+        now = self._clock()
+        self.expire(now)
+
+        end = offset + len(value)
+        if end > self.max_size:
+            self._pending.pop(device, None)
+            raise ValueTooLongError(f"Value of {end} bytes exceeds {self.max_size}")
+
+        pending = self._pending.get(device)
+        if offset == 0:
+            if pending is None:
+                if len(self._pending) >= self.max_pending:
+                    oldest = min(self._pending, key=lambda d: self._pending[d].deadline)
+                    del self._pending[oldest]
+                pending = _PendingWrite(self.max_size, now + self.timeout)
+                self._pending[device] = pending
+            pending.length = 0
+        elif pending is None or offset > pending.length:
+            self._pending.pop(device, None)
+            raise InvalidOffsetError(f"Offset {offset} does not continue the pending value")
+
+        pending.buffer[offset:end] = value
+        pending.length = max(pending.length, end)
+        pending.deadline = now + self.timeout
+
+        chunk_limit = (mtu or ATT_DEFAULT_MTU) - ATT_PREPARE_WRITE_OVERHEAD
+        if len(value) < chunk_limit:
+            return self.flush(device)
+        return None
+
+    def flush(self, device: str) -> Optional[memoryview]:
+        """
+        Completes and returns whatever has been assembled for a device, or None if nothing is pending.
+        """
+        pending = self._pending.pop(device, None)
+        if pending is None or pending.length == 0:
+            return None
+        return memoryview(pending.buffer)[:pending.length]
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """
+        Drops partial values whose timeout has passed and returns how many were dropped.
+        """
+        if not self._pending:
+            return 0
+        if now is None:
+            now = self._clock()
+        stale = [device for device, pending in self._pending.items() if pending.deadline <= now]
+        for device in stale:
+            del self._pending[device]
+        return len(stale)
+
+    def pending(self, device: str) -> bool:
+        return device in self._pending
@@ -0,0 +1,159 @@
+import time
+from enum import Enum
+from typing import Callable, Dict, List, Optional
+
+
+class SessionState(Enum):
+    """
+    Lifecycle of one central's commissioning attempt.
+
+    Attributes:
+        OPEN: Session created, nothing written yet.
+        PARTIAL: Some but not all parameters have been written.
+        READY: Every parameter has been written.
+        COMMISSIONING: The credentials are being applied.
+        DONE: Commissioning succeeded.
+        FAILED: Commissioning failed.
+    """
+    OPEN = "open"
+    PARTIAL = "partial"
+    READY = "ready"
+    COMMISSIONING = "commissioning"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class CommissioningStatus(Enum):
+    """
+    Progress reported to centrals through the status characteristic, one byte on the wire.
+    """
+    IDLE = 0x00
+    RECEIVED = 0x01
+    DECRYPTED = 0x02
+    JOINING = 0x03
+    JOINED = 0x04
+    FAILED = 0x05
+
+
+_TRANSITIONS = {
+    SessionState.OPEN: {SessionState.PARTIAL, SessionState.READY, SessionState.FAILED},
+    SessionState.PARTIAL: {SessionState.PARTIAL, SessionState.READY, SessionState.FAILED},
+    SessionState.READY: {SessionState.READY, SessionState.COMMISSIONING, SessionState.FAILED},
+    SessionState.COMMISSIONING: {SessionState.DONE, SessionState.FAILED},
+    SessionState.DONE: set(),
+    SessionState.FAILED: set(),
+}
+
+REQUIRED_PARAMETERS = ("ssid", "password")
+
+
+class CommissioningSession:
+    """
+    Parameters and state written by a single central, identified by its BlueZ device object path.
+    """
+    __slots__ = ("device", "params", "state", "deadline")
+
+    def __init__(self, device: str, deadline: float):
+        self.device = device
+        self.params: Dict[str, object] = {name: None for name in REQUIRED_PARAMETERS}
+        self.state = SessionState.OPEN
+        self.deadline = deadline
+
+    def set_parameter(self, name: str, value: str) -> SessionState:
+        """
+        Stores a parameter and moves to PARTIAL or READY.
+
+        Raises:
+            ValueError: If the session no longer accepts parameters.
+        """
+        return self.set_parameters({name: value})
+
+    def set_parameters(self, params: Dict[str, object]) -> SessionState:
+        """
+        Stores several parameters at once, e.g. every field of a TLV payload, with a single transition.
+
+        Raises:
+            ValueError: If the session no longer accepts parameters.
+        """
+        if self.state not in (SessionState.OPEN, SessionState.PARTIAL, SessionState.READY):
+            raise ValueError(f"Session for {self.device} is {self.state.value}")
+        self.params.update(params)
+        ready = all(self.params.get(required) is not None for required in REQUIRED_PARAMETERS)
+        return self.transition(SessionState.READY if ready else SessionState.PARTIAL)
+
+    def transition(self, state: SessionState) -> SessionState:
+        """
+        Raises:
+            ValueError: If the transition is not allowed from the current state.
+        """
+        if state not in _TRANSITIONS[self.state]:
+            raise ValueError(f"Invalid session transition {self.state.value} -> {state.value}")
+        self.state = state
+        return state
+
+    @property
+    def finished(self) -> bool:
+        return self.state in (SessionState.DONE, SessionState.FAILED)
+
+    def __repr__(self):
+        return f"CommissioningSession(device={self.device!r}, state={self.state.value})"
+
+
+class SessionTable:
+    """
+    Commissioning sessions keyed by device path, each with an idle timeout.
+
+    Every write extends the writer's session; sessions idle past timeout are reclaimed by expire().
+    """
+
+    def __init__(self, timeout: float = 60.0, max_sessions: int = 16, clock: Callable[[], float] = time.monotonic):
+        self.timeout = timeout
+        self.max_sessions = max_sessions
+        self._clock = clock
+        self._sessions: Dict[str, CommissioningSession] = {}
+
+    def get_or_create(self, device: str) -> CommissioningSession:
+        """
+        Returns the live session for a device, creating it if needed, and extends its deadline.
+
+        Raises:
+            OverflowError: If max_sessions live sessions already exist.
+        """
+        now = self._clock()
+        session = self._sessions.get(device)
+        if session is None or session.finished:
+            if len(self._sessions) >= self.max_sessions and not self.expire(now):
+                raise OverflowError(f"Too many concurrent commissioning sessions ({self.max_sessions})")
+            session = CommissioningSession(device, now + self.timeout)
+            self._sessions[device] = session
+        else:
+            session.deadline = now + self.timeout
+        return session
+
+    def get(self, device: str) -> Optional[CommissioningSession]:
+        return self._sessions.get(device)
+
+    def remove(self, device: str) -> Optional[CommissioningSession]:
+        return self._sessions.pop(device, None)
+
+    def expire(self, now: Optional[float] = None) -> List[CommissioningSession]:
+        """
+        Removes and returns sessions whose deadline has passed or that have finished. Sessions
+        being commissioned are kept past their deadline until the join reports its outcome, so
+        the device cannot start a second join meanwhile.
+        """
+        if now is None:
+            now = self._clock()
+        reclaimed = [
+            s for s in self._sessions.values()
+            if s.finished or (s.deadline <= now and s.state is not SessionState.COMMISSIONING)
+        ]
+        for session in reclaimed:
+            del self._sessions[session.device]
+        return reclaimed
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __iter__(self):
+        return iter(list(self._sessions.values()))
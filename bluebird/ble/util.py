@@ -1,19 +1,107 @@
 import dbus
+import logging
+import time
 
 DBUS_OM_IFACE = "org.freedesktop.DBus.ObjectManager"
 BLUEZ_SERVICE_NAME = "org.bluez"
 GATT_MANAGER_IFACE = "org.bluez.GattManager1"
 
+logger = logging.getLogger(__name__)
+
+
+class AdapterDiscovery:
+    """
+    Finds BlueZ objects that implement GattManager1 and keeps the answer current.
+
+    The first lookup walks GetManagedObjects once. After that the result is served from memory
+    and updated from the ObjectManager InterfacesAdded/InterfacesRemoved signals, so later
+    lookups on the same bus return immediately.
+    """
+
+    _instances = {}
+
+    def __init__(self, bus):
+        self._bus = bus
+        self._adapters = []
+        self._scanned = False
+        self._subscriptions = []
+        self.scans = 0
+        self.hits = 0
+        self.signals = 0
+        self.last_scan_seconds = None
+
+    @classmethod
+    def for_bus(cls, bus):
+        """
+        Returns the shared discovery for a bus, creating it on first use.
+        """
+        discovery = cls._instances.get(bus)
+        if discovery is None:
+            discovery = cls._instances[bus] = cls(bus)
+        return discovery
+
+    def find(self):
+        """
+        Returns the first object path with a GattManager1 interface, or None.
+        """
+        if self._scanned:
+            self.hits += 1
+        else:
+            self.scan()
+        return self._adapters[0] if self._adapters else None
+
+    def scan(self):
+        """
+        Rebuilds the adapter list from GetManagedObjects and subscribes to changes.
+        """
+        start = time.perf_counter()
+        remote_om = dbus.Interface(self._bus.get_object(BLUEZ_SERVICE_NAME, "/"), DBUS_OM_IFACE)
+        if not self._subscriptions:
+            self._subscriptions = [
+                remote_om.connect_to_signal("InterfacesAdded", self._interfaces_added),
+                remote_om.connect_to_signal("InterfacesRemoved", self._interfaces_removed),
+            ]
+
+        objects = remote_om.GetManagedObjects()
+        self._adapters = sorted(str(o) for o, props in objects.items() if GATT_MANAGER_IFACE in props)
+        self._scanned = True
+        self.scans += 1
+        self.last_scan_seconds = time.perf_counter() - start
+        logger.debug("Adapter scan of %d objects took %.1f ms", len(objects), self.last_scan_seconds * 1000)
+
+    def close(self):
+        for match in self._subscriptions:
+            match.remove()
+        self._subscriptions = []
+        self._scanned = False
+        if AdapterDiscovery._instances.get(self._bus) is self:
+            del AdapterDiscovery._instances[self._bus]
+
+    def stats(self):
+        return {
+            "scans": self.scans,
+            "hits": self.hits,
+            "signals": self.signals,
+            "last_scan_seconds": self.last_scan_seconds,
+            "adapters": list(self._adapters),
+        }
+
+    def _interfaces_added(self, path, interfaces):
+        self.signals += 1
+        path = str(path)
+        if GATT_MANAGER_IFACE in interfaces and path not in self._adapters:
+            self._adapters.append(path)
+            self._adapters.sort()
+
+    def _interfaces_removed(self, path, interfaces):
+        self.signals += 1
+        path = str(path)
+        if GATT_MANAGER_IFACE in interfaces and path in self._adapters:
+            self._adapters.remove(path)
+
+
 def find_adapter(bus):
     """
     Returns the first object that the bluez service has that has a GattManager1 interface
     """
-    remote_om = dbus.Interface(bus.get_object(BLUEZ_SERVICE_NAME, "/"), DBUS_OM_IFACE)
-    
-    objects = remote_om.GetManagedObjects()
-    print(objects)
-    for o, props in objects.items():
-        if GATT_MANAGER_IFACE in props.keys():
-            return o
-
-    return None
\ No newline at end of file
+    return AdapterDiscovery.for_bus(bus).find()
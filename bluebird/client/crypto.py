@@ -4,8 +4,9 @@ from cryptography.hazmat.primitives.asymmetric.x25519 import X25519PrivateKey, X
 from cryptography.hazmat.primitives.asymmetric.x448 import X448PrivateKey, X448PublicKey
 from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-from bluebird.util import CurveType
-from typing import Union, Tuple
+from bluebird.util import CurveType, CommissioningFields
+from bluebird.util.resumption import RESUMPTION_INFO, TICKET_SIZE
+from typing import Optional, Union, Tuple
 
 class ClientExchangeHandler:
     """
@@ -34,6 +35,7 @@ class ClientExchangeHandler:
         self.curve_type = curve_type
         self.private_key = None
         self.public_key = None
+        self.session_key = None
         if self.curve_type == CurveType.CURVE25519:
             self.private_curve_type = X25519PrivateKey
             self.public_curve_type = X25519PublicKey
@@ -95,6 +97,7 @@ class ClientExchangeHandler:
             salt=None,
             info=b'handshake data'
         ).derive(shared_key)
+        self.session_key = derived_key
 
         aesgcm = AESGCM(key=derived_key)
         nonce = os.urandom(12)  # never reuse nonce key combo
@@ -141,4 +144,82 @@ class ClientExchangeHandler:
         shared_key = self.derive_shared_key(ext_public_key)
         nonce, encrypted_msg = self.encrypt_msg(shared_key, str.encode(msg))
         payload = self.public_key + nonce + encrypted_msg
-        return payload
\ No newline at end of file
+        return payload
+
+    def create_encrypted_fields_payload(self, fields: CommissioningFields, ext_public_key: bytes) -> bytes:
+        """
+        Seals several commissioning fields (SSID, password, hidden flag, static IP, country code)
+        into one payload, so a single key exchange and a single GATT write carry all of them.
+
+        The payload layout is the same as create_encrypted_payload; the plaintext is the TLV
+        encoding of the fields.
+
+        Args:
+            fields (CommissioningFields): The fields to send.
+            ext_public_key (bytes): The external public key in bytes format.
+
+        Returns:
+            payload (bytes): A payload with ECDH public key, nonce, and encrypted fields to send to server.
+
+        Raises:
+            ValueError: If a field does not fit its encoding.
+        """
+        plaintext = fields.encode()
+        self.generate_key_pair()
+        shared_key = self.derive_shared_key(ext_public_key)
+        nonce, encrypted_msg = self.encrypt_msg(shared_key, plaintext)
+        return self.public_key + nonce + encrypted_msg
+
+    def resumption_key(self) -> bytes:
+        """
+        Derives the key that resumed payloads are sealed with from the session key of the last
+        payload this handler created. Store it with the ticket to resume from another handler.
+
+        Raises:
+            ValueError: If no payload has been created yet.
+        """
+        if self.session_key is None:
+            raise ValueError("No session to resume. Must create an encrypted payload first.")
+        return HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=RESUMPTION_INFO
+        ).derive(self.session_key)
+
+    def create_resumed_payload(self, msg: Union[str, bytes], ticket: bytes, resumption_key: Optional[bytes] = None) -> bytes:
+        """
+        Seals a message for a server that issued a resumption ticket, without a key exchange.
+
+        Payload layout: ticket (68) + nonce (12) + ciphertext, with the ticket authenticated as
+        associated data.
+
+        Args:
+            msg (Union[str, bytes]): The message to be encrypted.
+            ticket (bytes): The ticket read from the server after an earlier payload.
+            resumption_key (Optional[bytes]): The key from resumption_key(); derived from the last session if omitted.
+
+        Returns:
+            payload (bytes): A resumed payload to send to the server.
+
+        Raises:
+            ValueError: If the ticket is malformed or there is no session to resume.
+        """
+        if len(ticket) != TICKET_SIZE:
+            raise ValueError(f"Resumption ticket must be {TICKET_SIZE} bytes")
+        if resumption_key is None:
+            resumption_key = self.resumption_key()
+        if isinstance(msg, str):
+            msg = msg.encode()
+        ticket = bytes(ticket)
+        nonce = os.urandom(12)
+        return ticket + nonce + AESGCM(key=resumption_key).encrypt(nonce, msg, ticket)
+
+    def create_resumed_fields_payload(self, fields: CommissioningFields, ticket: bytes, resumption_key: Optional[bytes] = None) -> bytes:
+        """
+        Seals commissioning fields like create_encrypted_fields_payload, but under a resumption ticket.
+
+        Raises:
+            ValueError: If a field does not fit its encoding, the ticket is malformed or there is no session to resume.
+        """
+        return self.create_resumed_payload(fields.encode(), ticket, resumption_key)
@@ -0,0 +1,247 @@
+"""
+Bulk payload generation for provisioning stations: one encrypted payload per device, each for
+that device's own server public key.
+
+    bluebird-fleet --input devices.csv --output payloads.jsonl --curve curve448 --password-env WIFI_PASSWORD
+
+Input records are (device id, server public key) as CSV rows "device_id,public_key" or JSONL
+objects {"device_id": ..., "public_key": ...}, with the key hex or base64 encoded. Output is
+streamed as it is produced, so memory stays bounded by workers * chunk_size * max_pending.
+"""
+import argparse
+import base64
+import binascii
+import csv
+import getpass
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from collections import deque
+from typing import IO, Iterable, Iterator, List, NamedTuple, Optional
+
+from bluebird.util import CurveType
+from .crypto import ClientExchangeHandler
+
+
+class FleetRecord(NamedTuple):
+    """
+    Attributes:
+        device_id (str): Identifier of the device the payload is for.
+        server_public_key (bytes): The raw public key advertised by that device.
+        error (Optional[str]): Why the input row could not be read, or None. Such records pass
+            through encrypt_fleet as error results.
+    """
+    device_id: str
+    server_public_key: bytes
+    error: Optional[str] = None
+
+
+class FleetPayload(NamedTuple):
+    """
+    Attributes:
+        device_id (str): Identifier of the device the payload is for.
+        payload (Optional[bytes]): The encrypted payload, or None if it could not be created.
+        error (Optional[str]): Why the payload could not be created, or None on success.
+    """
+    device_id: str
+    payload: Optional[bytes]
+    error: Optional[str]
+
+
+def decode_key(text: str, encoding: str = "hex") -> bytes:
+    """
+    Decodes a public key written as hex or base64.
+
+    Raises:
+        ValueError: If the text is not valid in the given encoding.
+    """
+    text = text.strip()
+    try:
+        if encoding == "hex":
+            return bytes.fromhex(text)
+        if encoding == "base64":
+            return base64.b64decode(text, validate=True)
+    except (ValueError, binascii.Error) as e:
+        raise ValueError(f"Invalid {encoding} public key: {e}")
+    raise ValueError(f"Unsupported key encoding: {encoding}")
+
+
+def read_records(stream: IO[str], fmt: str = "csv", key_encoding: str = "hex") -> Iterator[FleetRecord]:
+    """
+    Lazily reads (device id, server public key) records from a CSV or JSONL stream.
+    CSV input may start with a "device_id,public_key" header row.
+
+    A malformed row does not stop the stream: it is yielded as a record with an error, under
+    its device id or, when that cannot be read, "line <n>".
+
+    Raises:
+        ValueError: If fmt is not "csv" or "jsonl".
+    """
+    if fmt == "jsonl":
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            device_id = f"line {number}"
+            try:
+                entry = json.loads(line)
+                device_id = str(entry["device_id"])
+                yield FleetRecord(device_id, decode_key(entry["public_key"], key_encoding))
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                yield _bad_record(device_id, e)
+    elif fmt == "csv":
+        for number, row in enumerate(csv.reader(stream), 1):
+            if not row or row[0] == "device_id":
+                continue
+            device_id = row[0] or f"line {number}"
+            if len(row) < 2:
+                yield FleetRecord(device_id, b"", "Missing public key column")
+                continue
+            try:
+                yield FleetRecord(device_id, decode_key(row[1], key_encoding))
+            except ValueError as e:
+                yield _bad_record(device_id, e)
+    else:
+        raise ValueError(f"Unsupported input format: {fmt}")
+
+
+def _bad_record(device_id: str, error: Exception) -> FleetRecord:
+    message = f"Missing field {error}" if isinstance(error, KeyError) else str(error)
+    return FleetRecord(device_id, b"", message)
+
+
+def _encrypt_chunk(curve_type: CurveType, msg: str, records: List[FleetRecord]) -> List[FleetPayload]:
+    client = ClientExchangeHandler(curve_type)
+    results = []
+    for record in records:
+        if record.error is not None:
+            results.append(FleetPayload(record.device_id, None, record.error))
+            continue
+        try:
+            payload = client.create_encrypted_payload(msg, record.server_public_key)
+            results.append(FleetPayload(record.device_id, payload, None))
+        except Exception as e:
+            results.append(FleetPayload(record.device_id, None, str(e)))
+    return results
+
+
+def encrypt_fleet(records: Iterable[FleetRecord], msg: str, curve_type: CurveType,
+                  executor: Optional[Executor] = None, chunk_size: int = 64,
+                  max_pending: Optional[int] = None) -> Iterator[FleetPayload]:
+    """
+    Creates one payload per record, in input order, without raising per record. Records that
+    carry a read error, and every record of a chunk whose worker failed, come out as error results.
+
+    Records are consumed lazily in chunks of chunk_size. With an executor, at most max_pending
+    chunks (default: twice the worker count) are in flight, so arbitrarily long inputs are
+    streamed through in bounded memory.
+
+    Args:
+        records (Iterable[FleetRecord]): Devices and their server public keys.
+        msg (str): The message to encrypt for every device.
+        curve_type (CurveType): The curve all devices use.
+        executor (Optional[Executor]): A process (or thread) pool; None encrypts in this process.
+        chunk_size (int): Records per executor task.
+        max_pending (Optional[int]): Chunks allowed in flight at once.
+
+    Returns:
+        Iterator[FleetPayload]: One result per record.
+    """
+    records = iter(records)
+    chunks = iter(lambda: list(itertools.islice(records, chunk_size)), [])
+    if executor is None:
+        for chunk in chunks:
+            yield from _encrypt_chunk(curve_type, msg, chunk)
+        return
+
+    if max_pending is None:
+        max_pending = 2 * (getattr(executor, "_max_workers", None) or os.cpu_count() or 1)
+    pending = deque()
+    for chunk in chunks:
+        pending.append((chunk, executor.submit(_encrypt_chunk, curve_type, msg, chunk)))
+        if len(pending) >= max_pending:
+            yield from _chunk_results(*pending.popleft())
+    while pending:
+        yield from _chunk_results(*pending.popleft())
+
+
+def _chunk_results(chunk: List[FleetRecord], future) -> List[FleetPayload]:
+    try:
+        return future.result()
+    except Exception as e:
+        # e.g. a worker process died; the rest of the fleet is still processed.
+        error = f"Worker failed: {e or type(e).__name__}"
+        return [FleetPayload(record.device_id, None, record.error or error) for record in chunk]
+
+
+def write_payloads(payloads: Iterable[FleetPayload], stream: IO[str], fmt: str = "jsonl") -> dict:
+    """
+    Streams payloads out as JSONL objects or CSV rows with hex-encoded payloads.
+
+    Returns:
+        dict: "written" and "failed" counts.
+    """
+    counts = {"written": 0, "failed": 0}
+    writer = csv.writer(stream) if fmt == "csv" else None
+    if writer is not None:
+        writer.writerow(["device_id", "payload", "error"])
+    for result in payloads:
+        payload_hex = result.payload.hex() if result.payload is not None else None
+        if writer is not None:
+            writer.writerow([result.device_id, payload_hex or "", result.error or ""])
+        else:
+            stream.write(json.dumps({"device_id": result.device_id, "payload": payload_hex, "error": result.error}) + "\n")
+        counts["failed" if result.error else "written"] += 1
+    return counts
+
+
+def _format_for(path: str, explicit: Optional[str]) -> str:
+    if explicit:
+        return explicit
+    return "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Encrypt Wi-Fi credentials for a fleet of devices")
+    parser.add_argument("--input", default="-", help="CSV or JSONL records, - for stdin")
+    parser.add_argument("--output", default="-", help="CSV or JSONL payloads, - for stdout")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"])
+    parser.add_argument("--output-format", choices=["csv", "jsonl"])
+    parser.add_argument("--key-encoding", choices=["hex", "base64"], default="hex")
+    parser.add_argument("--curve", choices=[c.value for c in CurveType], default=CurveType.CURVE25519.value)
+    parser.add_argument("--password-env", help="Read the message from this environment variable")
+    parser.add_argument("--password-file", help="Read the message from the first line of this file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes, 0 to encrypt in-process")
+    parser.add_argument("--chunk-size", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    if args.password_env:
+        msg = os.environ[args.password_env]
+    elif args.password_file:
+        with open(args.password_file) as f:
+            msg = f.readline().rstrip("\n")
+    else:
+        msg = getpass.getpass("Wi-Fi password: ")
+
+    source = sys.stdin if args.input == "-" else open(args.input, newline="")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+    executor = ProcessPoolExecutor(args.workers) if args.workers > 0 else None
+    try:
+        records = read_records(source, _format_for(args.input, args.input_format), args.key_encoding)
+        payloads = encrypt_fleet(records, msg, CurveType(args.curve), executor, args.chunk_size)
+        counts = write_payloads(payloads, sink, _format_for(args.output, args.output_format))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    sys.stderr.write(f"{counts['written']} payloads written, {counts['failed']} failed\n")
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
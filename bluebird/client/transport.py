@@ -0,0 +1,121 @@
+"""
+Client side of the socket commissioning protocol served by bluebird.server.transport.
+
+    async with await CommissioningClient.open_unix("/run/bluebird.sock") as client:
+        status = await client.commission(CommissioningFields("home", "hunter22"), CurveType.CURVE25519)
+"""
+import asyncio
+import json
+from typing import Optional, Tuple
+
+from bluebird.ble.session import CommissioningStatus
+from bluebird.util import CurveType, CommissioningFields
+from bluebird.util.framing import MessageType, encode_frame, read_frame
+from .crypto import ClientExchangeHandler
+
+
+class RequestRefusedError(ValueError):
+    """
+    Raised when the server answers a request with an ERROR frame.
+    """
+
+
+class CommissioningClient:
+    """
+    One connection to a CommissioningServer. Requests are sent one at a time and each waits for its reply.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._client: Optional[ClientExchangeHandler] = None
+
+    @classmethod
+    async def open_unix(cls, path: str) -> "CommissioningClient":
+        return cls(*await asyncio.open_unix_connection(path))
+
+    @classmethod
+    async def open_tcp(cls, host: str, port: int) -> "CommissioningClient":
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def request(self, message_type: MessageType, body: bytes = b"") -> Tuple[MessageType, bytes]:
+        """
+        Sends one frame and returns the reply's type and body.
+
+        Raises:
+            RequestRefusedError: If the server replied with an ERROR frame.
+        """
+        self._writer.write(encode_frame(message_type, body))
+        await self._writer.drain()
+        reply_type, reply = await read_frame(self._reader)
+        if reply_type is MessageType.ERROR:
+            raise RequestRefusedError(bytes(reply).decode("utf-8", "replace"))
+        return reply_type, bytes(reply)
+
+    async def read_public_key(self) -> bytes:
+        return (await self.request(MessageType.READ_PUBLIC_KEY))[1]
+
+    async def read_status(self) -> CommissioningStatus:
+        return CommissioningStatus((await self.request(MessageType.READ_STATUS))[1][0])
+
+    async def write_ssid(self, ssid: str) -> CommissioningStatus:
+        return CommissioningStatus((await self.request(MessageType.WRITE_SSID, ssid.encode("utf-8")))[1][0])
+
+    async def write_payload(self, payload: bytes) -> CommissioningStatus:
+        """
+        Writes an encrypted payload and returns the status once the server has acted on it,
+        i.e. JOINED or FAILED when the payload completed the parameters.
+        """
+        return CommissioningStatus((await self.request(MessageType.WRITE_PAYLOAD, payload))[1][0])
+
+    async def read_ticket(self) -> bytes:
+        """
+        Returns the resumption ticket issued for the last accepted payload on this connection.
+        """
+        return (await self.request(MessageType.READ_TICKET))[1]
+
+    async def write_resumed(self, payload: bytes) -> CommissioningStatus:
+        return CommissioningStatus((await self.request(MessageType.WRITE_RESUMED, payload))[1][0])
+
+    async def read_stats(self) -> dict:
+        """
+        Returns the server's metrics snapshot and connection counters.
+        """
+        return json.loads((await self.request(MessageType.READ_STATS))[1])
+
+    async def commission(self, fields: CommissioningFields, curve_type: CurveType) -> CommissioningStatus:
+        """
+        Runs the whole exchange: reads the server key, seals the fields for it and writes them.
+        """
+        if self._client is None or self._client.curve_type != curve_type:
+            self._client = ClientExchangeHandler(curve_type)
+        public_key = await self.read_public_key()
+        return await self.write_payload(self._client.create_encrypted_fields_payload(fields, public_key))
+
+    async def resume(self, fields: CommissioningFields, ticket: bytes, resumption_key: bytes) -> CommissioningStatus:
+        """
+        Sends the fields under a ticket from an earlier connection, skipping the key exchange.
+        resumption_key comes from ClientExchangeHandler.resumption_key() of that connection's exchange.
+        """
+        client = self._client or ClientExchangeHandler(CurveType.CURVE25519)
+        return await self.write_resumed(client.create_resumed_fields_payload(fields, ticket, resumption_key))
+
+    @property
+    def exchange_handler(self) -> Optional[ClientExchangeHandler]:
+        """
+        The handler used by the last commission() call, e.g. for its resumption_key().
+        """
+        return self._client
+
+    async def close(self) -> None:
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -0,0 +1,99 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+
+LOGGER_NAME = "bluebird"
+DEFAULT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_redact = True
+_listener = None
+_queue_handler = None
+
+
+class Secret:
+    """
+    Wraps a sensitive value passed as a logging argument so it prints as a placeholder.
+
+        logger.info("Password updated to: %s", Secret(password))
+
+    Formatting happens on the logging thread, and only if the record is actually emitted.
+    """
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return "<redacted>" if _redact else str(self.value)
+
+    __repr__ = __str__
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler.prepare formats the message in the calling thread. Records here only carry
+    immutable arguments, so they are queued as-is and formatted by the listener thread.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def configure_logging(level=None, handlers=None, fmt=DEFAULT_FORMAT, redact=True):
+    """
+    Sets up the library logger once: records are queued on the calling thread (the GLib main
+    loop) and formatted and written by a background listener, so a slow stderr or journald cannot
+    stall D-Bus replies. Calling it again replaces the previous configuration.
+
+    Args:
+        level (Optional[Union[int, str]]): Log level. Defaults to $BLUEBIRD_LOG_LEVEL or INFO.
+        handlers (Optional[list[logging.Handler]]): Output handlers. Defaults to one stderr StreamHandler.
+        fmt (str): Format string applied to handlers that have no formatter.
+        redact (bool): Whether Secret arguments are masked.
+
+    Returns:
+        logging.Logger: The "bluebird" logger.
+    """
+    global _redact, _listener, _queue_handler
+
+    shutdown_logging()
+    _redact = redact
+    if level is None:
+        level = os.environ.get("BLUEBIRD_LOG_LEVEL", "INFO")
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+    if handlers is None:
+        handlers = [logging.StreamHandler()]
+    for handler in handlers:
+        if handler.formatter is None:
+            handler.setFormatter(logging.Formatter(fmt))
+
+    records = queue.SimpleQueue()
+    _queue_handler = _DeferredQueueHandler(records)
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(level)
+    logger.addHandler(_queue_handler)
+    logger.propagate = False
+    return logger
+
+
+def shutdown_logging():
+    """
+    Flushes and stops the background listener installed by configure_logging.
+    """
+    global _listener, _queue_handler
+
+    if _queue_handler is not None:
+        logging.getLogger(LOGGER_NAME).removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,184 @@
+"""
+Stage timers, fixed-bucket latency histograms and counters for the commissioning hot path.
+
+Recording is off unless enable() is called or $BLUEBIRD_METRICS is set to 1. While it is off,
+timer() hands back one shared no-op context manager and count() returns after a single flag
+check, so the instrumented code pays about one attribute lookup and call per stage.
+
+    from bluebird import metrics
+    metrics.enable()
+    ...
+    metrics.snapshot()["histograms"]["ecdh"]["p99_us"]
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+# Upper bounds in microseconds, 1-2-5 steps from 10 us to 10 s; a last bucket catches the rest.
+BUCKET_BOUNDS_US = tuple(m * 10 ** e for e in range(1, 7) for m in (1, 2, 5)) + (10_000_000,)
+
+_enabled = os.environ.get("BLUEBIRD_METRICS", "0") not in ("", "0")
+_lock = threading.Lock()
+_histograms: Dict[str, "Histogram"] = {}
+_counters: Dict[str, int] = {}
+
+
+class Histogram:
+    """
+    Latency histogram over BUCKET_BOUNDS_US. Memory is fixed regardless of how many samples are observed.
+    """
+    __slots__ = ("buckets", "count", "total", "max", "_lock")
+
+    def __init__(self):
+        self.buckets: List[int] = [0] * (len(BUCKET_BOUNDS_US) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        micros = seconds * 1e6
+        index = bisect_left(BUCKET_BOUNDS_US, micros)
+        with self._lock:
+            self.buckets[index] += 1
+            self.count += 1
+            self.total += micros
+            if micros > self.max:
+                self.max = micros
+
+    def percentile(self, pct: float) -> float:
+        """
+        Returns the upper bound in microseconds of the bucket holding the pct-th percentile,
+        or the observed maximum for the overflow bucket.
+        """
+        with self._lock:
+            return _percentile(list(self.buckets), self.count, self.max, pct)
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            count, total, maximum, buckets = self.count, self.total, self.max, list(self.buckets)
+        return {
+            "count": count,
+            "mean_us": total / count if count else 0.0,
+            "p50_us": _percentile(buckets, count, maximum, 50),
+            "p99_us": _percentile(buckets, count, maximum, 99),
+            "max_us": maximum,
+            "buckets": buckets,
+        }
+
+
+def _percentile(buckets: List[int], count: int, maximum: float, pct: float) -> float:
+    if not count:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * count)))
+    seen = 0
+    for index, n in enumerate(buckets):
+        seen += n
+        if seen >= rank:
+            return float(BUCKET_BOUNDS_US[index]) if index < len(BUCKET_BOUNDS_US) else maximum
+    return maximum
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, histogram: Histogram):
+        self._histogram = histogram
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._histogram.observe(time.perf_counter() - self._start)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def enable(enabled: bool = True) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+def disable() -> None:
+    enable(False)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def histogram(name: str) -> Histogram:
+    """
+    Returns the histogram for a stage, creating it on first use.
+    """
+    h = _histograms.get(name)
+    if h is None:
+        with _lock:
+            h = _histograms.setdefault(name, Histogram())
+    return h
+
+
+def timer(name: str):
+    """
+    Context manager recording the duration of the block into the stage's histogram.
+    """
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(histogram(name))
+
+
+def observe(name: str, seconds: float) -> None:
+    """
+    Records a duration measured elsewhere, e.g. between a queued and a completed callback.
+    """
+    if _enabled:
+        histogram(name).observe(seconds)
+
+
+def count(name: str, n: int = 1) -> None:
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+def snapshot(names: Optional[List[str]] = None, buckets: bool = True) -> Dict[str, object]:
+    """
+    Returns counters and per-stage histogram summaries as plain, JSON serializable data.
+
+    Args:
+        names (Optional[List[str]]): Only include these histograms. Defaults to all of them.
+        buckets (bool): Include raw bucket counts; leave out to keep the result small, e.g. for a GATT read.
+    """
+    with _lock:
+        counters = dict(_counters)
+        histograms = dict(_histograms)
+    if names is not None:
+        histograms = {name: h for name, h in histograms.items() if name in names}
+    summaries = {name: h.snapshot() for name, h in sorted(histograms.items())}
+    result = {"enabled": _enabled, "counters": counters, "histograms": summaries}
+    if buckets:
+        result["bucket_bounds_us"] = list(BUCKET_BOUNDS_US)
+    else:
+        for summary in summaries.values():
+            del summary["buckets"]
+    return result
+
+
+def reset() -> None:
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
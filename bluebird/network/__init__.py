@@ -0,0 +1,15 @@
+from .._lazy import lazy_attributes
+
+_SCAN = [
+    "AccessPoint", "ScanDiff", "ScanSource", "FileScanSource", "NmcliScanSource", "WifiScanCache",
+    "encode_access_points", "decode_access_points",
+]
+_APPLY = ["JoinResult", "NetworkBackend", "NetworkApplier", "fields_from_params"]
+
+__all__ = _SCAN + _APPLY + ["NetworkManagerBackend", "WpaSupplicantBackend"]
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    **{name: ".scan" for name in _SCAN},
+    **{name: ".apply" for name in _APPLY},
+    "NetworkManagerBackend": ".nm",
+    "WpaSupplicantBackend": ".wpa",
+})
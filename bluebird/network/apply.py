@@ -0,0 +1,174 @@
+"""
+Applying commissioned credentials to the host's network stack.
+
+A NetworkBackend joins one network and only reports success once the join has been verified.
+Backends keep their connection to the network daemon open between attempts. NetworkApplier
+bounds each attempt with a timeout and can be called from asyncio code, from a worker thread
+or directly as the apply callback of a CommissioningServer:
+
+    applier = NetworkApplier(NetworkManagerBackend(), timeout=30)
+    result = await applier.apply(CommissioningFields("home", "hunter22", country="US"))
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+
+from bluebird import metrics
+from bluebird.log import Secret
+from bluebird.util import CommissioningFields
+
+logger = logging.getLogger(__name__)
+
+
+class JoinResult(NamedTuple):
+    """
+    Outcome of one attempt to join a network.
+
+    Attributes:
+        joined (bool): Whether the host is associated with the network (and has an address, where the backend can tell).
+        ssid (str): Network name.
+        address (Optional[str]): Address acquired on the network, if the backend reports one.
+        elapsed (float): Seconds from starting the attempt until it was verified or given up on.
+        error (Optional[str]): Why the attempt failed.
+    """
+    joined: bool
+    ssid: str
+    address: Optional[str] = None
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+
+class NetworkBackend:
+    """
+    Joins networks through one network daemon. Subclasses implement join() and, if they hold a
+    connection to the daemon, close().
+
+    join() is cancelled when the applier's timeout expires, so it must undo a half-configured
+    network when it sees asyncio.CancelledError and re-raise it.
+    """
+    name = "none"
+
+    async def join(self, fields: CommissioningFields) -> JoinResult:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class NetworkApplier:
+    """
+    Runs join attempts on a backend with a timeout and records them as the "join" stage.
+
+    apply() is for code already running on an event loop. apply_blocking() is for threads without
+    one, such as the BLE commissioner's offload workers: it runs the attempt on a loop thread owned
+    by the applier, so the backend's connection outlives the attempt and is reused by the next one.
+    """
+
+    def __init__(self, backend: NetworkBackend, timeout: float = 30.0):
+        """
+        Args:
+            backend (NetworkBackend): Daemon to apply credentials through.
+            timeout (float): Seconds an attempt may take before it is abandoned and undone.
+
+        Raises:
+            ValueError: If timeout is not positive.
+        """
+        if timeout <= 0:
+            raise ValueError("timeout must be positive")
+        self.backend = backend
+        self.timeout = timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.joined = 0
+        self.failed = 0
+        self.timed_out = 0
+
+    async def apply(self, fields: CommissioningFields) -> JoinResult:
+        """
+        Joins the network described by fields and returns the verified outcome. Never raises for
+        a failed join; backend errors and timeouts are reported in JoinResult.error.
+        """
+        logger.info("Joining %s through %s with password %s", fields.ssid, self.backend.name, Secret(fields.password))
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self.backend.join(fields), self.timeout)
+        except asyncio.TimeoutError:
+            result = JoinResult(False, fields.ssid, error=f"not joined within {self.timeout:g}s")
+            with self._lock:
+                self.timed_out += 1
+        except Exception as e:
+            result = JoinResult(False, fields.ssid, error=str(e) or type(e).__name__)
+        elapsed = time.perf_counter() - start
+        result = result._replace(elapsed=elapsed)
+        metrics.observe("join", elapsed)
+        with self._lock:
+            if result.joined:
+                self.joined += 1
+            else:
+                self.failed += 1
+        if result.joined:
+            logger.info("Joined %s in %.2fs, address %s", result.ssid, elapsed, result.address)
+        else:
+            logger.error("Could not join %s: %s", result.ssid, result.error)
+        return result
+
+    async def __call__(self, session) -> bool:
+        """
+        Applies a ready CommissioningSession, so the applier can be passed as CommissioningServer(apply=...).
+        """
+        return (await self.apply(fields_from_params(session.params))).joined
+
+    def apply_blocking(self, fields: CommissioningFields) -> JoinResult:
+        """
+        Runs apply() on the applier's own loop thread and waits for it. Must not be called from that thread.
+        """
+        return asyncio.run_coroutine_threadsafe(self.apply(fields), self._ensure_loop()).result()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="bluebird-network", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "backend": self.backend.name,
+                "joined": self.joined,
+                "failed": self.failed,
+                "timed_out": self.timed_out,
+            }
+
+    async def aclose(self) -> None:
+        """
+        Closes the backend's connection when the applier was only used through apply().
+        """
+        await self.backend.close()
+
+    def close(self) -> None:
+        """
+        Closes the backend's connection on the loop thread started by apply_blocking() and stops that thread.
+        """
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.backend.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+def fields_from_params(params: Dict[str, object]) -> CommissioningFields:
+    """
+    Builds CommissioningFields from a session's parameters, which hold only the fields the central sent.
+    """
+    return CommissioningFields(**{
+        name: params[name] for name in CommissioningFields._fields if params.get(name) is not None
+    })
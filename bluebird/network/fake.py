@@ -0,0 +1,170 @@
+"""
+A stand-in for wpa_supplicant, so WpaSupplicantBackend can be exercised and join latency
+benchmarked without a wireless interface. It needs nothing beyond the standard library; the
+NetworkManager stand-in, which needs dbus and GLib, lives in bluebird.network.fake_nm.
+
+FakeWpaSupplicant joins after join_latency seconds if the credentials match the networks it was
+given (any credentials when none were given) and otherwise marks the network TEMP-DISABLED, as
+wpa_supplicant does for a wrong key. A raw 64 hex digit PSK matches when it is the key derived from
+the network's passphrase.
+
+    supplicant = FakeWpaSupplicant(join_latency=0.5, networks={"home": "hunter22"})
+    await supplicant.start("/tmp/wlan0")
+    WpaSupplicantBackend("/tmp/wlan0")
+"""
+import asyncio
+import hashlib
+import os
+import socket
+import string
+import time
+from typing import Dict, Optional
+
+
+class FakeWpaSupplicant(asyncio.DatagramProtocol):
+    """
+    Answers the subset of the wpa_supplicant control interface that WpaSupplicantBackend uses.
+    """
+
+    def __init__(self, join_latency: float = 0.5, networks: Optional[Dict[str, Optional[str]]] = None):
+        """
+        Args:
+            join_latency (float): Seconds from SELECT_NETWORK until the network is joined or rejected.
+            networks (Optional[Dict[str, Optional[str]]]): Passphrase per SSID in range, None for an open network.
+        """
+        self.join_latency = join_latency
+        self.networks = networks
+        self.country = None
+        self._blocks: Dict[int, Dict[str, str]] = {}
+        self.disabled = set()
+        self._next_id = 0
+        self._selected: Optional[int] = None
+        self._selected_at = 0.0
+        self._transport = None
+        self.path = None
+
+    @property
+    def blocks(self) -> Dict[int, Dict[str, str]]:
+        """
+        A copy of the configured network blocks by network id, with each field as it was set.
+        """
+        return {network_id: dict(block) for network_id, block in self._blocks.items()}
+
+    async def start(self, path: str) -> "FakeWpaSupplicant":
+        if os.path.exists(path):
+            os.unlink(path)
+        self._transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            lambda: self, local_addr=path, family=socket.AF_UNIX,
+        )
+        self.path = path
+        return self
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        if self.path is not None and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def datagram_received(self, data, addr):
+        self._transport.sendto(self.handle(data.decode("utf-8")).encode("utf-8") + b"\n", addr)
+
+    def handle(self, command: str) -> str:
+        name, _, args = command.partition(" ")
+        if name == "PING":
+            return "PONG"
+        if name == "ADD_NETWORK":
+            network_id = self._next_id
+            self._next_id += 1
+            self._blocks[network_id] = {}
+            return str(network_id)
+        if name == "SET_NETWORK":
+            network_id, field, value = args.split(" ", 2)
+            block = self._blocks.get(int(network_id))
+            if block is None or (field == "psk" and not _valid_psk(value)):
+                return "FAIL"
+            block[field] = value
+            return "OK"
+        if name == "SET" and args.startswith("country "):
+            self.country = args.split(" ", 1)[1]
+            return "OK"
+        if name == "SELECT_NETWORK":
+            if int(args) not in self._blocks:
+                return "FAIL"
+            # Like wpa_supplicant, selecting a network disables all the others.
+            self._selected, self._selected_at = int(args), time.monotonic()
+            self.disabled = set(self._blocks) - {self._selected}
+            return "OK"
+        if name == "ENABLE_NETWORK":
+            if int(args) not in self._blocks:
+                return "FAIL"
+            self.disabled.discard(int(args))
+            return "OK"
+        if name == "REMOVE_NETWORK":
+            if self._blocks.pop(int(args), None) is None:
+                return "FAIL"
+            self.disabled.discard(int(args))
+            if self._selected == int(args):
+                self._selected = None
+            return "OK"
+        if name == "STATUS":
+            return self._status()
+        if name == "LIST_NETWORKS":
+            lines = ["network id / ssid / bssid / flags"]
+            for network_id, block in self._blocks.items():
+                flags = "[DISABLED]" if network_id in self.disabled else ""
+                if network_id == self._selected:
+                    flags = {"COMPLETED": "[CURRENT]", "DISABLED": "[TEMP-DISABLED]"}.get(self._state(), "")
+                lines.append(f"{network_id}\t{_ssid(block)}\tany\t{flags}")
+            return "\n".join(lines)
+        if name == "SAVE_CONFIG":
+            return "OK"
+        return "UNKNOWN COMMAND"
+
+    def _state(self) -> str:
+        if self._selected is None:
+            return "DISCONNECTED"
+        if time.monotonic() - self._selected_at < self.join_latency:
+            return "ASSOCIATING"
+        block = self._blocks[self._selected]
+        ssid, psk = _ssid(block), block.get("psk")
+        if self.networks is None:
+            accepted = psk is not None or block.get("key_mgmt") == "NONE"
+        elif ssid not in self.networks:
+            accepted = False
+        elif psk is None:
+            accepted = self.networks[ssid] is None
+        elif psk.startswith('"'):
+            accepted = self.networks[ssid] == psk.strip('"')
+        else:
+            accepted = self.networks[ssid] is not None and psk.lower() == _raw_psk(ssid, self.networks[ssid])
+        return "COMPLETED" if accepted else "DISABLED"
+
+    def _status(self) -> str:
+        state = self._state()
+        if state == "COMPLETED":
+            return "\n".join([
+                "wpa_state=COMPLETED", f"id={self._selected}", f"ssid={_ssid(self._blocks[self._selected])}",
+                f"ip_address=192.0.2.{self._selected % 254 + 1}",
+            ])
+        if state == "DISABLED":
+            return "wpa_state=SCANNING"
+        return f"wpa_state={state}"
+
+
+def _valid_psk(value: str) -> bool:
+    if value.startswith('"'):
+        return 8 <= len(value.strip('"')) <= 63
+    return len(value) == 64 and all(c in string.hexdigits for c in value)
+
+
+def _raw_psk(ssid: str, passphrase: str) -> str:
+    # The WPA2-Personal key derivation: PBKDF2-HMAC-SHA1 over the passphrase, salted with the SSID.
+    return hashlib.pbkdf2_hmac("sha1", passphrase.encode("utf-8"), ssid.encode("utf-8"), 4096, 32).hex()
+
+
+def _ssid(block: Dict[str, str]) -> str:
+    value = block.get("ssid", "")
+    if value.startswith('"'):
+        return value.strip('"')
+    return bytes.fromhex(value).decode("utf-8", "replace")
@@ -0,0 +1,166 @@
+"""
+A stand-in for NetworkManager, so NetworkManagerBackend can be exercised and join latency
+benchmarked without a wireless interface.
+
+FakeNetworkManager owns org.freedesktop.NetworkManager on a (typically private) bus. It activates
+a connection after join_latency seconds if the credentials match the networks it was given (any
+credentials when none were given) and otherwise drops the active connection, as NetworkManager does.
+
+    # with a GLib main loop running
+    FakeNetworkManager(dbus.bus.BusConnection(address), join_latency=0.5)
+    NetworkManagerBackend(bus=dbus.bus.BusConnection(address))
+"""
+from typing import Dict, Optional
+
+import dbus
+import dbus.exceptions
+import dbus.service
+from gi.repository import GLib
+
+from .nm import (
+    ACTIVE_STATE_ACTIVATED, DBUS_PROP_IFACE, DEVICE_TYPE_WIFI, NM_ACTIVE_CONNECTION_IFACE, NM_DEVICE_IFACE, NM_IFACE,
+    NM_IP4CONFIG_IFACE, NM_PATH, NM_SERVICE, NM_SETTINGS_CONNECTION_IFACE, NM_SETTINGS_IFACE, NM_SETTINGS_PATH,
+)
+
+ACTIVE_STATE_ACTIVATING = 1
+ACTIVE_STATE_DEACTIVATED = 4
+
+
+class _PropertiesObject(dbus.service.Object):
+    interface = None
+
+    def __init__(self, bus, path, properties):
+        dbus.service.Object.__init__(self, bus, path)
+        self.path = dbus.ObjectPath(path)
+        self.properties = properties
+
+    @dbus.service.method(DBUS_PROP_IFACE, in_signature="ss", out_signature="v")
+    def Get(self, interface, name):
+        if interface != self.interface or name not in self.properties:
+            raise dbus.exceptions.DBusException("No such property", name="org.freedesktop.DBus.Error.InvalidArgs")
+        return self.properties[name]
+
+    @dbus.service.method(DBUS_PROP_IFACE, in_signature="s", out_signature="a{sv}")
+    def GetAll(self, interface):
+        return dict(self.properties) if interface == self.interface else {}
+
+
+class FakeDevice(_PropertiesObject):
+    interface = NM_DEVICE_IFACE
+
+    def __init__(self, bus, path, name):
+        _PropertiesObject.__init__(self, bus, path, {
+            "DeviceType": dbus.UInt32(DEVICE_TYPE_WIFI),
+            "Interface": dbus.String(name),
+        })
+
+
+class FakeIP4Config(_PropertiesObject):
+    interface = NM_IP4CONFIG_IFACE
+
+    def __init__(self, bus, path, address):
+        _PropertiesObject.__init__(self, bus, path, {
+            "AddressData": dbus.Array([{"address": dbus.String(address), "prefix": dbus.UInt32(24)}], signature="a{sv}"),
+        })
+
+
+class FakeActiveConnection(_PropertiesObject):
+    interface = NM_ACTIVE_CONNECTION_IFACE
+
+    def __init__(self, bus, path, connection):
+        _PropertiesObject.__init__(self, bus, path, {
+            "State": dbus.UInt32(ACTIVE_STATE_ACTIVATING),
+            "Connection": connection,
+            "Ip4Config": dbus.ObjectPath("/"),
+        })
+
+
+class FakeSettingsConnection(dbus.service.Object):
+    def __init__(self, manager, path, settings):
+        dbus.service.Object.__init__(self, manager.bus, path)
+        self.manager = manager
+        self.path = dbus.ObjectPath(path)
+        self.settings = settings
+
+    @dbus.service.method(NM_SETTINGS_CONNECTION_IFACE, out_signature="a{sa{sv}}")
+    def GetSettings(self):
+        # Like NetworkManager, secrets are never returned.
+        return {group: values for group, values in self.settings.items() if group != "802-11-wireless-security"}
+
+    @dbus.service.method(NM_SETTINGS_CONNECTION_IFACE, in_signature="a{sa{sv}}")
+    def Update(self, settings):
+        self.settings = settings
+
+    @dbus.service.method(NM_SETTINGS_CONNECTION_IFACE)
+    def Delete(self):
+        self.manager.connections.pop(self.path, None)
+        self.remove_from_connection()
+
+
+class FakeSettings(dbus.service.Object):
+    def __init__(self, manager):
+        dbus.service.Object.__init__(self, manager.bus, NM_SETTINGS_PATH)
+        self.manager = manager
+
+    @dbus.service.method(NM_SETTINGS_IFACE, out_signature="ao")
+    def ListConnections(self):
+        return dbus.Array(list(self.manager.connections), signature="o")
+
+
+class FakeNetworkManager(dbus.service.Object):
+    """
+    Owns org.freedesktop.NetworkManager on the given bus with one Wi-Fi device. Activations are
+    completed from GLib timeouts, so a GLib main loop must run in the process owning the fake.
+    """
+
+    def __init__(self, bus, join_latency: float = 0.5, networks: Optional[Dict[str, Optional[str]]] = None,
+                 interface: str = "wlan0"):
+        """
+        Args:
+            bus: D-Bus connection to publish the service on, typically a private bus.
+            join_latency (float): Seconds from AddAndActivateConnection until the connection is activated or dropped.
+            networks (Optional[Dict[str, Optional[str]]]): Passphrase per SSID in range, None for an open network.
+            interface (str): Name of the Wi-Fi device.
+        """
+        self.bus = bus
+        self._name = dbus.service.BusName(NM_SERVICE, bus)
+        dbus.service.Object.__init__(self, bus, NM_PATH)
+        self.join_latency = join_latency
+        self.networks = networks
+        self.device = FakeDevice(bus, NM_PATH + "/Devices/1", interface)
+        self.settings = FakeSettings(self)
+        self.connections: Dict[dbus.ObjectPath, FakeSettingsConnection] = {}
+        self._next_id = 0
+        self.joined = 0
+        self.rejected = 0
+
+    @dbus.service.method(NM_IFACE, out_signature="ao")
+    def GetDevices(self):
+        return dbus.Array([self.device.path], signature="o")
+
+    @dbus.service.method(NM_IFACE, in_signature="a{sa{sv}}oo", out_signature="oo")
+    def AddAndActivateConnection(self, settings, device, specific_object):
+        if device != self.device.path:
+            raise dbus.exceptions.DBusException("Unknown device", name=NM_IFACE + ".UnknownDevice")
+        self._next_id += 1
+        connection = FakeSettingsConnection(self, f"{NM_SETTINGS_PATH}/{self._next_id}", settings)
+        self.connections[connection.path] = connection
+        active = FakeActiveConnection(self.bus, f"{NM_PATH}/ActiveConnection/{self._next_id}", connection.path)
+        GLib.timeout_add(int(self.join_latency * 1000), self._complete, active, settings)
+        return connection.path, active.path
+
+    def _complete(self, active, settings):
+        ssid = bytes(settings["802-11-wireless"]["ssid"]).decode("utf-8", "replace")
+        password = settings.get("802-11-wireless-security", {}).get("psk")
+        password = str(password) if password is not None else None
+        if self.networks is None or (ssid in self.networks and self.networks[ssid] == password):
+            self.joined += 1
+            config = FakeIP4Config(self.bus, f"{NM_PATH}/IP4Config/{self._next_id}", f"192.0.2.{self._next_id % 254 + 1}")
+            active.properties["Ip4Config"] = config.path
+            active.properties["State"] = dbus.UInt32(ACTIVE_STATE_ACTIVATED)
+        else:
+            # NetworkManager removes a connection's active object once activation has failed.
+            self.rejected += 1
+            active.properties["State"] = dbus.UInt32(ACTIVE_STATE_DEACTIVATED)
+            active.remove_from_connection()
+        return False
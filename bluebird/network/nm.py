@@ -0,0 +1,170 @@
+import asyncio
+import ipaddress
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import dbus
+import dbus.exceptions
+
+from bluebird.util import CommissioningFields
+from .apply import JoinResult, NetworkBackend
+
+logger = logging.getLogger(__name__)
+
+NM_SERVICE = "org.freedesktop.NetworkManager"
+NM_PATH = "/org/freedesktop/NetworkManager"
+NM_SETTINGS_PATH = "/org/freedesktop/NetworkManager/Settings"
+NM_IFACE = NM_SERVICE
+NM_DEVICE_IFACE = NM_SERVICE + ".Device"
+NM_SETTINGS_IFACE = NM_SERVICE + ".Settings"
+NM_SETTINGS_CONNECTION_IFACE = NM_SERVICE + ".Settings.Connection"
+NM_ACTIVE_CONNECTION_IFACE = NM_SERVICE + ".Connection.Active"
+NM_IP4CONFIG_IFACE = NM_SERVICE + ".IP4Config"
+DBUS_PROP_IFACE = "org.freedesktop.DBus.Properties"
+
+DEVICE_TYPE_WIFI = 2
+ACTIVE_STATE_ACTIVATED = 2
+ACTIVE_STATE_DEACTIVATING = 3
+
+
+class NetworkManagerBackend(NetworkBackend):
+    """
+    Joins networks through NetworkManager's D-Bus API, as nmcli does, over one system bus
+    connection and proxy kept for every attempt instead of a new nmcli process per attempt.
+
+    A join adds and activates a new connection on the Wi-Fi device under a temporary name and
+    polls the active connection until NetworkManager reports it activated, i.e. associated and
+    addressed, or gives up on it. Only a verified join replaces saved connections with the same
+    name and renames the new one to the SSID; connections that fail or are abandoned are deleted
+    again, leaving the saved profiles as they were.
+
+    The blocking D-Bus calls run on one dedicated thread so they never stall the event loop and
+    stay serialized on the shared connection. NetworkManager has no per-connection regulatory
+    domain, so a country field is left to the system configuration.
+    """
+    name = "networkmanager"
+
+    def __init__(self, bus=None, interface: Optional[str] = None, poll_interval: float = 0.25):
+        """
+        Args:
+            bus: D-Bus connection NetworkManager is on. Defaults to the system bus.
+            interface (Optional[str]): Wireless interface to use, e.g. "wlan0". Defaults to the first Wi-Fi device.
+            poll_interval (float): Seconds between state polls while activating.
+        """
+        self._bus = bus if bus is not None else dbus.SystemBus()
+        self._nm = dbus.Interface(self._bus.get_object(NM_SERVICE, NM_PATH), NM_IFACE)
+        self._settings = dbus.Interface(self._bus.get_object(NM_SERVICE, NM_SETTINGS_PATH), NM_SETTINGS_IFACE)
+        self.interface = interface
+        self.poll_interval = poll_interval
+        self._device: Optional[dbus.ObjectPath] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bluebird-nm")
+
+    async def _call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _get(self, path, interface: str, name: str):
+        return self._bus.get_object(NM_SERVICE, path).Get(interface, name, dbus_interface=DBUS_PROP_IFACE)
+
+    def _wifi_device(self) -> dbus.ObjectPath:
+        if self._device is None:
+            for path in self._nm.GetDevices():
+                if self._get(path, NM_DEVICE_IFACE, "DeviceType") != DEVICE_TYPE_WIFI:
+                    continue
+                if self.interface is None or str(self._get(path, NM_DEVICE_IFACE, "Interface")) == self.interface:
+                    self._device = path
+                    break
+            else:
+                raise RuntimeError(f"NetworkManager has no Wi-Fi device {self.interface or ''}".rstrip())
+        return self._device
+
+    def _activate(self, settings) -> Tuple[dbus.ObjectPath, dbus.ObjectPath]:
+        return self._nm.AddAndActivateConnection(settings, self._wifi_device(), dbus.ObjectPath("/"))
+
+    def _promote(self, ssid: str, settings, path: dbus.ObjectPath) -> None:
+        # Rename first: if replacing fails, a duplicate is left behind rather than no profile.
+        try:
+            settings["connection"]["id"] = ssid
+            self._bus.get_object(NM_SERVICE, path).Update(settings, dbus_interface=NM_SETTINGS_CONNECTION_IFACE)
+            for other in self._settings.ListConnections():
+                if other == path:
+                    continue
+                connection = dbus.Interface(self._bus.get_object(NM_SERVICE, other), NM_SETTINGS_CONNECTION_IFACE)
+                if str(connection.GetSettings()["connection"]["id"]) == ssid:
+                    logger.debug("Replacing saved connection %s", other)
+                    connection.Delete()
+        except dbus.exceptions.DBusException as e:
+            logger.warning("Joined %s but could not replace its saved connections: %s", ssid, e)
+
+    def _state(self, active: dbus.ObjectPath) -> int:
+        try:
+            return int(self._get(active, NM_ACTIVE_CONNECTION_IFACE, "State"))
+        except dbus.exceptions.DBusException:
+            # NetworkManager drops the active connection object once activation has failed.
+            return ACTIVE_STATE_DEACTIVATING
+
+    def _address(self, active: dbus.ObjectPath) -> Optional[str]:
+        config = self._get(active, NM_ACTIVE_CONNECTION_IFACE, "Ip4Config")
+        if config == "/":
+            return None
+        addresses = self._get(config, NM_IP4CONFIG_IFACE, "AddressData")
+        return str(addresses[0]["address"]) if addresses else None
+
+    def _delete(self, path: dbus.ObjectPath) -> None:
+        try:
+            self._bus.get_object(NM_SERVICE, path).Delete(dbus_interface=NM_SETTINGS_CONNECTION_IFACE)
+        except dbus.exceptions.DBusException as e:
+            logger.warning("Could not delete connection %s: %s", path, e)
+
+    async def join(self, fields: CommissioningFields) -> JoinResult:
+        if fields.country is not None:
+            logger.debug("Country %s left to the system's regulatory domain", fields.country)
+        settings = _connection_settings(fields)
+        path, active = await self._call(self._activate, settings)
+        try:
+            while True:
+                state = await self._call(self._state, active)
+                if state == ACTIVE_STATE_ACTIVATED:
+                    break
+                if state >= ACTIVE_STATE_DEACTIVATING:
+                    await self._call(self._delete, path)
+                    return JoinResult(False, fields.ssid, error="NetworkManager could not activate the connection")
+                await asyncio.sleep(self.poll_interval)
+        except BaseException:
+            await asyncio.shield(self._call(self._delete, path))
+            raise
+        await self._call(self._promote, fields.ssid, settings, path)
+        return JoinResult(True, fields.ssid, address=await self._call(self._address, active))
+
+    async def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+def _connection_settings(fields: CommissioningFields) -> Dict[str, Dict[str, object]]:
+    connection_uuid = str(uuid.uuid4())
+    settings = {
+        # Renamed to the SSID once the join is verified, so a failed attempt never shadows a saved profile.
+        "connection": {"id": f"{fields.ssid} (bluebird {connection_uuid[:8]})", "uuid": connection_uuid,
+                       "type": "802-11-wireless"},
+        "802-11-wireless": {
+            "ssid": dbus.ByteArray(fields.ssid.encode("utf-8")),
+            "mode": "infrastructure",
+            "hidden": dbus.Boolean(fields.hidden),
+        },
+        "ipv4": {"method": "auto"},
+        "ipv6": {"method": "auto"},
+    }
+    if fields.password:
+        settings["802-11-wireless-security"] = {"key-mgmt": "wpa-psk", "psk": fields.password}
+    if fields.static_ip is not None:
+        interface = ipaddress.ip_interface(fields.static_ip)
+        settings["ipv4" if interface.version == 4 else "ipv6"] = {
+            "method": "manual",
+            "address-data": _address_data(str(interface.ip), interface.network.prefixlen),
+        }
+    return settings
+
+
+def _address_data(address: str, prefix: int) -> List[Dict[str, object]]:
+    return dbus.Array([{"address": dbus.String(address), "prefix": dbus.UInt32(prefix)}], signature="a{sv}")
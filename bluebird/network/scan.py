@@ -0,0 +1,252 @@
+import json
+import logging
+import shutil
+import struct
+import subprocess
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from bluebird.ble.reassembly import ATT_MAX_VALUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+BLOB_VERSION = 1
+FLAG_SECURED = 0x01
+MAX_SSID_BYTES = 32
+MAX_ENTRIES = 255
+
+
+class AccessPoint(NamedTuple):
+    """
+    One network seen by a scan.
+
+    Attributes:
+        ssid (str): Network name.
+        signal (int): Signal strength in percent (0-100).
+        secured (bool): Whether the network requires credentials.
+    """
+    ssid: str
+    signal: int
+    secured: bool = True
+
+
+class ScanDiff(NamedTuple):
+    """
+    Change between two consecutive cache states, keyed by SSID.
+    """
+    added: List[AccessPoint]
+    removed: List[AccessPoint]
+    changed: List[AccessPoint]
+
+
+class ScanSource:
+    """
+    Produces the networks currently in range. Subclasses replace the radio, e.g. FileScanSource in tests.
+    """
+
+    def scan(self) -> List[AccessPoint]:
+        raise NotImplementedError
+
+
+class FileScanSource(ScanSource):
+    """
+    Reads networks from a JSON file holding a list of {"ssid", "signal", "secured"} objects.
+    The file is re-read on every scan, so tests can change it between scans.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def scan(self) -> List[AccessPoint]:
+        with open(self.path) as f:
+            entries = json.load(f)
+        return [AccessPoint(e["ssid"], int(e["signal"]), bool(e.get("secured", True))) for e in entries]
+
+
+class NmcliScanSource(ScanSource):
+    """
+    Asks NetworkManager for its latest scan results through nmcli.
+    """
+
+    def __init__(self, rescan: bool = True, timeout: float = 15.0):
+        self.rescan = rescan
+        self.timeout = timeout
+
+    def scan(self) -> List[AccessPoint]:
+        output = subprocess.run(
+            ["nmcli", "-t", "-f", "SSID,SIGNAL,SECURITY", "device", "wifi", "list",
+             "--rescan", "yes" if self.rescan else "no"],
+            capture_output=True, text=True, check=True, timeout=self.timeout,
+        ).stdout
+        access_points = []
+        for line in output.splitlines():
+            # nmcli -t escapes ":" inside fields as "\:"
+            fields = line.replace("\\:", "\0").split(":")
+            if len(fields) < 3 or not fields[0]:
+                continue
+            ssid, signal, security = (field.replace("\0", ":") for field in fields[:3])
+            access_points.append(AccessPoint(ssid, int(signal or 0), security not in ("", "--")))
+        return access_points
+
+    @staticmethod
+    def available() -> bool:
+        return shutil.which("nmcli") is not None
+
+
+def encode_access_points(access_points: Iterable[AccessPoint], max_size: int = ATT_MAX_VALUE_SIZE) -> bytes:
+    """
+    Encodes networks into the blob served by AvaliableSsidsCharacteristic:
+
+        version (1) | count (1) | count * [ssid length (1) | ssid (utf-8) | signal (1) | flags (1)]
+
+    SSIDs longer than 32 bytes are truncated and at most 255 entries are kept. BlueZ cannot
+    serve a value past the 512 byte ATT limit, so the blob is kept within max_size by dropping
+    the weakest networks; the rest keep their order.
+    """
+    access_points = list(access_points)
+    entries = []
+    for ap in access_points:
+        ssid = ap.ssid.encode("utf-8")[:MAX_SSID_BYTES]
+        entries.append(struct.pack("B", len(ssid)) + ssid + struct.pack(
+            "BB", max(0, min(100, ap.signal)), FLAG_SECURED if ap.secured else 0
+        ))
+    kept = set()
+    size = 2
+    for index in sorted(range(len(entries)), key=lambda i: -access_points[i].signal):
+        if len(kept) == MAX_ENTRIES or size + len(entries[index]) > max_size:
+            break
+        kept.add(index)
+        size += len(entries[index])
+    entries = [entry for index, entry in enumerate(entries) if index in kept]
+    return struct.pack("BB", BLOB_VERSION, len(entries)) + b"".join(entries)
+
+
+def decode_access_points(blob: bytes) -> List[AccessPoint]:
+    """
+    Inverse of encode_access_points, for clients and tests.
+
+    Raises:
+        ValueError: If the blob is truncated or has an unknown version.
+    """
+    if len(blob) < 2 or blob[0] != BLOB_VERSION:
+        raise ValueError("Unsupported SSID list blob")
+    access_points = []
+    offset = 2
+    for _ in range(blob[1]):
+        if offset >= len(blob):
+            raise ValueError("Truncated SSID list blob")
+        length = blob[offset]
+        end = offset + 1 + length
+        if end + 2 > len(blob):
+            raise ValueError("Truncated SSID list blob")
+        ssid = blob[offset + 1:end].decode("utf-8", errors="replace")
+        access_points.append(AccessPoint(ssid, blob[end], bool(blob[end + 1] & FLAG_SECURED)))
+        offset = end + 2
+    return access_points
+
+
+class WifiScanCache:
+    """
+    Keeps the latest Wi-Fi scan in memory, refreshed by a background thread.
+
+    Each scan is merged into the cache: networks are deduplicated by SSID keeping the strongest
+    signal, networks not seen for ttl seconds are dropped, and the result is sorted by signal and
+    encoded once. Readers get the prebuilt blob without touching the radio. Subscribers receive a
+    ScanDiff whenever the set of networks changes; they are called on the scanner thread.
+    """
+
+    def __init__(self, source: ScanSource, interval: float = 30.0, ttl: float = 90.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.source = source
+        self.interval = interval
+        self.ttl = ttl
+        self._clock = clock
+        self._seen: Dict[str, float] = {}
+        self._access_points: Dict[str, AccessPoint] = {}
+        self._sorted: List[AccessPoint] = []
+        self._blob = encode_access_points([])
+        self._subscribers: List[Callable[[ScanDiff], None]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.scans = 0
+        self.errors = 0
+
+    @property
+    def blob(self) -> bytes:
+        return self._blob
+
+    @property
+    def access_points(self) -> List[AccessPoint]:
+        return self._sorted
+
+    def subscribe(self, callback: Callable[[ScanDiff], None]) -> None:
+        self._subscribers.append(callback)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="bluebird-wifi-scan", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def refresh(self) -> Optional[ScanDiff]:
+        """
+        Runs one scan and merges it. Returns the diff, or None if nothing changed or the scan failed.
+        """
+        try:
+            scanned = self.source.scan()
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Wi-Fi scan failed: %s", e)
+            return None
+        self.scans += 1
+        return self.merge(scanned)
+
+    def merge(self, scanned: Iterable[AccessPoint]) -> Optional[ScanDiff]:
+        now = self._clock()
+        strongest: Dict[str, AccessPoint] = {}
+        for ap in scanned:
+            if ap.ssid and (ap.ssid not in strongest or ap.signal > strongest[ap.ssid].signal):
+                strongest[ap.ssid] = ap
+
+        with self._lock:
+            previous = self._access_points
+            current = dict(previous)
+            for ssid, ap in strongest.items():
+                current[ssid] = ap
+                self._seen[ssid] = now
+            for ssid in [s for s, seen in self._seen.items() if now - seen > self.ttl]:
+                del self._seen[ssid]
+                current.pop(ssid, None)
+
+            diff = ScanDiff(
+                added=[ap for ssid, ap in current.items() if ssid not in previous],
+                removed=[ap for ssid, ap in previous.items() if ssid not in current],
+                changed=[ap for ssid, ap in current.items() if ssid in previous and previous[ssid] != ap],
+            )
+            if not (diff.added or diff.removed or diff.changed):
+                return None
+
+            self._access_points = current
+            self._sorted = sorted(current.values(), key=lambda ap: (-ap.signal, ap.ssid))
+            self._blob = encode_access_points(self._sorted)
+
+        for callback in self._subscribers:
+            try:
+                callback(diff)
+            except Exception as e:
+                logger.warning("Wi-Fi scan subscriber failed: %s", e)
+        return diff
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
@@ -0,0 +1,243 @@
+import asyncio
+import itertools
+import logging
+import os
+import socket
+import string
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+from bluebird.util import CommissioningFields
+from .apply import JoinResult, NetworkBackend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CTRL_PATH = "/var/run/wpa_supplicant/wlan0"
+
+_local_paths = itertools.count()
+
+
+class _ControlProtocol(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.replies: asyncio.Queue = asyncio.Queue()
+
+    def datagram_received(self, data, addr):
+        # Unsolicited events start with "<level>" and only arrive after ATTACH, which is never sent.
+        if not data.startswith(b"<"):
+            self.replies.put_nowait(data)
+
+    def error_received(self, exc):
+        self.replies.put_nowait(exc)
+
+
+class WpaSupplicantBackend(NetworkBackend):
+    """
+    Joins networks through the wpa_supplicant control interface of one wireless interface.
+
+    The control socket is opened on first use and kept for every later attempt. A join adds a
+    network block, selects it and polls STATUS until the supplicant has completed association and
+    key negotiation with it. A network the supplicant temporarily disables, e.g. for a wrong key,
+    fails the attempt right away. Failed or abandoned attempts remove their network block again.
+    SELECT_NETWORK disables every other network, so the networks that were enabled before are
+    enabled again afterwards, whether the join worked or not.
+
+    wpa_supplicant does not configure addresses, so a static_ip field is not applied here; the
+    country code is applied with SET country. A password of 64 hex digits is passed on as the raw
+    PSK; any other password must be an 8 to 63 character passphrase.
+    """
+    name = "wpa_supplicant"
+
+    def __init__(self, ctrl_path: str = DEFAULT_CTRL_PATH, poll_interval: float = 0.25,
+                 command_timeout: float = 5.0, require_address: bool = False, save_config: bool = True):
+        """
+        Args:
+            ctrl_path (str): The interface's control socket, e.g. /var/run/wpa_supplicant/wlan0.
+            poll_interval (float): Seconds between STATUS polls while joining.
+            command_timeout (float): Seconds to wait for the reply to one command.
+            require_address (bool): Also wait until STATUS reports an IP address, e.g. from dhcpcd.
+            save_config (bool): Persist a joined network with SAVE_CONFIG.
+        """
+        self.ctrl_path = ctrl_path
+        self.poll_interval = poll_interval
+        self.command_timeout = command_timeout
+        self.require_address = require_address
+        self.save_config = save_config
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._protocol: Optional[_ControlProtocol] = None
+        self._local_path: Optional[str] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def _connect(self) -> None:
+        path = os.path.join(tempfile.gettempdir(), f"bluebird-wpa-{os.getpid()}-{next(_local_paths)}")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            if os.path.exists(path):
+                os.unlink(path)
+            # The supplicant replies to the sender's address, so the client socket needs a path too.
+            sock.bind(path)
+            sock.connect(self.ctrl_path)
+            sock.setblocking(False)
+        except OSError:
+            sock.close()
+            if os.path.exists(path):
+                os.unlink(path)
+            raise
+        loop = asyncio.get_running_loop()
+        self._transport, self._protocol = await loop.create_datagram_endpoint(_ControlProtocol, sock=sock)
+        self._local_path = path
+        logger.debug("Connected to wpa_supplicant at %s", self.ctrl_path)
+
+    async def command(self, command: str) -> str:
+        """
+        Sends one control command and returns its reply without the trailing newline.
+
+        Raises:
+            ConnectionError: If the supplicant did not answer within command_timeout.
+            OSError: If the control socket cannot be reached.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._transport is None:
+                await self._connect()
+            replies = self._protocol.replies
+            while not replies.empty():
+                replies.get_nowait()
+            self._transport.sendto(command.encode("utf-8"))
+            # Not wait_for: before Python 3.12 it can swallow the applier's cancellation when the
+            # reply arrives at the same moment, and the join would carry on past its timeout.
+            getter = asyncio.ensure_future(replies.get())
+            try:
+                done, _ = await asyncio.wait({getter}, timeout=self.command_timeout)
+            except asyncio.CancelledError:
+                getter.cancel()
+                # The reply may still arrive and would be taken for the next command's.
+                self._disconnect()
+                raise
+            if not done:
+                getter.cancel()
+                # A late reply would be taken for the next command's, so start over with a new socket.
+                self._disconnect()
+                raise ConnectionError(f"wpa_supplicant did not answer {command.split()[0]}")
+            reply = getter.result()
+            if isinstance(reply, Exception):
+                self._disconnect()
+                raise reply
+            return reply.decode("utf-8", "replace").rstrip("\n")
+
+    async def _expect_ok(self, command: str) -> None:
+        reply = await self.command(command)
+        if reply != "OK":
+            # Up to the field name only; a psk value must not end up in the error.
+            raise RuntimeError(f"wpa_supplicant refused {' '.join(command.split()[:3])}: {reply}")
+
+    async def status(self) -> Dict[str, str]:
+        return _parse_status(await self.command("STATUS"))
+
+    async def join(self, fields: CommissioningFields) -> JoinResult:
+        # Checked before anything is changed, so a bad password leaves no network block behind.
+        psk = _psk(fields.password) if fields.password else None
+        if fields.static_ip is not None:
+            logger.warning("wpa_supplicant does not configure addresses, static IP %s not applied", fields.static_ip)
+        if fields.country is not None:
+            await self._expect_ok(f"SET country {fields.country.upper()}")
+        enabled = [network_id for network_id, flags in await self._list_networks() if "[DISABLED]" not in flags]
+        reply = await self.command("ADD_NETWORK")
+        if not reply.isdigit():
+            raise RuntimeError(f"wpa_supplicant could not add a network: {reply}")
+        network_id = reply
+        try:
+            await self._configure(network_id, fields, psk)
+            await self._expect_ok(f"SELECT_NETWORK {network_id}")
+            status = await self._wait_completed(network_id)
+        except BaseException:
+            await self._remove(network_id)
+            await self._enable(enabled)
+            raise
+        await self._enable(enabled)
+        if status is None:
+            await self._remove(network_id)
+            return JoinResult(False, fields.ssid, error="network rejected the credentials")
+        if self.save_config:
+            reply = await self.command("SAVE_CONFIG")
+            if reply != "OK":
+                logger.warning("Joined %s but could not save the configuration: %s", fields.ssid, reply)
+        return JoinResult(True, fields.ssid, address=status.get("ip_address"))
+
+    async def _configure(self, network_id: str, fields: CommissioningFields, psk: Optional[str]) -> None:
+        # Hex leaves SSIDs with quotes or non-ASCII characters unambiguous.
+        await self._expect_ok(f"SET_NETWORK {network_id} ssid {fields.ssid.encode('utf-8').hex()}")
+        if psk is not None:
+            await self._expect_ok(f"SET_NETWORK {network_id} psk {psk}")
+        else:
+            await self._expect_ok(f"SET_NETWORK {network_id} key_mgmt NONE")
+        if fields.hidden:
+            await self._expect_ok(f"SET_NETWORK {network_id} scan_ssid 1")
+
+    async def _wait_completed(self, network_id: str) -> Optional[Dict[str, str]]:
+        while True:
+            status = await self.status()
+            if status.get("wpa_state") == "COMPLETED" and status.get("id") == network_id:
+                if not self.require_address or status.get("ip_address"):
+                    return status
+            elif await self._temp_disabled(network_id):
+                return None
+            await asyncio.sleep(self.poll_interval)
+
+    async def _list_networks(self) -> List[Tuple[str, str]]:
+        """
+        Returns (network id, flags) for every configured network.
+        """
+        networks = []
+        for line in (await self.command("LIST_NETWORKS")).splitlines()[1:]:
+            columns = line.split("\t")
+            networks.append((columns[0], columns[3] if len(columns) > 3 else ""))
+        return networks
+
+    async def _temp_disabled(self, network_id: str) -> bool:
+        return any(n == network_id and "TEMP-DISABLED" in flags for n, flags in await self._list_networks())
+
+    async def _enable(self, network_ids: List[str]) -> None:
+        for network_id in network_ids:
+            try:
+                await self.command(f"ENABLE_NETWORK {network_id}")
+            except (OSError, ConnectionError) as e:
+                logger.warning("Could not re-enable network %s: %s", network_id, e)
+
+    async def _remove(self, network_id: str) -> None:
+        try:
+            await self.command(f"REMOVE_NETWORK {network_id}")
+        except (OSError, ConnectionError) as e:
+            logger.warning("Could not remove network %s: %s", network_id, e)
+
+    def _disconnect(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = self._protocol = None
+        if self._local_path is not None:
+            try:
+                os.unlink(self._local_path)
+            except FileNotFoundError:
+                pass
+            self._local_path = None
+
+    async def close(self) -> None:
+        self._disconnect()
+
+
+def _psk(password: str) -> str:
+    """
+    Returns the psk value for SET_NETWORK: 64 hex digits unquoted as the raw key, a passphrase quoted.
+
+    Raises:
+        ValueError: If the password is neither 64 hex digits nor an 8 to 63 character passphrase.
+    """
+    if len(password) == 64 and all(c in string.hexdigits for c in password):
+        return password
+    if not 8 <= len(password.encode("utf-8")) <= 63:
+        raise ValueError("password must be an 8 to 63 character passphrase or a 64 hex digit PSK")
+    return f'"{password}"'
+
+
+def _parse_status(reply: str) -> Dict[str, str]:
+    return dict(line.split("=", 1) for line in reply.splitlines() if "=" in line)
@@ -1 +1,16 @@
-from .crypto import ServerExchangeHandler
\ No newline at end of file
+from .._lazy import lazy_attributes
+
+__all__ = ["ServerExchangeHandler", "DecryptResult", "KeyPairPool", "SessionKeyCache", "ReplayGuard", "ReplayedPayloadError", "AdmissionControl", "AdmissionError", "CommissioningServer", "TicketIssuer", "InvalidTicketError"]
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    "ServerExchangeHandler": ".crypto",
+    "DecryptResult": ".crypto",
+    "KeyPairPool": ".keypool",
+    "SessionKeyCache": ".cache",
+    "ReplayGuard": ".replay",
+    "ReplayedPayloadError": ".replay",
+    "AdmissionControl": ".admission",
+    "AdmissionError": ".admission",
+    "CommissioningServer": ".transport",
+    "TicketIssuer": ".resumption",
+    "InvalidTicketError": ".resumption",
+})
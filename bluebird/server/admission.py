@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict
+from bluebird.util import CurveType, CURVE_INFO
+
+# u = 0 and u = 1 are small-order points on both curves; no honest key encodes to them.
+_SMALL_ORDER_PREFIXES = (0x00, 0x01)
+
+
+class AdmissionError(ValueError):
+    """
+    Raised when a payload is shed before decryption.
+
+    Attributes:
+        reason (str): "length", "format", "rate" or "concurrency".
+    """
+
+    def __init__(self, reason: str, message: str):
+        ValueError.__init__(self, message)
+        self.reason = reason
+
+
+class _Ticket:
+    __slots__ = ("_admission",)
+
+    def __init__(self, admission):
+        self._admission = admission
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    def release(self):
+        if self._admission is not None:
+            self._admission._release()
+            self._admission = None
+
+
+class AdmissionControl:
+    """
+    Front door in front of ServerExchangeHandler.decrypt_payload, so malformed or flooding
+    traffic is shed before any elliptic-curve math.
+
+    In order, admit() checks the payload length for the curve, rejects small-order public key
+    encodings, spends a token from the sending device's bucket (rate tokens per second, up to
+    burst), and enforces a global cap on payloads being decrypted at once. Shed and accepted counts
+    are available from stats().
+
+        with admission.admit(device_path, payload):
+            plaintext = server.decrypt_payload(payload)
+    """
+
+    def __init__(self, curve_type: CurveType, rate: float = 0.5, burst: int = 3, max_in_flight: int = 2,
+                 max_payload_size: int = 512, max_devices: int = 256, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            curve_type (CurveType): Curve the server expects payloads for.
+            rate (float): Tokens added to each device's bucket per second.
+            burst (int): Bucket size, i.e. payloads a device may send back to back.
+            max_in_flight (int): Payloads admitted but not yet released, across all devices.
+            max_payload_size (int): Largest payload accepted, in bytes.
+            max_devices (int): Buckets kept; the least recently seen device is forgotten first.
+            clock (Callable[[], float]): Monotonic time source, replaceable for testing.
+
+        Raises:
+            ValueError: If the curve type is unsupported.
+        """
+        if curve_type not in CURVE_INFO:
+            raise ValueError("Unsupported CurveType. Select either X25519 or X448")
+        self.curve_info = CURVE_INFO[curve_type]
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.max_payload_size = max_payload_size
+        self.max_devices = max_devices
+        self._clock = clock
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.accepted = 0
+        self.shed = {"length": 0, "format": 0, "rate": 0, "concurrency": 0}
+
+    def admit(self, device: str, payload) -> _Ticket:
+        """
+        Admits one payload or raises. The returned ticket must be released (or used as a context
+        manager) once decryption has finished.
+
+        Raises:
+            AdmissionError: If the payload is shed; reason says which check failed.
+        """
+        info = self.curve_info
+        size = len(payload)
+        if size < info.min_payload_size or size > self.max_payload_size:
+            self._shed("length", f"Payload of {size} bytes outside {info.min_payload_size}-{self.max_payload_size}")
+        key = memoryview(payload)[:info.public_key_size]
+        if key[0] in _SMALL_ORDER_PREFIXES and not any(key[1:]):
+            self._shed("format", "Client public key is a small-order point")
+
+        with self._lock:
+            now = self._clock()
+            bucket = self._buckets.get(device)
+            if bucket is None:
+                bucket = self._buckets[device] = [float(self.burst), now]
+                if len(self._buckets) > self.max_devices:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(device)
+                bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] < 1.0:
+                self.shed["rate"] += 1
+                raise AdmissionError("rate", f"Rate limit exceeded for {device}")
+            if self._in_flight >= self.max_in_flight:
+                self.shed["concurrency"] += 1
+                raise AdmissionError("concurrency", "Too many payloads being decrypted")
+            bucket[0] -= 1.0
+            self._in_flight += 1
+            self.accepted += 1
+        return _Ticket(self)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _shed(self, reason: str, message: str) -> None:
+        with self._lock:
+            self.shed[reason] += 1
+        raise AdmissionError(reason, message)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "accepted": self.accepted,
+                "shed": dict(self.shed),
+                "in_flight": self._in_flight,
+                "devices": len(self._buckets),
+            }
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+
+class SessionKeyCache:
+    """
+    A bounded cache from (server public key, client public key) to the AES key derived for them.
+
+    Entries are evicted least recently used first once max_size is reached and expire ttl
+    seconds after they were stored. A retried payload from the same client public key then
+    skips both the ECDH exchange and HKDF. Keying on the server public key as well means a
+    derivation that finishes after the server key pair rotated can never be served under the
+    new pair. ServerExchangeHandler.generate_key_pair still clears the cache on rotation so
+    the dead entries do not hold slots.
+    """
+
+    def __init__(self, max_size: int = 64, ttl: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Initializes an empty cache.
+
+        Args:
+            max_size (int): Maximum number of cached keys.
+            ttl (float): Seconds an entry stays valid after it was stored.
+            clock (Callable[[], float]): Monotonic time source, replaceable for testing.
+
+        Raises:
+            ValueError: If max_size is less than 1 or ttl is not positive.
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[bytes, bytes], Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, client_public_key: bytes, server_public_key: bytes = b"") -> Optional[bytes]:
+        """
+        Looks up the derived key for a client public key under a server public key.
+
+        Args:
+            client_public_key (bytes): The raw client public key.
+            server_public_key (bytes): The raw server public key the key was derived under.
+
+        Returns:
+            Optional[bytes]: The derived AES key, or None if it is not cached or has expired.
+        """
+        key = (server_public_key, client_public_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > self._clock():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry[1]
+                del self._entries[key]
+            self._misses += 1
+            return None
+
+    def put(self, client_public_key: bytes, derived_key: bytes, server_public_key: bytes = b"") -> None:
+        """
+        Stores the derived key for a client public key, evicting the least recently used entry if full.
+
+        Args:
+            client_public_key (bytes): The raw client public key.
+            derived_key (bytes): The AES key derived for it.
+            server_public_key (bytes): The raw server public key it was derived under.
+        """
+        key = (server_public_key, client_public_key)
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, derived_key)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Drops every cached key.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the cache counters.
+
+        Returns:
+            Dict[str, int]: "hits", "misses" and "size".
+        """
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "size": len(self._entries)}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,152 @@
+import threading
+from collections import deque
+from cryptography.hazmat.primitives.asymmetric.x25519 import X25519PrivateKey
+from cryptography.hazmat.primitives.asymmetric.x448 import X448PrivateKey
+from bluebird.util import CurveType
+from typing import Deque, Dict, Optional, Union, Tuple
+
+_PRIVATE_CURVE_TYPES = {
+    CurveType.CURVE25519: X25519PrivateKey,
+    CurveType.CURVE448: X448PrivateKey,
+}
+
+
+class KeyPairPool:
+    """
+    A bounded pool of pre-generated server key pairs that is refilled by a background thread.
+
+    Taking a key pair from the pool is an O(1) pop, so rotating the server key after a failed
+    commissioning attempt does not pay for key generation on the D-Bus handler path. If the pool
+    for a curve is empty the key pair is generated synchronously and counted as a miss.
+    """
+
+    def __init__(self, depths: Dict[CurveType, int]):
+        """
+        Initializes the pool with the number of key pairs to keep ready for each curve type.
+
+        Args:
+            depths (Dict[CurveType, int]): Pool depth per curve type. Curves not listed are not pooled.
+
+        Raises:
+            ValueError: If a depth is negative or a curve type is unsupported.
+        """
+        for curve_type, depth in depths.items():
+            if curve_type not in _PRIVATE_CURVE_TYPES:
+                raise ValueError("Unsupported CurveType. Select either X25519 or X448")
+            if depth < 0:
+                raise ValueError("Pool depth must not be negative")
+
+        self.depths = dict(depths)
+        self._pools: Dict[CurveType, Deque[Tuple[Union[X25519PrivateKey, X448PrivateKey], bytes]]] = {
+            curve_type: deque() for curve_type in self.depths
+        }
+        self._hits = {curve_type: 0 for curve_type in self.depths}
+        self._misses = {curve_type: 0 for curve_type in self.depths}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def start(self) -> None:
+        """
+        Starts the background refill thread. Calling start on a running pool does nothing.
+        """
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._refill_loop, name="bluebird-keypool", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stops the background refill thread. Key pairs already in the pool are kept.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait for the refill thread to exit.
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def fill(self) -> None:
+        """
+        Synchronously tops every pool up to its configured depth, e.g. before the service starts.
+        """
+        for curve_type in self.depths:
+            while self._needs_refill(curve_type):
+                self._put(curve_type, self._generate(curve_type))
+
+    def get(self, curve_type: CurveType) -> Tuple[Union[X25519PrivateKey, X448PrivateKey], bytes]:
+        """
+        Takes a key pair for the given curve out of the pool.
+
+        Args:
+            curve_type (CurveType): The curve the key pair must belong to.
+
+        Returns:
+            tuple[Union[X25519PrivateKey, X448PrivateKey], bytes]: The private key and the raw bytes of the public key.
+
+        Raises:
+            ValueError: If the curve type is not pooled.
+        """
+        if curve_type not in self._pools:
+            raise ValueError(f"No key pair pool configured for {curve_type}")
+
+        with self._cond:
+            pool = self._pools[curve_type]
+            if pool:
+                self._hits[curve_type] += 1
+                key_pair = pool.popleft()
+            else:
+                self._misses[curve_type] += 1
+                key_pair = None
+            self._cond.notify_all()
+
+        if key_pair is None:
+            key_pair = self._generate(curve_type)
+        return key_pair
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns the pool counters per curve type.
+
+        Returns:
+            Dict[str, Dict[str, int]]: For each curve value: "hits", "misses", "available" and "depth".
+        """
+        with self._cond:
+            return {
+                curve_type.value: {
+                    "hits": self._hits[curve_type],
+                    "misses": self._misses[curve_type],
+                    "available": len(self._pools[curve_type]),
+                    "depth": self.depths[curve_type],
+                }
+                for curve_type in self.depths
+            }
+
+    def _needs_refill(self, curve_type: CurveType) -> bool:
+        return len(self._pools[curve_type]) < self.depths[curve_type]
+
+    def _put(self, curve_type: CurveType, key_pair: Tuple[Union[X25519PrivateKey, X448PrivateKey], bytes]) -> None:
+        with self._cond:
+            if self._needs_refill(curve_type):
+                self._pools[curve_type].append(key_pair)
+
+    def _refill_loop(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and not any(self._needs_refill(c) for c in self.depths):
+                    self._cond.wait()
+                if not self._running:
+                    return
+                curve_type = min(self.depths, key=lambda c: len(self._pools[c]) - self.depths[c])
+            # Generate outside the lock so get() never waits on key generation.
+            self._put(curve_type, self._generate(curve_type))
+
+    @staticmethod
+    def _generate(curve_type: CurveType) -> Tuple[Union[X25519PrivateKey, X448PrivateKey], bytes]:
+        private_key = _PRIVATE_CURVE_TYPES[curve_type].generate()
+        return private_key, private_key.public_key().public_bytes_raw()
@@ -0,0 +1,146 @@
+import hashlib
+import os
+import threading
+from typing import Dict, List, Optional, Set
+
+
+class ReplayedPayloadError(ValueError):
+    """
+    Raised when a payload's (client public key, nonce) pair has already been accepted.
+    """
+
+
+class _Reservation:
+    __slots__ = ("_guard", "_digest")
+
+    def __init__(self, guard, digest):
+        self._guard = guard
+        self._digest = digest
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.release()
+
+    def commit(self):
+        if self._guard is not None:
+            self._guard._commit(self._digest)
+            self._guard = None
+
+    def release(self):
+        if self._guard is not None:
+            self._guard._release(self._digest)
+            self._guard = None
+
+
+class ReplayGuard:
+    """
+    Remembers the (client public key, nonce) pairs of accepted payloads in a fixed memory budget.
+
+    Pairs are hashed with a per-process random BLAKE2b key into 16 byte digests and kept in a
+    hash set, with a ring buffer recording insertion order. Once capacity digests are stored,
+    each new one overwrites the oldest. Lookups and inserts are O(1) and cost one hash, so a
+    replayed payload is rejected before any elliptic-curve work.
+
+    Decryption workers use reserve(), which checks a pair and claims it in one step under the
+    lock, so two copies of a payload decrypted at once cannot both be accepted. The claim
+    becomes a recorded pair if decryption succeeds and is dropped otherwise:
+
+        with replay_guard.reserve(client_public_key, nonce):
+            plaintext = decrypt(...)
+    """
+
+    DIGEST_SIZE = 16
+
+    def __init__(self, capacity: int = 4096):
+        """
+        Initializes an empty guard.
+
+        Args:
+            capacity (int): Number of accepted payloads remembered.
+
+        Raises:
+            ValueError: If capacity is less than 1.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._key = os.urandom(hashlib.blake2b.MAX_KEY_SIZE)
+        self._ring: List[Optional[bytes]] = [None] * capacity
+        self._next = 0
+        self._seen: Set[bytes] = set()
+        self._pending: Set[bytes] = set()
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def _digest(self, client_public_key: bytes, nonce: bytes) -> bytes:
+        h = hashlib.blake2b(key=self._key, digest_size=self.DIGEST_SIZE)
+        h.update(client_public_key)
+        h.update(nonce)
+        return h.digest()
+
+    def check(self, client_public_key: bytes, nonce: bytes) -> None:
+        """
+        Raises:
+            ReplayedPayloadError: If the pair has already been recorded or is reserved.
+        """
+        digest = self._digest(client_public_key, nonce)
+        with self._lock:
+            if digest in self._seen or digest in self._pending:
+                self.rejected += 1
+                raise ReplayedPayloadError("Payload has already been accepted")
+
+    def reserve(self, client_public_key: bytes, nonce: bytes) -> _Reservation:
+        """
+        Checks a pair and claims it until the returned reservation is committed or released, or
+        its with block ends. Only committed pairs take up a slot of the ring, so payloads that
+        fail to decrypt cannot evict real entries.
+
+        Raises:
+            ReplayedPayloadError: If the pair has already been recorded or is reserved.
+        """
+        digest = self._digest(client_public_key, nonce)
+        with self._lock:
+            if digest in self._seen or digest in self._pending:
+                self.rejected += 1
+                raise ReplayedPayloadError("Payload has already been accepted")
+            self._pending.add(digest)
+        return _Reservation(self, digest)
+
+    def record(self, client_public_key: bytes, nonce: bytes) -> None:
+        """
+        Remembers an accepted pair, evicting the oldest one when full.
+        """
+        self._commit(self._digest(client_public_key, nonce))
+
+    def _release(self, digest: bytes) -> None:
+        with self._lock:
+            self._pending.discard(digest)
+
+    def _commit(self, digest: bytes) -> None:
+        with self._lock:
+            self._pending.discard(digest)
+            if digest in self._seen:
+                return
+            evicted = self._ring[self._next]
+            if evicted is not None:
+                self._seen.discard(evicted)
+            self._ring[self._next] = digest
+            self._next = (self._next + 1) % self.capacity
+            self._seen.add(digest)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._seen),
+                "capacity": self.capacity,
+                "pending": len(self._pending),
+                "rejected": self.rejected,
+            }
+
+    def __len__(self) -> int:
+        return len(self._seen)
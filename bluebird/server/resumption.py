@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from bluebird.util.resumption import TICKET_ID_SIZE, TICKET_SIZE
+
+
+class InvalidTicketError(ValueError):
+    """
+    Raised for a resumption ticket that was not issued by this server, has expired or is used up.
+    """
+
+
+class TicketIssuer:
+    """
+    Issues and checks short-lived resumption tickets.
+
+    A ticket seals the resumption key of one session under a random AES-GCM key that never
+    leaves this process, so checking a ticket costs one AES-GCM open and no key exchange. Only
+    the ticket id, its expiry and its remaining uses are kept here, for at most capacity
+    tickets. When full, the oldest ticket is dropped and its holder falls back to a full exchange.
+    """
+
+    def __init__(self, lifetime: float = 120.0, max_uses: int = 4, capacity: int = 1024,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initializes an issuer with a fresh ticket key.
+
+        Args:
+            lifetime (float): Seconds a ticket stays valid after it was issued.
+            max_uses (int): Resumed payloads accepted per ticket.
+            capacity (int): Outstanding tickets tracked.
+            clock (Callable[[], float]): Monotonic time source, replaceable for testing.
+
+        Raises:
+            ValueError: If lifetime is not positive or max_uses or capacity is less than 1.
+        """
+        if lifetime <= 0:
+            raise ValueError("lifetime must be positive")
+        if max_uses < 1 or capacity < 1:
+            raise ValueError("max_uses and capacity must be at least 1")
+        self.lifetime = lifetime
+        self.max_uses = max_uses
+        self.capacity = capacity
+        self._clock = clock
+        self._aead = AESGCM(AESGCM.generate_key(bit_length=256))
+        self._tickets: "OrderedDict[bytes, List]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.issued = 0
+        self.resumed = 0
+        self.rejected = 0
+
+    def issue(self, resumption_key: bytes) -> bytes:
+        """
+        Seals a resumption key into a new ticket of TICKET_SIZE bytes.
+        """
+        ticket_id = os.urandom(TICKET_ID_SIZE)
+        nonce = os.urandom(12)
+        ticket = ticket_id + nonce + self._aead.encrypt(nonce, bytes(resumption_key), ticket_id)
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            if len(self._tickets) >= self.capacity:
+                self._tickets.popitem(last=False)
+            self._tickets[ticket_id] = [now + self.lifetime, self.max_uses]
+            self.issued += 1
+        return ticket
+
+    def redeem(self, ticket) -> bytes:
+        """
+        Checks a ticket, spends one of its uses and returns the resumption key sealed in it.
+
+        Raises:
+            InvalidTicketError: If the ticket is malformed, forged, expired or used up.
+        """
+        resumption_key = self.open(ticket)
+        self.spend(ticket)
+        return resumption_key
+
+    def open(self, ticket) -> bytes:
+        """
+        Checks a ticket and returns the resumption key sealed in it without spending a use, so
+        the payload the ticket came with can be authenticated first; spend() then takes the use.
+
+        Raises:
+            InvalidTicketError: If the ticket is malformed, forged, expired or used up.
+        """
+        ticket = bytes(ticket)
+        if len(ticket) != TICKET_SIZE:
+            self._reject("Malformed resumption ticket")
+        ticket_id = ticket[:TICKET_ID_SIZE]
+        with self._lock:
+            entry = self._tickets.get(ticket_id)
+            if entry is None or entry[0] <= self._clock():
+                self._tickets.pop(ticket_id, None)
+                self.rejected += 1
+                raise InvalidTicketError("Unknown, expired or used up resumption ticket")
+            aead = self._aead
+        try:
+            return aead.decrypt(ticket[TICKET_ID_SIZE:TICKET_ID_SIZE + 12], ticket[TICKET_ID_SIZE + 12:], ticket_id)
+        except InvalidTag:
+            self._reject("Resumption ticket failed authentication")
+
+    def spend(self, ticket) -> None:
+        """
+        Spends one use of a ticket accepted by open().
+
+        Raises:
+            InvalidTicketError: If the ticket was used up, expired or revoked since it was opened.
+        """
+        ticket_id = bytes(ticket[:TICKET_ID_SIZE])
+        with self._lock:
+            # Re-read: another thread may have spent the last use meanwhile.
+            entry = self._tickets.get(ticket_id)
+            if entry is None or entry[0] <= self._clock():
+                self._tickets.pop(ticket_id, None)
+                self.rejected += 1
+                raise InvalidTicketError("Resumption ticket used up")
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self._tickets[ticket_id]
+            self.resumed += 1
+
+    def revoke_all(self) -> None:
+        """
+        Invalidates every outstanding ticket by replacing the ticket key.
+        """
+        with self._lock:
+            self._aead = AESGCM(AESGCM.generate_key(bit_length=256))
+            self._tickets.clear()
+
+    def _expire(self, now: float) -> None:
+        # Every ticket gets the same lifetime, so insertion order is expiry order.
+        tickets = self._tickets
+        while tickets and next(iter(tickets.values()))[0] <= now:
+            tickets.popitem(last=False)
+
+    def _reject(self, message: str) -> None:
+        with self._lock:
+            self.rejected += 1
+        raise InvalidTicketError(message)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "outstanding": len(self._tickets),
+                "issued": self.issued,
+                "resumed": self.resumed,
+                "rejected": self.rejected,
+            }
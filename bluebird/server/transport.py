@@ -0,0 +1,303 @@
+"""
+The commissioning protocol over a Unix or TCP socket, for wired factory provisioning and CI.
+
+Each connection plays one central: it reads the public key, writes an encrypted payload (and
+optionally a plaintext SSID first) and gets the resulting status back, using the length-prefixed
+frames of bluebird.util.framing. The asyncio server multiplexes every connection on one thread;
+key exchanges, decryption and a blocking apply callback run on an executor so they never stall it.
+
+    server = CommissioningServer(ServerExchangeHandler(CurveType.CURVE25519, replay_guard=ReplayGuard()))
+    await server.start_unix("/run/bluebird.sock")
+    await server.serve_forever()
+"""
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import time
+from concurrent.futures import Executor
+from typing import Awaitable, Callable, Dict, Optional, Union
+
+from bluebird import metrics
+from bluebird.ble.session import CommissioningSession, CommissioningStatus, SessionState
+from bluebird.log import Secret
+from bluebird.util import CommissioningFields, is_tlv
+from bluebird.util.framing import MAX_FRAME_SIZE, FrameError, MessageType, encode_frame, read_frame
+from .admission import AdmissionControl, AdmissionError
+from .crypto import ServerExchangeHandler
+from .replay import ReplayedPayloadError
+from .resumption import InvalidTicketError
+
+logger = logging.getLogger(__name__)
+
+ApplyCallback = Callable[[CommissioningSession], Union[bool, Awaitable[bool]]]
+
+
+class _Connection:
+    __slots__ = ("session", "status", "ticket")
+
+    def __init__(self, device: str):
+        self.session = CommissioningSession(device, 0.0)
+        self.status = CommissioningStatus.IDLE
+        self.ticket = None
+
+
+class CommissioningServer:
+    """
+    Serves the commissioning protocol to many concurrent socket clients with one ServerExchangeHandler.
+
+    When a connection has provided every parameter, apply(session) is called and its truth value
+    decides between JOINED and FAILED. A coroutine function (or an object with an async __call__,
+    such as NetworkApplier) is awaited on the loop; any other callable runs on the executor.
+
+    A failed decrypt or apply rotates the server key, as the BLE commissioner does, but at most
+    once every rotation_interval seconds. The key is shared by every connection, so otherwise a
+    client writing garbage in a loop would keep invalidating the key every other client had read.
+    """
+
+    def __init__(self, exchange_handler: ServerExchangeHandler, apply: Optional[ApplyCallback] = None,
+                 admission: Optional[AdmissionControl] = None, max_connections: int = 4096,
+                 idle_timeout: float = 30.0, max_frame_size: int = MAX_FRAME_SIZE,
+                 executor: Optional[Executor] = None, rotation_interval: float = 10.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            exchange_handler (ServerExchangeHandler): Decrypts payloads; a key pair is generated if it has none.
+            apply (Optional[ApplyCallback]): Applies a ready session's parameters. Defaults to accepting them.
+            admission (Optional[AdmissionControl]): Sheds payloads before decryption, keyed by connection.
+            max_connections (int): Connections served at once; further ones get an ERROR frame and are closed.
+            idle_timeout (float): Seconds a connection may wait between frames.
+            max_frame_size (int): Largest frame accepted, in bytes.
+            executor (Optional[Executor]): Runs decryption and a blocking apply. Defaults to the loop's default executor.
+            rotation_interval (float): Least number of seconds between two key rotations caused by failures.
+            clock (Callable[[], float]): Monotonic time source, replaceable for testing.
+        """
+        self.exchange_handler = exchange_handler
+        if self.exchange_handler.public_key is None:
+            self.exchange_handler.generate_key_pair()
+        self.apply = apply if apply is not None else _accept
+        self._apply_is_async = _is_async(self.apply)
+        self.executor = executor
+        self.rotation_interval = rotation_interval
+        self._clock = clock
+        self._rotated_at: Optional[float] = None
+        self.admission = admission
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.max_frame_size = max_frame_size
+        self._servers = []
+        self._next_id = 0
+        self.active = 0
+        self.counters = {"connections": 0, "refused": 0, "joined": 0, "failed": 0, "errors": 0, "rotations": 0}
+
+    async def start_unix(self, path: str, backlog: int = 1024) -> "CommissioningServer":
+        self._servers.append(await asyncio.start_unix_server(self._handle, path, backlog=backlog))
+        logger.info("Commissioning server listening on %s", path)
+        return self
+
+    async def start_tcp(self, host: Optional[str], port: int, backlog: int = 1024) -> "CommissioningServer":
+        server = await asyncio.start_server(self._handle, host, port, backlog=backlog)
+        self._servers.append(server)
+        logger.info("Commissioning server listening on %s", ", ".join(str(s.getsockname()) for s in server.sockets))
+        return self
+
+    @property
+    def sockets(self):
+        return [sock for server in self._servers for sock in server.sockets]
+
+    async def close(self) -> None:
+        for server in self._servers:
+            server.close()
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers = []
+
+    async def serve_forever(self) -> None:
+        await asyncio.gather(*(server.serve_forever() for server in self._servers))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counters, active=self.active)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._next_id += 1
+        self.counters["connections"] += 1
+        if self.active >= self.max_connections:
+            self.counters["refused"] += 1
+            writer.write(encode_frame(MessageType.ERROR, b"busy"))
+            await _close(writer)
+            return
+
+        peer = writer.get_extra_info("peername")
+        connection = _Connection(f"tcp:{peer[0]}:{peer[1]}:{self._next_id}" if peer else f"unix:{self._next_id}")
+        self.active += 1
+        try:
+            while True:
+                try:
+                    message_type, body = await asyncio.wait_for(read_frame(reader, self.max_frame_size), self.idle_timeout)
+                except FrameError as e:
+                    logger.warning("Closing %s: %s", connection.session.device, e)
+                    writer.write(encode_frame(MessageType.ERROR, str(e).encode()))
+                    break
+                writer.write(await self._dispatch(connection, message_type, body))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            self.active -= 1
+            await _close(writer)
+
+    async def _dispatch(self, connection: _Connection, message_type: MessageType, body: memoryview) -> bytes:
+        if message_type is MessageType.READ_PUBLIC_KEY:
+            return encode_frame(MessageType.PUBLIC_KEY, self.exchange_handler.public_key)
+        if message_type is MessageType.READ_STATUS:
+            return _status_frame(connection)
+        if message_type is MessageType.READ_STATS:
+            stats = dict(metrics.snapshot(buckets=False), server=self.stats())
+            return encode_frame(MessageType.STATS, json.dumps(stats, separators=(",", ":")).encode())
+        if message_type is MessageType.READ_TICKET:
+            if connection.ticket is None:
+                return encode_frame(MessageType.ERROR, b"no ticket")
+            return encode_frame(MessageType.TICKET, connection.ticket)
+        try:
+            if message_type is MessageType.WRITE_SSID:
+                params = {"ssid": bytes(body).decode("utf-8")}
+            elif message_type is MessageType.WRITE_PAYLOAD:
+                params = await self._decrypt(connection, body)
+            elif message_type is MessageType.WRITE_RESUMED:
+                params = await self._decrypt_resumed(connection, body)
+            else:
+                raise ValueError(f"Unexpected {message_type.name} request")
+            state = connection.session.set_parameters(params)
+        except _Refused as e:
+            self.counters["errors"] += 1
+            return encode_frame(MessageType.ERROR, str(e).encode())
+        except ValueError as e:
+            self.counters["errors"] += 1
+            logger.warning("Request from %s refused: %s", connection.session.device, e)
+            return encode_frame(MessageType.ERROR, str(e).encode())
+        if state is SessionState.READY:
+            await self._commission(connection)
+        return _status_frame(connection)
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(fn, *args))
+
+    def _rotate_key(self) -> None:
+        now = self._clock()
+        if self._rotated_at is not None and now - self._rotated_at < self.rotation_interval:
+            logger.debug("Key rotated %.1fs ago, not rotating again", now - self._rotated_at)
+            return
+        self._rotated_at = now
+        self.counters["rotations"] += 1
+        self.exchange_handler.generate_key_pair()
+
+    def _open_payload(self, payload: memoryview):
+        plaintext, ticket = self.exchange_handler.decrypt_payload_with_ticket(payload)
+        return _decode_parameters(plaintext), ticket
+
+    def _open_resumed_payload(self, payload: memoryview) -> Dict[str, object]:
+        return _decode_parameters(self.exchange_handler.decrypt_resumed_payload(payload))
+
+    async def _decrypt(self, connection: _Connection, payload: memoryview) -> Dict[str, object]:
+        device = connection.session.device
+        ticket = None
+        if self.admission is not None:
+            try:
+                ticket = self.admission.admit(device, payload)
+            except AdmissionError as e:
+                logger.warning("Payload from %s shed (%s): %s", device, e.reason, e)
+                raise _Refused(e.reason)
+        connection.status = CommissioningStatus.RECEIVED
+        try:
+            params, connection.ticket = await self._run(self._open_payload, payload)
+        except ReplayedPayloadError:
+            logger.warning("Replayed payload from %s rejected", device)
+            raise _Refused("replayed")
+        except ValueError as e:
+            logger.warning("Payload from %s could not be decrypted: %s", device, e)
+            connection.status = CommissioningStatus.FAILED
+            self._rotate_key()
+            raise _Refused("decrypt failed")
+        finally:
+            if ticket is not None:
+                ticket.release()
+        connection.status = CommissioningStatus.DECRYPTED
+        logger.debug("Password received: %s from %s", Secret(params["password"]), device)
+        return params
+
+    async def _decrypt_resumed(self, connection: _Connection, payload: memoryview) -> Dict[str, object]:
+        device = connection.session.device
+        if self.exchange_handler.ticket_issuer is None:
+            raise _Refused("resumption not supported")
+        connection.status = CommissioningStatus.RECEIVED
+        try:
+            params = await self._run(self._open_resumed_payload, payload)
+        except (InvalidTicketError, ReplayedPayloadError) as e:
+            logger.warning("Resumed payload from %s rejected: %s", device, e)
+            raise _Refused("ticket rejected")
+        except ValueError as e:
+            logger.warning("Resumed payload from %s could not be decrypted: %s", device, e)
+            connection.status = CommissioningStatus.FAILED
+            raise _Refused("decrypt failed")
+        connection.status = CommissioningStatus.DECRYPTED
+        return params
+
+    async def _commission(self, connection: _Connection) -> None:
+        session = connection.session
+        session.transition(SessionState.COMMISSIONING)
+        connection.status = CommissioningStatus.JOINING
+        try:
+            with metrics.timer("commission"):
+                if self._apply_is_async:
+                    joined = await self.apply(session)
+                else:
+                    joined = await self._run(self.apply, session)
+                    if inspect.isawaitable(joined):
+                        joined = await joined
+        except Exception as e:
+            logger.error("Commissioning for %s failed: %s", session.device, e)
+            joined = False
+        session.transition(SessionState.DONE if joined else SessionState.FAILED)
+        connection.status = CommissioningStatus.JOINED if joined else CommissioningStatus.FAILED
+        self.counters["joined" if joined else "failed"] += 1
+        metrics.count("joined" if joined else "join_failed")
+        if not joined:
+            self._rotate_key()
+
+
+class _Refused(ValueError):
+    pass
+
+
+def _is_async(fn) -> bool:
+    return inspect.iscoroutinefunction(fn) or inspect.iscoroutinefunction(getattr(fn, "__call__", None))
+
+
+def _accept(session: CommissioningSession) -> bool:
+    logger.info("Commissioning with SSID: %s and Password: %s", session.params["ssid"], Secret(session.params["password"]))
+    return True
+
+
+def _decode_parameters(plaintext: bytes) -> Dict[str, object]:
+    if is_tlv(plaintext):
+        return CommissioningFields.decode(plaintext)._asdict()
+    return {"password": plaintext.decode()}
+
+
+def _status_frame(connection: _Connection) -> bytes:
+    return encode_frame(MessageType.STATUS, bytes((connection.status.value,)))
+
+
+async def _close(writer: asyncio.StreamWriter) -> None:
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except ConnectionError:
+        pass
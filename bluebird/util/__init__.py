@@ -1 +1,5 @@
-from .curves import CurveType
\ No newline at end of file
+from .curves import CurveType, CurveInfo, CURVE_INFO
+from .payload import PayloadView
+from .tlv import CommissioningFields, FieldType, is_tlv
+from .framing import MessageType, FrameError, encode_frame, read_frame
+from .resumption import TICKET_SIZE, MIN_RESUMED_PAYLOAD_SIZE
@@ -9,4 +9,33 @@ class CurveType(Enum):
         CURVE448 (str): Represents the Curve448 elliptic curve.
     """
     CURVE25519 = "curve25519"
-    CURVE448 = "curve448"
\ No newline at end of file
+    CURVE448 = "curve448"
+
+class CurveInfo:
+    """
+    Wire layout of a client payload for one curve type: public key || nonce || ciphertext || tag.
+
+    Attributes:
+        public_key_size (int): Size of the raw client public key in bytes.
+        nonce_size (int): Size of the AES-GCM nonce in bytes.
+        tag_size (int): Size of the AES-GCM authentication tag in bytes.
+        header_size (int): Offset of the ciphertext in the payload.
+        min_payload_size (int): Size of a payload carrying an empty message.
+    """
+    __slots__ = ("public_key_size", "nonce_size", "tag_size", "header_size", "min_payload_size")
+
+    def __init__(self, public_key_size: int, nonce_size: int = 12, tag_size: int = 16):
+        self.public_key_size = public_key_size
+        self.nonce_size = nonce_size
+        self.tag_size = tag_size
+        self.header_size = public_key_size + nonce_size
+        self.min_payload_size = self.header_size + tag_size
+
+    def __repr__(self):
+        return f"CurveInfo(public_key_size={self.public_key_size}, nonce_size={self.nonce_size}, tag_size={self.tag_size})"
+
+
+CURVE_INFO = {
+    CurveType.CURVE25519: CurveInfo(public_key_size=32),
+    CurveType.CURVE448: CurveInfo(public_key_size=56),
+}
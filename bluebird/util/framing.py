@@ -0,0 +1,77 @@
+import struct
+from enum import IntEnum
+from typing import Tuple
+
+# length (2, big-endian, counts the type byte and body) | type (1) | body
+_HEADER = struct.Struct(">HB")
+MAX_FRAME_SIZE = 4096
+
+
+class MessageType(IntEnum):
+    """
+    Type byte of a commissioning frame sent over a socket. Requests mirror the GATT
+    characteristics; every request gets exactly one reply.
+
+    Attributes:
+        READ_PUBLIC_KEY: Empty request, answered with PUBLIC_KEY.
+        WRITE_SSID: UTF-8 SSID, answered with STATUS.
+        WRITE_PAYLOAD: Encrypted payload, answered with STATUS.
+        READ_STATUS: Empty request, answered with STATUS.
+        READ_TICKET: Empty request, answered with TICKET once a payload has been accepted.
+        WRITE_RESUMED: Payload sealed under a resumption ticket, answered with STATUS.
+        READ_STATS: Empty request, answered with STATS.
+        PUBLIC_KEY: The server's raw public key.
+        STATUS: One CommissioningStatus byte.
+        TICKET: The resumption ticket issued to this connection.
+        STATS: JSON of bluebird.metrics.snapshot(buckets=False) plus the server's connection counters.
+        ERROR: UTF-8 reason the request was refused; the connection stays usable.
+    """
+    READ_PUBLIC_KEY = 0x01
+    WRITE_SSID = 0x02
+    WRITE_PAYLOAD = 0x03
+    READ_STATUS = 0x04
+    READ_TICKET = 0x05
+    WRITE_RESUMED = 0x06
+    READ_STATS = 0x07
+    PUBLIC_KEY = 0x81
+    STATUS = 0x82
+    TICKET = 0x83
+    STATS = 0x84
+    ERROR = 0xFF
+
+
+class FrameError(ValueError):
+    """
+    Raised for a frame that is empty, oversized or of an unknown type.
+    """
+
+
+def encode_frame(message_type: MessageType, body: bytes = b"") -> bytes:
+    """
+    Raises:
+        FrameError: If the frame would exceed MAX_FRAME_SIZE.
+    """
+    if len(body) + 1 > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame body of {len(body)} bytes exceeds {MAX_FRAME_SIZE - 1}")
+    return _HEADER.pack(len(body) + 1, message_type) + body
+
+
+async def read_frame(reader, max_size: int = MAX_FRAME_SIZE) -> Tuple[MessageType, memoryview]:
+    """
+    Reads one frame from an asyncio StreamReader.
+
+    Raises:
+        FrameError: If the frame is empty, longer than max_size or of an unknown type.
+        asyncio.IncompleteReadError: If the stream ends before or inside a frame. Its partial is empty
+            when the stream ended cleanly between frames.
+    """
+    header = await reader.readexactly(2)
+    length = (header[0] << 8) | header[1]
+    if length == 0 or length > max_size:
+        raise FrameError(f"Invalid frame length {length}")
+    frame = await reader.readexactly(length)
+    try:
+        message_type = MessageType(frame[0])
+    except ValueError:
+        raise FrameError(f"Unknown message type 0x{frame[0]:02x}")
+    return message_type, memoryview(frame)[1:]
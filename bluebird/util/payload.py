@@ -0,0 +1,53 @@
+from .curves import CurveType, CURVE_INFO
+from typing import Union
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class PayloadView:
+    """
+    A read-only view over a client payload that splits it into its fields without copying.
+
+    The nonce and ciphertext are memoryview slices of the original buffer and can be handed
+    straight to AESGCM.decrypt. The public key is the only field copied, because the curve
+    key loaders and the session key cache require bytes.
+
+    Values arriving from D-Bus with byte_arrays=True are bytes already; a plain dbus.Array of
+    dbus.Byte is converted once.
+    """
+    __slots__ = ("curve_info", "public_key", "nonce", "ciphertext")
+
+    def __init__(self, client_payload: Buffer, curve_type: CurveType):
+        """
+        Parses the payload layout for the given curve type.
+
+        Args:
+            client_payload (Buffer): The encrypted payload from the client.
+            curve_type (CurveType): The curve the payload was created with.
+
+        Raises:
+            ValueError: If the curve type is unsupported or the payload is too short.
+        """
+        curve_info = CURVE_INFO.get(curve_type)
+        if curve_info is None:
+            raise ValueError("Curve Type not defined by the server!")
+
+        try:
+            view = memoryview(client_payload)
+        except TypeError:
+            view = memoryview(bytes(client_payload))
+        if view.format != "B" or view.ndim != 1:
+            view = view.cast("B")
+        if len(view) < curve_info.min_payload_size:
+            raise ValueError(
+                f"Payload too short: {len(view)} bytes, expected at least {curve_info.min_payload_size}"
+            )
+
+        key_end = curve_info.public_key_size
+        self.curve_info = curve_info
+        self.public_key = view[:key_end].tobytes()
+        self.nonce = view[key_end:curve_info.header_size]
+        self.ciphertext = view[curve_info.header_size:]
+
+    def __len__(self):
+        return self.curve_info.header_size + len(self.ciphertext)
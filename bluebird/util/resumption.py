@@ -0,0 +1,10 @@
+# ticket id (8) | nonce (12) | resumption key sealed under the server's ticket key (32 + 16 tag)
+TICKET_ID_SIZE = 8
+TICKET_SIZE = TICKET_ID_SIZE + 12 + 32 + 16
+
+# A resumed payload is ticket | nonce (12) | ciphertext | tag (16), sealed under the resumption key
+# with the ticket as associated data.
+MIN_RESUMED_PAYLOAD_SIZE = TICKET_SIZE + 12 + 16
+
+# HKDF info deriving the resumption key from the session key of the exchange that earned the ticket.
+RESUMPTION_INFO = b"bluebird resumption"
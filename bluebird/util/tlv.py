@@ -0,0 +1,132 @@
+import ipaddress
+from enum import IntEnum
+from typing import NamedTuple, Optional
+
+# First plaintext byte of a TLV payload. 0xB1 can never start a UTF-8 string, so a TLV payload
+# is always distinguishable from a bare password.
+TLV_MAGIC = 0xB1
+TLV_VERSION = 0x01
+
+
+class FieldType(IntEnum):
+    """
+    Type byte of each field in a TLV payload: type (1) | length (1) | value (length).
+
+    Attributes:
+        SSID: UTF-8 network name, at most 32 bytes.
+        PASSWORD: UTF-8 passphrase.
+        HIDDEN: One byte, 1 if the network does not broadcast its SSID.
+        STATIC_IP: Packed address followed by the prefix length (5 bytes IPv4, 17 bytes IPv6).
+        COUNTRY: Two ASCII letters, ISO 3166-1 alpha-2 regulatory domain.
+    """
+    SSID = 0x01
+    PASSWORD = 0x02
+    HIDDEN = 0x03
+    STATIC_IP = 0x04
+    COUNTRY = 0x05
+
+
+class CommissioningFields(NamedTuple):
+    """
+    Everything a device needs to join a network, sealed in one AEAD message.
+
+    Attributes:
+        ssid (str): Network name.
+        password (str): Network passphrase.
+        hidden (bool): Whether the network is hidden.
+        static_ip (Optional[str]): Interface address in CIDR notation, e.g. "192.168.1.20/24", or None for DHCP.
+        country (Optional[str]): Two letter regulatory domain, e.g. "US".
+    """
+    ssid: str
+    password: str
+    hidden: bool = False
+    static_ip: Optional[str] = None
+    country: Optional[str] = None
+
+    def encode(self) -> bytes:
+        """
+        Encodes the fields as magic | version | TLV fields. Optional fields left unset are omitted.
+
+        Raises:
+            ValueError: If a field does not fit its encoding.
+        """
+        out = bytearray((TLV_MAGIC, TLV_VERSION))
+        ssid = self.ssid.encode("utf-8")
+        if len(ssid) > 32:
+            raise ValueError("SSID must be at most 32 bytes")
+        _append(out, FieldType.SSID, ssid)
+        _append(out, FieldType.PASSWORD, self.password.encode("utf-8"))
+        if self.hidden:
+            _append(out, FieldType.HIDDEN, b"\x01")
+        if self.static_ip is not None:
+            interface = ipaddress.ip_interface(self.static_ip)
+            _append(out, FieldType.STATIC_IP, interface.packed + bytes((interface.network.prefixlen,)))
+        if self.country is not None:
+            _append(out, FieldType.COUNTRY, _check_country(self.country).encode("ascii"))
+        return bytes(out)
+
+    @classmethod
+    def decode(cls, data: bytes) -> "CommissioningFields":
+        """
+        Decodes a TLV payload in a single pass. Unknown field types are skipped so newer clients
+        can add fields; a repeated field keeps its last value.
+
+        Raises:
+            ValueError: If the data is not a TLV payload, is truncated, lacks the SSID or password, or
+                carries a country that is not two ASCII letters.
+        """
+        view = memoryview(data)
+        if not is_tlv(view):
+            raise ValueError("Not a TLV commissioning payload")
+        values = {}
+        offset, end = 2, len(view)
+        while offset < end:
+            if offset + 2 > end:
+                raise ValueError("Truncated TLV field header")
+            field_type, length = view[offset], view[offset + 1]
+            offset += 2
+            if offset + length > end:
+                raise ValueError("Truncated TLV field value")
+            values[field_type] = view[offset:offset + length]
+            offset += length
+
+        if FieldType.SSID not in values or FieldType.PASSWORD not in values:
+            raise ValueError("TLV payload must contain an SSID and a password")
+        static_ip = values.get(FieldType.STATIC_IP)
+        country = values.get(FieldType.COUNTRY)
+        return cls(
+            ssid=bytes(values[FieldType.SSID]).decode("utf-8"),
+            password=bytes(values[FieldType.PASSWORD]).decode("utf-8"),
+            hidden=bool(values.get(FieldType.HIDDEN, b"\x00")[:1] == b"\x01"),
+            static_ip=_decode_interface(static_ip) if static_ip is not None else None,
+            country=_check_country(bytes(country).decode("ascii")) if country is not None else None,
+        )
+
+
+def is_tlv(data) -> bool:
+    """
+    Returns True if decrypted plaintext is a TLV payload rather than a bare password.
+    """
+    return len(data) >= 2 and data[0] == TLV_MAGIC and data[1] == TLV_VERSION
+
+
+def _append(out: bytearray, field_type: FieldType, value: bytes) -> None:
+    if len(value) > 255:
+        raise ValueError(f"{field_type.name} must be at most 255 bytes")
+    out.append(field_type)
+    out.append(len(value))
+    out += value
+
+
+def _check_country(country: str) -> str:
+    # The code ends up in wpa_supplicant's "SET country", so a decoded value is held to the same rule as an encoded one.
+    if len(country) != 2 or not country.isascii() or not country.isalpha():
+        raise ValueError("Country must be a two letter ISO 3166-1 code")
+    return country.upper()
+
+
+def _decode_interface(value: memoryview) -> str:
+    if len(value) not in (5, 17):
+        raise ValueError("STATIC_IP must be 5 (IPv4) or 17 (IPv6) bytes")
+    address = ipaddress.ip_address(bytes(value[:-1]))
+    return str(ipaddress.ip_interface(f"{address}/{value[-1]}"))
@@ -1,6 +1,9 @@
+from bluebird import configure_logging
 from bluebird.ble import BluebirdCommissioner
 
-commissioner = BluebirdCommissioner()
+configure_logging("DEBUG")
+# Returns from start() once the device has joined a network.
+commissioner = BluebirdCommissioner(stop_after_join=True)
 try:
     commissioner.start()
 except KeyboardInterrupt:
@@ -0,0 +1,15 @@
+import asyncio
+from bluebird import configure_logging
+from bluebird.ble import AsyncBluebirdCommissioner
+
+configure_logging("DEBUG")
+
+async def main():
+    async with AsyncBluebirdCommissioner() as commissioner:
+        credentials = await commissioner.wait_for_credentials()
+        print(f"Received credentials for SSID: {credentials['ssid']}")
+
+try:
+    asyncio.run(main())
+except KeyboardInterrupt:
+    pass
@@ -0,0 +1,53 @@
+import pytest
+
+from bluebird.server.admission import AdmissionControl, AdmissionError
+from bluebird.util import CURVE_INFO, CurveType
+
+DEVICE = "/org/bluez/hci0/dev_00_00_00_00_00_01"
+PAYLOAD = b"\x09" * CURVE_INFO[CurveType.CURVE25519].min_payload_size
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _reason(admission, device=DEVICE, payload=PAYLOAD):
+    with pytest.raises(AdmissionError) as e:
+        admission.admit(device, payload)
+    return e.value.reason
+
+
+def test_bucket_allows_a_burst_then_refills_at_rate():
+    clock = _Clock()
+    admission = AdmissionControl(CurveType.CURVE25519, rate=0.5, burst=3, max_in_flight=10, clock=clock)
+    for _ in range(3):
+        admission.admit(DEVICE, PAYLOAD).release()
+    assert _reason(admission) == "rate"
+    clock.now = 1.0
+    assert _reason(admission) == "rate"
+    clock.now = 2.0
+    admission.admit(DEVICE, PAYLOAD).release()
+    assert _reason(admission) == "rate"
+    admission.admit("other", PAYLOAD).release()
+
+
+def test_in_flight_cap_is_released_by_the_ticket():
+    admission = AdmissionControl(CurveType.CURVE25519, burst=10, max_in_flight=1)
+    with admission.admit(DEVICE, PAYLOAD):
+        assert _reason(admission, "other") == "concurrency"
+    admission.admit("other", PAYLOAD).release()
+    assert admission.stats()["in_flight"] == 0
+
+
+def test_malformed_payloads_are_shed_without_spending_tokens():
+    admission = AdmissionControl(CurveType.CURVE25519, burst=1)
+    assert _reason(admission, payload=PAYLOAD[:-1]) == "length"
+    assert _reason(admission, payload=b"\x01" + bytes(len(PAYLOAD) - 1)) == "format"
+    admission.admit(DEVICE, PAYLOAD).release()
+    stats = admission.stats()
+    assert stats["accepted"] == 1
+    assert stats["shed"] == {"length": 1, "format": 1, "rate": 0, "concurrency": 0}
@@ -0,0 +1,108 @@
+import asyncio
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+dbus = pytest.importorskip("dbus")
+pytest.importorskip("gi")
+if shutil.which("dbus-daemon") is None:
+    pytest.skip("dbus-daemon is not installed", allow_module_level=True)
+
+import dbus.bus  # noqa: E402
+from dbus.mainloop.glib import DBusGMainLoop  # noqa: E402
+
+from bluebird import ClientExchangeHandler, CurveType  # noqa: E402
+from bluebird.ble.aio import AsyncBluebirdCommissioner  # noqa: E402
+from bluebird.ble.fake import PrivateBus  # noqa: E402
+from bluebird.ble.session import CommissioningStatus, SessionState  # noqa: E402
+from bluebird.server import ServerExchangeHandler  # noqa: E402
+from bluebird.util import CommissioningFields  # noqa: E402
+
+GATT_CHRC_IFACE = "org.bluez.GattCharacteristic1"
+
+# BlueZ answers the commissioner's blocking setup calls, so it runs in a process of its own.
+SERVE_BLUEZ = """
+import sys
+import dbus.bus
+from dbus.mainloop.glib import DBusGMainLoop
+from gi.repository import GLib
+from bluebird.ble.fake import FakeBluez
+
+DBusGMainLoop(set_as_default=True)
+bluez = FakeBluez(dbus.bus.BusConnection(sys.argv[1]))
+print("ready", flush=True)
+GLib.MainLoop().run()
+"""
+
+DEVICES = ["/org/bluez/hci0/dev_00_00_00_00_00_01", "/org/bluez/hci0/dev_00_00_00_00_00_02"]
+
+
+@pytest.fixture
+def address():
+    with PrivateBus() as address:
+        child = subprocess.Popen([sys.executable, "-c", SERVE_BLUEZ, address], stdout=subprocess.PIPE, text=True)
+        try:
+            assert child.stdout.readline().strip() == "ready"
+            yield address
+        finally:
+            child.terminate()
+            child.wait()
+            child.stdout.close()
+
+
+def _call(proxy, method, *args):
+    future = asyncio.get_running_loop().create_future()
+    getattr(proxy, method)(
+        *args, dbus_interface=GATT_CHRC_IFACE, byte_arrays=True,
+        reply_handler=lambda *result: future.done() or future.set_result(result[0] if result else None),
+        error_handler=lambda error: future.done() or future.set_exception(error),
+    )
+    return future
+
+
+def test_report_drives_each_session_to_its_outcome(address):
+    DBusGMainLoop(set_as_default=True)
+
+    async def main():
+        handler = ServerExchangeHandler(CurveType.CURVE25519)
+        commissioner = AsyncBluebirdCommissioner(bus=dbus.bus.BusConnection(address), exchange_handler=handler)
+        central = dbus.bus.BusConnection(address)
+        service = commissioner._commissioning_service
+        name = commissioner._bus.get_unique_name()
+        payload = central.get_object(name, service.payload_characteristic.get_path())
+        status = central.get_object(name, service.status_characteristic.get_path())
+        client = ClientExchangeHandler(CurveType.CURVE25519)
+
+        async with commissioner:
+            for index, device in enumerate(DEVICES):
+                value = client.create_encrypted_fields_payload(
+                    CommissioningFields(f"network-{index}", f"password-{index}"), handler.public_key,
+                )
+                await _call(payload, "WriteValue", dbus.ByteArray(value), {"device": dbus.ObjectPath(device)})
+
+            first = await commissioner.wait_for_credentials(timeout=5)
+            second = await commissioner.wait_for_credentials(timeout=5)
+            assert (first["device"], first["ssid"]) == (DEVICES[0], "network-0")
+            assert (second["device"], second["ssid"]) == (DEVICES[1], "network-1")
+            for device in DEVICES:
+                assert commissioner.sessions.get(device).state is SessionState.COMMISSIONING
+                assert commissioner._commissioning_service.status_characteristic.status_of(device) \
+                    is CommissioningStatus.JOINING
+
+            await commissioner.report(DEVICES[0], True)
+            await commissioner.report(DEVICES[1], False)
+            with pytest.raises(ValueError):
+                await commissioner.report(DEVICES[1], True)
+
+            statuses = [
+                bytes(await _call(status, "ReadValue", {"device": dbus.ObjectPath(device)})) for device in DEVICES
+            ]
+        return commissioner, statuses
+
+    commissioner, statuses = asyncio.run(main())
+    assert statuses == [bytes((CommissioningStatus.JOINED.value,)), bytes((CommissioningStatus.FAILED.value,))]
+    assert commissioner.sessions.get(DEVICES[0]).state is SessionState.DONE
+    assert commissioner.sessions.get(DEVICES[1]).state is SessionState.FAILED
+
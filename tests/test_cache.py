@@ -0,0 +1,78 @@
+import pytest
+
+from bluebird import ClientExchangeHandler, CurveType
+from bluebird.server import ServerExchangeHandler
+from bluebird.server.cache import SessionKeyCache
+
+SERVER = bytes(32)
+KEY = bytes(range(32))
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hit_and_miss_are_counted():
+    cache = SessionKeyCache()
+    assert cache.get(b"a", SERVER) is None
+    cache.put(b"a", KEY, SERVER)
+    assert cache.get(b"a", SERVER) == KEY
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SessionKeyCache(max_size=2)
+    cache.put(b"a", KEY, SERVER)
+    cache.put(b"b", KEY, SERVER)
+    assert cache.get(b"a", SERVER) == KEY
+    cache.put(b"c", KEY, SERVER)
+    assert len(cache) == 2
+    assert cache.get(b"b", SERVER) is None
+    assert cache.get(b"a", SERVER) == KEY
+    assert cache.get(b"c", SERVER) == KEY
+
+
+def test_entry_expires_after_ttl():
+    clock = _Clock()
+    cache = SessionKeyCache(ttl=30.0, clock=clock)
+    cache.put(b"a", KEY, SERVER)
+    clock.now = 29.9
+    assert cache.get(b"a", SERVER) == KEY
+    clock.now = 30.0
+    assert cache.get(b"a", SERVER) is None
+    assert len(cache) == 0
+
+
+def test_key_is_scoped_to_the_server_public_key():
+    cache = SessionKeyCache()
+    cache.put(b"a", KEY, SERVER)
+    assert cache.get(b"a", bytes(range(1, 33))) is None
+    assert cache.get(b"a", SERVER) == KEY
+
+
+def test_invalid_limits_are_rejected():
+    with pytest.raises(ValueError):
+        SessionKeyCache(max_size=0)
+    with pytest.raises(ValueError):
+        SessionKeyCache(ttl=0)
+
+
+def test_derivation_finishing_after_rotation_is_not_served():
+    cache = SessionKeyCache()
+    server = ServerExchangeHandler(CurveType.CURVE25519, session_cache=cache)
+    server.generate_key_pair()
+    _, client_public_key = ClientExchangeHandler(CurveType.CURVE25519).generate_key_pair()
+    stale_public_key = server.public_key
+    stale_key = server.derive_session_key(client_public_key)
+
+    server.generate_key_pair()
+    # A worker that read the old key pair before the rotation stores its result afterwards.
+    cache.put(client_public_key, stale_key, stale_public_key)
+
+    fresh_key = server.derive_session_key(client_public_key)
+    assert fresh_key != stale_key
+    assert server.derive_session_key(client_public_key) == fresh_key
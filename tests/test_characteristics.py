@@ -0,0 +1,65 @@
+import pytest
+
+dbus = pytest.importorskip("dbus")
+pytest.importorskip("gi")
+
+from bluebird.ble.base import InvalidOffsetException
+from bluebird.ble.ble import AvaliableSsidsCharacteristic
+from bluebird.network.scan import AccessPoint, ScanSource, WifiScanCache, decode_access_points
+
+
+class _Service:
+    path = "/org/bluez/test/service0"
+
+    def get_path(self):
+        return dbus.ObjectPath(self.path)
+
+
+class _ListSource(ScanSource):
+    def __init__(self, access_points):
+        self.access_points = access_points
+
+    def scan(self):
+        return list(self.access_points)
+
+
+def test_available_ssids_read_serves_scan_blob():
+    # Not exported on any bus; ReadValue is called the way BlueZ would dispatch it.
+    characteristic = AvaliableSsidsCharacteristic(None, 0, _Service())
+    cache = WifiScanCache(_ListSource([AccessPoint("home", 80), AccessPoint("cafe", 40, secured=False)]))
+    characteristic.set_scan_cache(cache)
+    cache.refresh()
+
+    value = bytes(characteristic.ReadValue({}))
+    assert value == cache.blob
+    assert decode_access_points(value) == [AccessPoint("home", 80), AccessPoint("cafe", 40, secured=False)]
+    assert bytes(characteristic.ReadValue({"offset": dbus.UInt16(3)})) == cache.blob[3:]
+    with pytest.raises(InvalidOffsetException):
+        characteristic.ReadValue({"offset": dbus.UInt16(len(cache.blob) + 1)})
+
+
+def test_available_ssids_read_before_first_scan():
+    characteristic = AvaliableSsidsCharacteristic(None, 0, _Service())
+    assert bytes(characteristic.ReadValue({})) == b"\xff"
+
+
+def test_status_is_kept_per_device():
+    from bluebird.ble.ble import StatusCharacteristic
+    from bluebird.ble.session import CommissioningStatus
+
+    characteristic = StatusCharacteristic(None, 4, _Service())
+    first, second = "/org/bluez/hci0/dev_00_00_00_00_00_01", "/org/bluez/hci0/dev_00_00_00_00_00_02"
+    characteristic.set_status(first, CommissioningStatus.JOINING)
+    characteristic.set_status(second, CommissioningStatus.FAILED)
+
+    assert bytes(characteristic.ReadValue({"device": dbus.ObjectPath(first)})) == bytes((CommissioningStatus.JOINING.value,))
+    assert bytes(characteristic.ReadValue({"device": dbus.ObjectPath(second)})) == bytes((CommissioningStatus.FAILED.value,))
+    assert bytes(characteristic.ReadValue({"device": dbus.ObjectPath("/org/bluez/hci0/dev_00_00_00_00_00_03")})) == b"\x00"
+    assert characteristic.status_of(first) is CommissioningStatus.JOINING
+
+
+def test_status_notification_names_the_device():
+    from bluebird.ble.ble import _device_address
+
+    assert _device_address("/org/bluez/hci0/dev_AA_BB_CC_DD_EE_FF") == bytes.fromhex("AABBCCDDEEFF")
+    assert _device_address("unix:1") == bytes(6)
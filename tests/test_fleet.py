@@ -0,0 +1,39 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from bluebird.client.fleet import encrypt_fleet, read_records
+from bluebird.util import CurveType
+
+
+def _csv(*rows):
+    return io.StringIO("device_id,public_key\n" + "".join(row + "\n" for row in rows))
+
+
+def test_bad_rows_become_error_results_and_the_rest_is_processed():
+    good = os.urandom(32).hex()
+    records = read_records(_csv(f"d1,{good}", "d2,not-hex", "d3", f"d4,{good}"))
+    results = list(encrypt_fleet(records, "password", CurveType.CURVE25519, chunk_size=2))
+
+    assert [r.device_id for r in results] == ["d1", "d2", "d3", "d4"]
+    assert [r.error is None for r in results] == [True, False, False, True]
+    assert results[1].payload is None and "hex" in results[1].error
+    assert results[3].payload is not None
+
+
+def test_bad_jsonl_lines_keep_their_position():
+    good = os.urandom(32).hex()
+    stream = io.StringIO(f'{{"device_id": "a", "public_key": "{good}"}}\nnot json\n{{"device_id": "c"}}\n')
+    records = list(read_records(stream, "jsonl"))
+
+    assert [(r.device_id, r.error is None) for r in records] == [("a", True), ("line 2", False), ("c", False)]
+
+
+def test_executor_results_include_errors_in_order():
+    good = os.urandom(32).hex()
+    records = read_records(_csv(*[f"d{i},{good if i % 3 else 'zz'}" for i in range(10)]))
+    with ThreadPoolExecutor(2) as executor:
+        results = list(encrypt_fleet(records, "password", CurveType.CURVE25519, executor, chunk_size=3))
+
+    assert [r.device_id for r in results] == [f"d{i}" for i in range(10)]
+    assert [i for i, r in enumerate(results) if r.error] == [0, 3, 6, 9]
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from bluebird.util import FrameError, MessageType, encode_frame, read_frame
+from bluebird.util.framing import MAX_FRAME_SIZE
+
+
+def _read(data, max_size=MAX_FRAME_SIZE, frames=1):
+    async def main():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        result = []
+        for _ in range(frames):
+            message_type, body = await read_frame(reader, max_size)
+            result.append((message_type, bytes(body)))
+        return result
+    return asyncio.run(main())
+
+
+def test_frames_round_trip():
+    data = encode_frame(MessageType.READ_PUBLIC_KEY) + encode_frame(MessageType.STATUS, b"\x02")
+    assert data[:3] == b"\x00\x01\x01"
+    assert _read(data, frames=2) == [(MessageType.READ_PUBLIC_KEY, b""), (MessageType.STATUS, b"\x02")]
+
+
+def test_largest_body_round_trips():
+    body = bytes(MAX_FRAME_SIZE - 1)
+    assert _read(encode_frame(MessageType.WRITE_PAYLOAD, body)) == [(MessageType.WRITE_PAYLOAD, body)]
+
+
+def test_oversized_frame_is_refused_on_both_sides():
+    with pytest.raises(FrameError):
+        encode_frame(MessageType.WRITE_PAYLOAD, bytes(MAX_FRAME_SIZE))
+    with pytest.raises(FrameError):
+        _read(encode_frame(MessageType.WRITE_PAYLOAD, bytes(64)), max_size=64)
+    with pytest.raises(FrameError):
+        _read(b"\x00\x00")
+
+
+def test_unknown_type_is_refused():
+    with pytest.raises(FrameError, match="0x7e"):
+        _read(b"\x00\x02\x7e\x00")
+
+
+@pytest.mark.parametrize("data, partial", [
+    (b"", b""),
+    (b"\x00", b"\x00"),
+    (b"\x00\x03\x82", b"\x82"),
+])
+def test_stream_ending_before_or_inside_a_frame(data, partial):
+    with pytest.raises(asyncio.IncompleteReadError) as error:
+        _read(data)
+    assert error.value.partial == partial
@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+from bluebird.server import ServerExchangeHandler
+from bluebird.server.keypool import KeyPairPool
+from bluebird.util import CurveType
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.005)
+
+
+def test_fill_tops_up_and_get_counts_hits():
+    pool = KeyPairPool({CurveType.CURVE25519: 2})
+    pool.fill()
+    assert pool.stats()["curve25519"] == {"hits": 0, "misses": 0, "available": 2, "depth": 2}
+
+    private_key, public_key = pool.get(CurveType.CURVE25519)
+    assert private_key.public_key().public_bytes_raw() == public_key
+    assert pool.stats()["curve25519"]["hits"] == 1
+    assert pool.stats()["curve25519"]["available"] == 1
+
+
+def test_empty_pool_generates_inline_and_counts_a_miss():
+    pool = KeyPairPool({CurveType.CURVE448: 1})
+    private_key, public_key = pool.get(CurveType.CURVE448)
+    assert len(public_key) == 56
+    assert private_key.public_key().public_bytes_raw() == public_key
+    assert pool.stats()["curve448"] == {"hits": 0, "misses": 1, "available": 0, "depth": 1}
+
+
+def test_background_thread_refills_what_was_taken():
+    pool = KeyPairPool({CurveType.CURVE25519: 3, CurveType.CURVE448: 1})
+    pool.start()
+    try:
+        _wait_for(lambda: all(s["available"] == s["depth"] for s in pool.stats().values()))
+        taken = {pool.get(CurveType.CURVE25519)[1] for _ in range(3)}
+        assert len(taken) == 3
+        _wait_for(lambda: pool.stats()["curve25519"]["available"] == 3)
+        assert taken.isdisjoint(pool.get(CurveType.CURVE25519)[1] for _ in range(3))
+    finally:
+        pool.stop(timeout=5)
+    assert pool.stats()["curve25519"]["hits"] == 6
+
+
+def test_stop_keeps_pooled_key_pairs():
+    pool = KeyPairPool({CurveType.CURVE25519: 2})
+    pool.start()
+    _wait_for(lambda: pool.stats()["curve25519"]["available"] == 2)
+    pool.stop(timeout=5)
+    pool.get(CurveType.CURVE25519)
+    time.sleep(0.05)
+    assert pool.stats()["curve25519"]["available"] == 1
+
+
+def test_handler_rotates_from_the_pool():
+    pool = KeyPairPool({CurveType.CURVE25519: 1})
+    pool.fill()
+    server = ServerExchangeHandler(CurveType.CURVE25519, key_pool=pool)
+    server.generate_key_pair()
+    server.generate_key_pair()
+    assert pool.stats()["curve25519"]["hits"] == 1
+    assert pool.stats()["curve25519"]["misses"] == 1
+
+
+def test_unpooled_curve_and_bad_depth_are_rejected():
+    with pytest.raises(ValueError):
+        KeyPairPool({CurveType.CURVE25519: -1})
+    with pytest.raises(ValueError):
+        KeyPairPool({CurveType.CURVE25519: 1}).get(CurveType.CURVE448)
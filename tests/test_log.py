@@ -0,0 +1,70 @@
+import io
+import logging
+import threading
+
+import pytest
+
+from bluebird import log
+from bluebird.log import LOGGER_NAME, Secret, configure_logging, shutdown_logging
+
+PASSWORD = "hunter222"
+
+
+@pytest.fixture
+def library_logger(monkeypatch):
+    monkeypatch.setattr(log, "_redact", log._redact)
+    logger = logging.getLogger(LOGGER_NAME)
+    level, propagate = logger.level, logger.propagate
+    yield logger
+    shutdown_logging()
+    logger.setLevel(level)
+    logger.propagate = propagate
+
+
+class _ThreadRecorder(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+
+    def emit(self, record):
+        self.threads.append(threading.current_thread())
+
+
+def test_secret_is_redacted_in_captured_records(caplog):
+    with caplog.at_level(logging.INFO, logger=LOGGER_NAME):
+        logging.getLogger(LOGGER_NAME + ".server").info("Password updated to: %s", Secret(PASSWORD))
+    assert "Password updated to: <redacted>" in caplog.text
+    assert PASSWORD not in caplog.text
+    assert repr(Secret(PASSWORD)) == "<redacted>"
+
+
+def test_listener_writes_redacted_records(library_logger):
+    stream = io.StringIO()
+    recorder = _ThreadRecorder()
+    configure_logging(level="DEBUG", handlers=[logging.StreamHandler(stream), recorder], fmt="%(levelname)s %(message)s")
+    library_logger.getChild("ble").info("Joining %s with password %s", "home", Secret(PASSWORD))
+    library_logger.getChild("ble").debug("Password is %r", Secret(PASSWORD))
+    shutdown_logging()
+
+    assert stream.getvalue().splitlines() == [
+        "INFO Joining home with password <redacted>",
+        "DEBUG Password is <redacted>",
+    ]
+    assert recorder.threads and all(t is not threading.current_thread() for t in recorder.threads)
+
+
+def test_redaction_can_be_turned_off(library_logger):
+    stream = io.StringIO()
+    configure_logging(handlers=[logging.StreamHandler(stream)], fmt="%(message)s", redact=False)
+    library_logger.info("Password is %s", Secret(PASSWORD))
+    shutdown_logging()
+    assert stream.getvalue() == f"Password is {PASSWORD}\n"
+
+
+def test_level_filters_before_queueing(library_logger):
+    stream = io.StringIO()
+    configure_logging(level="WARNING", handlers=[logging.StreamHandler(stream)], fmt="%(message)s")
+    library_logger.info("dropped %s", Secret(PASSWORD))
+    library_logger.warning("kept")
+    shutdown_logging()
+    assert stream.getvalue() == "kept\n"
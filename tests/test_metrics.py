@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from bluebird import metrics
+from bluebird.metrics import BUCKET_BOUNDS_US, Histogram, _percentile
+
+OVERFLOW = len(BUCKET_BOUNDS_US)
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    enabled = metrics.is_enabled()
+    metrics.reset()
+    yield
+    metrics.reset()
+    metrics.enable(enabled)
+
+
+@pytest.mark.parametrize("seconds, index", [
+    (0.0, 0),
+    (10e-6, 0),
+    (11e-6, 1),
+    (0.001, BUCKET_BOUNDS_US.index(1000)),
+    (0.0011, BUCKET_BOUNDS_US.index(2000)),
+    (10.0, OVERFLOW - 1),
+    (11.0, OVERFLOW),
+])
+def test_sample_lands_in_the_first_bucket_that_holds_it(seconds, index):
+    histogram = Histogram()
+    histogram.observe(seconds)
+    assert histogram.buckets.index(1) == index
+    assert histogram.count == 1
+
+
+def test_percentile_is_the_upper_bound_of_the_ranked_bucket():
+    buckets = [0] * (OVERFLOW + 1)
+    buckets[0], buckets[3] = 98, 2
+    assert _percentile(buckets, 100, 150.0, 50) == BUCKET_BOUNDS_US[0]
+    assert _percentile(buckets, 100, 150.0, 98) == BUCKET_BOUNDS_US[0]
+    assert _percentile(buckets, 100, 150.0, 99) == BUCKET_BOUNDS_US[3]
+    assert _percentile(buckets, 0, 0.0, 99) == 0.0
+
+
+def test_overflow_bucket_reports_the_maximum():
+    histogram = Histogram()
+    histogram.observe(0.00001)
+    histogram.observe(42.0)
+    assert histogram.max == pytest.approx(42e6)
+    assert histogram.percentile(99) == pytest.approx(42e6)
+    assert histogram.percentile(50) == BUCKET_BOUNDS_US[0]
+
+
+def test_snapshot_without_buckets_stays_json_and_small():
+    metrics.enable()
+    metrics.observe("ecdh", 0.0001)
+    metrics.count("admitted", 2)
+
+    full = metrics.snapshot()
+    assert full["bucket_bounds_us"] == list(BUCKET_BOUNDS_US)
+    assert sum(full["histograms"]["ecdh"]["buckets"]) == 1
+
+    small = metrics.snapshot(buckets=False)
+    assert "bucket_bounds_us" not in small
+    assert small["counters"] == {"admitted": 2}
+    assert small["histograms"]["ecdh"]["count"] == 1
+    assert "buckets" not in small["histograms"]["ecdh"]
+    json.dumps(small)
+
+
+def test_snapshot_filters_by_name():
+    metrics.enable()
+    metrics.observe("ecdh", 0.0001)
+    metrics.observe("hkdf", 0.0001)
+    assert list(metrics.snapshot(["hkdf"])["histograms"]) == ["hkdf"]
+
+
+def test_timer_records_only_while_enabled():
+    metrics.disable()
+    assert metrics.timer("ecdh") is metrics._NULL_TIMER
+    with metrics.timer("ecdh"):
+        pass
+    metrics.observe("ecdh", 0.001)
+    metrics.count("admitted")
+    assert metrics.snapshot() == {
+        "enabled": False, "counters": {}, "histograms": {}, "bucket_bounds_us": list(BUCKET_BOUNDS_US),
+    }
+
+    metrics.enable()
+    with metrics.timer("ecdh"):
+        pass
+    assert metrics.snapshot()["histograms"]["ecdh"]["count"] == 1
@@ -0,0 +1,86 @@
+import threading
+
+from bluebird.ble.offload import MainLoopOffload
+
+
+class _MainLoop:
+    """
+    Stands in for GLib.idle_add: callbacks are queued and run by run_pending() on the test thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    def idle_add(self, callback, *args):
+        with self._lock:
+            self._callbacks.append((callback, args))
+
+    def run_pending(self):
+        with self._lock:
+            callbacks, self._callbacks = self._callbacks, []
+        for callback, args in callbacks:
+            callback(*args)
+        return len(callbacks)
+
+
+def _offload(loop, **kwargs):
+    return MainLoopOffload(idle_add=loop.idle_add, **kwargs)
+
+
+def test_results_and_errors_are_delivered_on_the_main_loop():
+    loop = _MainLoop()
+    offload = _offload(loop)
+    results, errors, threads = [], [], []
+
+    def work():
+        threads.append(threading.current_thread())
+        return 42
+
+    def broken():
+        raise RuntimeError("no key")
+
+    assert offload.submit(work, results.append, errors.append)
+    assert offload.submit(broken, results.append, errors.append)
+    offload.shutdown(wait=True)
+    assert results == [] and errors == []
+
+    assert loop.run_pending() == 2
+    assert results == [42]
+    assert [str(e) for e in errors] == ["no key"]
+    assert threads[0] is not threading.current_thread()
+    stats = offload.stats()
+    assert (stats["pending"], stats["completed"], stats["failed"]) == (0, 1, 1)
+
+
+def test_submit_refuses_work_when_saturated():
+    loop = _MainLoop()
+    offload = _offload(loop, max_workers=1, max_pending=2)
+    release = threading.Event()
+    results = []
+
+    assert offload.submit(release.wait, results.append, results.append)
+    assert offload.submit(lambda: "queued", results.append, results.append)
+    assert offload.saturated
+    assert not offload.submit(lambda: "refused", results.append, results.append)
+
+    release.set()
+    offload.shutdown(wait=True)
+    loop.run_pending()
+    assert results == [True, "queued"]
+    assert offload.stats()["rejected"] == 1
+    # Slots are only freed on delivery, so work is accepted again afterwards.
+    assert not offload.saturated
+
+
+def test_callback_errors_do_not_escape_the_main_loop():
+    loop = _MainLoop()
+    offload = _offload(loop)
+
+    def callback(value):
+        raise ValueError(value)
+
+    offload.submit(lambda: "boom", callback, callback)
+    offload.shutdown(wait=True)
+    loop.run_pending()
+    assert offload.stats()["completed"] == 1
@@ -0,0 +1,67 @@
+import pytest
+
+from bluebird.ble.reassembly import InvalidOffsetError, ValueTooLongError, WriteReassembler
+
+DEVICE = "/org/bluez/hci0/dev_00_00_00_00_00_01"
+MTU = 23  # 18 byte prepared-write chunks
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_short_chunk_completes_the_value():
+    reassembler = WriteReassembler()
+    value = bytes(range(40))
+    assert reassembler.write(DEVICE, value[:18], 0, MTU) is None
+    assert reassembler.write(DEVICE, value[18:36], 18, MTU) is None
+    assert bytes(reassembler.write(DEVICE, value[36:], 36, MTU)) == value
+    assert not reassembler.pending(DEVICE)
+
+
+def test_offset_zero_restarts_the_value():
+    reassembler = WriteReassembler()
+    assert reassembler.write(DEVICE, b"a" * 18, 0, MTU) is None
+    assert reassembler.write(DEVICE, b"b" * 18, 0, MTU) is None
+    assert bytes(reassembler.write(DEVICE, b"c", 18, MTU)) == b"b" * 18 + b"c"
+
+
+def test_exact_multiple_is_completed_by_the_settle_flush():
+    reassembler = WriteReassembler()
+    assert reassembler.write(DEVICE, b"x" * 18, 0, MTU) is None
+    assert reassembler.write(DEVICE, b"y" * 18, 18, MTU) is None
+    assert bytes(reassembler.flush(DEVICE)) == b"x" * 18 + b"y" * 18
+    assert reassembler.flush(DEVICE) is None
+
+
+def test_gap_and_overlong_values_are_rejected():
+    reassembler = WriteReassembler(max_size=32)
+    with pytest.raises(InvalidOffsetError):
+        reassembler.write(DEVICE, b"a", 18, MTU)
+    reassembler.write(DEVICE, b"a" * 18, 0, MTU)
+    with pytest.raises(ValueTooLongError):
+        reassembler.write(DEVICE, b"a" * 18, 18, MTU)
+    assert not reassembler.pending(DEVICE)
+
+
+def test_partial_values_expire():
+    clock = _Clock()
+    reassembler = WriteReassembler(timeout=5.0, clock=clock)
+    reassembler.write(DEVICE, b"a" * 18, 0, MTU)
+    clock.now = 4.0
+    assert reassembler.expire() == 0
+    clock.now = 9.0
+    assert reassembler.expire() == 1
+    with pytest.raises(InvalidOffsetError):
+        reassembler.write(DEVICE, b"b", 18, MTU)
+
+
+def test_oldest_device_is_dropped_when_full():
+    reassembler = WriteReassembler(max_pending=2)
+    for index in range(3):
+        reassembler.write(f"dev_{index}", b"a" * 18, 0, MTU)
+    assert [reassembler.pending(f"dev_{index}") for index in range(3)] == [False, True, True]
@@ -0,0 +1,76 @@
+import threading
+
+import pytest
+
+from bluebird.server.replay import ReplayGuard, ReplayedPayloadError
+
+KEY = bytes(32)
+NONCE = bytes(12)
+
+
+def test_reservation_is_recorded_only_on_success():
+    guard = ReplayGuard()
+    with pytest.raises(RuntimeError):
+        with guard.reserve(KEY, NONCE):
+            raise RuntimeError("decryption failed")
+    assert len(guard) == 0
+
+    with guard.reserve(KEY, NONCE):
+        pass
+    assert len(guard) == 1
+    with pytest.raises(ReplayedPayloadError):
+        guard.reserve(KEY, NONCE)
+
+
+def test_pair_in_flight_is_rejected():
+    guard = ReplayGuard()
+    reservation = guard.reserve(KEY, NONCE)
+    with pytest.raises(ReplayedPayloadError):
+        guard.reserve(KEY, NONCE)
+    with pytest.raises(ReplayedPayloadError):
+        guard.check(KEY, NONCE)
+    reservation.release()
+    guard.reserve(KEY, NONCE).commit()
+    assert guard.stats() == {"size": 1, "capacity": 4096, "pending": 0, "rejected": 2}
+
+
+def test_concurrent_copies_are_accepted_once():
+    guard = ReplayGuard()
+    barrier = threading.Barrier(8)
+    accepted = []
+
+    def worker():
+        barrier.wait()
+        try:
+            with guard.reserve(KEY, NONCE):
+                accepted.append(True)
+        except ReplayedPayloadError:
+            pass
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert accepted == [True]
+
+
+def test_oldest_pair_is_evicted_when_full():
+    guard = ReplayGuard(capacity=2)
+    nonces = [bytes([index]) * 12 for index in range(3)]
+    for nonce in nonces:
+        guard.record(KEY, nonce)
+    assert len(guard) == 2
+    guard.check(KEY, nonces[0])
+    for nonce in nonces[1:]:
+        with pytest.raises(ReplayedPayloadError):
+            guard.check(KEY, nonce)
+
+
+def test_recording_twice_takes_one_slot():
+    guard = ReplayGuard(capacity=2)
+    guard.record(KEY, NONCE)
+    guard.record(KEY, NONCE)
+    guard.record(KEY, bytes([1]) * 12)
+    with pytest.raises(ReplayedPayloadError):
+        guard.check(KEY, NONCE)
@@ -0,0 +1,86 @@
+import pytest
+
+pytest.importorskip("cryptography")
+
+from bluebird import ClientExchangeHandler, CurveType  # noqa: E402
+from bluebird.server import ServerExchangeHandler, ReplayGuard, TicketIssuer, InvalidTicketError  # noqa: E402
+from bluebird.util.resumption import TICKET_SIZE  # noqa: E402
+
+KEY = bytes(range(32))
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ticket_seals_the_key_until_its_uses_run_out():
+    issuer = TicketIssuer(max_uses=2)
+    ticket = issuer.issue(KEY)
+    assert len(ticket) == TICKET_SIZE
+    assert issuer.redeem(ticket) == KEY
+    assert issuer.redeem(ticket) == KEY
+    with pytest.raises(InvalidTicketError):
+        issuer.redeem(ticket)
+    assert issuer.stats() == {"outstanding": 0, "issued": 1, "resumed": 2, "rejected": 1}
+
+
+def test_expired_forged_and_revoked_tickets_are_rejected():
+    clock = _Clock()
+    issuer = TicketIssuer(lifetime=10.0, clock=clock)
+    ticket = issuer.issue(KEY)
+    forged = bytearray(ticket)
+    forged[-1] ^= 1
+    with pytest.raises(InvalidTicketError):
+        issuer.redeem(bytes(forged))
+    with pytest.raises(InvalidTicketError):
+        issuer.redeem(ticket[:-1])
+    clock.now = 10.0
+    with pytest.raises(InvalidTicketError):
+        issuer.redeem(ticket)
+
+    ticket = issuer.issue(KEY)
+    issuer.revoke_all()
+    with pytest.raises(InvalidTicketError):
+        issuer.redeem(ticket)
+
+
+def test_oldest_ticket_is_dropped_when_full():
+    issuer = TicketIssuer(capacity=2)
+    tickets = [issuer.issue(KEY) for _ in range(3)]
+    with pytest.raises(InvalidTicketError):
+        issuer.redeem(tickets[0])
+    assert [issuer.redeem(ticket) for ticket in tickets[1:]] == [KEY, KEY]
+
+
+def _resumable(max_uses=4):
+    server = ServerExchangeHandler(
+        CurveType.CURVE25519, replay_guard=ReplayGuard(), ticket_issuer=TicketIssuer(max_uses=max_uses),
+    )
+    server.generate_key_pair()
+    client = ClientExchangeHandler(CurveType.CURVE25519)
+    _, ticket = server.decrypt_payload_with_ticket(client.create_encrypted_payload("first", server.public_key))
+    return server, client, ticket
+
+
+def test_forged_payload_does_not_spend_the_ticket():
+    server, client, ticket = _resumable(max_uses=1)
+    forged = bytearray(client.create_resumed_payload("forged", ticket))
+    forged[-1] ^= 1
+    with pytest.raises(ValueError):
+        server.decrypt_resumed_payload(bytes(forged))
+    assert server.ticket_issuer.stats()["outstanding"] == 1
+
+    assert server.decrypt_resumed_payload(client.create_resumed_payload("second", ticket)) == b"second"
+    with pytest.raises(InvalidTicketError):
+        server.decrypt_resumed_payload(client.create_resumed_payload("third", ticket))
+
+
+def test_key_rotation_revokes_tickets():
+    server, client, ticket = _resumable()
+    server.generate_key_pair()
+    with pytest.raises(InvalidTicketError):
+        server.decrypt_resumed_payload(client.create_resumed_payload("second", ticket))
@@ -0,0 +1,37 @@
+from bluebird.ble.reassembly import ATT_MAX_VALUE_SIZE
+from bluebird.network.scan import AccessPoint, WifiScanCache, ScanSource, decode_access_points, encode_access_points
+
+
+class _ListSource(ScanSource):
+    def __init__(self, access_points):
+        self.access_points = access_points
+
+    def scan(self):
+        return list(self.access_points)
+
+
+def test_round_trip_keeps_order():
+    access_points = [AccessPoint("cafe", 40, secured=False), AccessPoint("home", 80)]
+    assert decode_access_points(encode_access_points(access_points)) == access_points
+
+
+def test_large_scan_fits_one_attribute_value():
+    # 200 networks with 32 byte names would take over 7 KB.
+    access_points = [AccessPoint(f"{index:03d}".ljust(32, "x"), index % 101) for index in range(200)]
+    blob = encode_access_points(access_points)
+    assert len(blob) <= ATT_MAX_VALUE_SIZE
+
+    kept = decode_access_points(blob)
+    assert len(kept) == blob[1] == (ATT_MAX_VALUE_SIZE - 2) // 35
+    dropped = set(access_points) - set(kept)
+    assert min(ap.signal for ap in kept) >= max(ap.signal for ap in dropped)
+    assert kept == [ap for ap in access_points if ap in kept]
+
+
+def test_cache_serves_the_capped_blob():
+    access_points = [AccessPoint(f"network-{index}".ljust(32, "-"), index % 100) for index in range(100)]
+    cache = WifiScanCache(_ListSource(access_points))
+    cache.refresh()
+    decoded = decode_access_points(cache.blob)
+    assert len(cache.blob) <= ATT_MAX_VALUE_SIZE
+    assert decoded == cache.access_points[:len(decoded)]
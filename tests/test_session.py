@@ -0,0 +1,96 @@
+import pytest
+
+from bluebird.ble.session import SessionState, SessionTable
+
+DEVICE = "/org/bluez/hci0/dev_00_00_00_00_00_01"
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_session_being_commissioned_outlives_its_deadline():
+    clock = _Clock()
+    table = SessionTable(timeout=60.0, clock=clock)
+    session = table.get_or_create(DEVICE)
+    session.set_parameters({"ssid": "home", "password": "hunter222"})
+    session.transition(SessionState.COMMISSIONING)
+
+    clock.now = 120.0
+    assert table.expire() == []
+    assert table.get_or_create(DEVICE) is session
+    with pytest.raises(ValueError):
+        session.set_parameter("ssid", "other")
+
+    session.transition(SessionState.DONE)
+    assert table.expire() == [session]
+    assert table.get(DEVICE) is None
+
+
+def test_parameters_move_partial_then_ready():
+    table = SessionTable()
+    session = table.get_or_create(DEVICE)
+    assert session.state is SessionState.OPEN
+    assert session.set_parameter("ssid", "home") is SessionState.PARTIAL
+    assert session.set_parameter("password", "hunter222") is SessionState.READY
+    # A central may still correct a field before commissioning starts.
+    assert session.set_parameter("ssid", "other") is SessionState.READY
+
+
+@pytest.mark.parametrize("state", [SessionState.DONE, SessionState.OPEN, SessionState.COMMISSIONING])
+def test_illegal_transitions_from_open_are_rejected(state):
+    session = SessionTable().get_or_create(DEVICE)
+    with pytest.raises(ValueError):
+        session.transition(state)
+    assert session.state is SessionState.OPEN
+
+
+def test_finished_sessions_accept_nothing():
+    session = SessionTable().get_or_create(DEVICE)
+    session.transition(SessionState.FAILED)
+    assert session.finished
+    with pytest.raises(ValueError):
+        session.transition(SessionState.READY)
+    with pytest.raises(ValueError):
+        session.set_parameter("ssid", "home")
+
+
+def test_writes_extend_the_deadline():
+    clock = _Clock()
+    table = SessionTable(timeout=60.0, clock=clock)
+    session = table.get_or_create(DEVICE)
+    clock.now = 50.0
+    assert table.get_or_create(DEVICE) is session
+    assert session.deadline == 110.0
+    clock.now = 100.0
+    assert table.expire() == []
+    clock.now = 110.0
+    assert table.expire() == [session]
+
+
+def test_finished_session_is_replaced_by_a_new_one():
+    table = SessionTable()
+    session = table.get_or_create(DEVICE)
+    session.transition(SessionState.FAILED)
+    assert table.get_or_create(DEVICE) is not session
+
+
+def test_full_table_reclaims_stale_sessions_before_refusing():
+    clock = _Clock()
+    table = SessionTable(timeout=10.0, max_sessions=2, clock=clock)
+    first = table.get_or_create("dev_1")
+    table.get_or_create("dev_2")
+    with pytest.raises(OverflowError):
+        table.get_or_create("dev_3")
+
+    first.transition(SessionState.FAILED)
+    table.get_or_create("dev_3")
+    assert sorted(s.device for s in table) == ["dev_2", "dev_3"]
+
+    clock.now = 20.0
+    table.get_or_create("dev_4")
+    assert [s.device for s in table] == ["dev_4"]
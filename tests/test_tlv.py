@@ -0,0 +1,60 @@
+import pytest
+
+from bluebird.util import CommissioningFields, is_tlv
+from bluebird.util.tlv import TLV_MAGIC, TLV_VERSION, FieldType
+
+
+def test_round_trip_with_every_field():
+    fields = CommissioningFields("café", "hunter222", hidden=True, static_ip="192.168.1.20/24", country="us")
+    encoded = fields.encode()
+    assert is_tlv(encoded)
+    assert CommissioningFields.decode(encoded) == fields._replace(country="US")
+
+
+def test_ipv6_address_round_trips():
+    fields = CommissioningFields("home", "hunter222", static_ip="2001:db8::20/64")
+    assert CommissioningFields.decode(fields.encode()).static_ip == "2001:db8::20/64"
+
+
+def test_unset_fields_are_omitted_and_unknown_fields_skipped():
+    encoded = CommissioningFields("home", "hunter222").encode()
+    assert encoded == bytes((TLV_MAGIC, TLV_VERSION, FieldType.SSID, 4)) + b"home" \
+        + bytes((FieldType.PASSWORD, 9)) + b"hunter222"
+    assert CommissioningFields.decode(encoded + b"\x7f\x02zz") == CommissioningFields("home", "hunter222")
+
+
+def test_bare_password_is_not_tlv():
+    assert not is_tlv("hunter222".encode())
+
+
+@pytest.mark.parametrize("data", [
+    bytes((TLV_MAGIC, TLV_VERSION, FieldType.SSID)),
+    bytes((TLV_MAGIC, TLV_VERSION, FieldType.SSID, 8)) + b"home",
+    bytes((TLV_MAGIC, TLV_VERSION, FieldType.SSID, 4)) + b"home",
+    b"hunter222",
+])
+def test_malformed_payloads_are_rejected(data):
+    with pytest.raises(ValueError):
+        CommissioningFields.decode(data)
+
+
+@pytest.mark.parametrize("fields", [
+    CommissioningFields("x" * 33, "hunter222"),
+    CommissioningFields("home", "hunter222", country="USA"),
+    CommissioningFields("home", "p" * 256),
+])
+def test_fields_that_do_not_fit_are_rejected(fields):
+    with pytest.raises(ValueError):
+        fields.encode()
+
+
+@pytest.mark.parametrize("country", [b"U", b"USA", b"U1", b"U\n", "\u00fc\u00fc".encode("utf-8")[:2]])
+def test_decoded_country_must_be_two_ascii_letters(country):
+    data = CommissioningFields("home", "hunter222").encode() + bytes((FieldType.COUNTRY, len(country))) + country
+    with pytest.raises(ValueError):
+        CommissioningFields.decode(data)
+
+
+def test_decoded_country_is_upper_cased():
+    data = CommissioningFields("home", "hunter222").encode() + bytes((FieldType.COUNTRY, 2)) + b"de"
+    assert CommissioningFields.decode(data).country == "DE"
@@ -0,0 +1,58 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("cryptography")
+
+from bluebird import CurveType  # noqa: E402
+from bluebird.ble.session import CommissioningStatus  # noqa: E402
+from bluebird.client.transport import CommissioningClient, RequestRefusedError  # noqa: E402
+from bluebird.server import CommissioningServer, ReplayGuard, ServerExchangeHandler  # noqa: E402
+from bluebird.util import CommissioningFields  # noqa: E402
+
+FIELDS = CommissioningFields("home", "hunter222")
+
+
+def _serve(tmp_path, client_main, **kwargs):
+    async def main():
+        path = str(tmp_path / "bluebird.sock")
+        server = CommissioningServer(ServerExchangeHandler(CurveType.CURVE25519, replay_guard=ReplayGuard()), **kwargs)
+        async with await server.start_unix(path):
+            async with await CommissioningClient.open_unix(path) as client:
+                return server, await client_main(client)
+    return asyncio.run(main())
+
+
+def test_blocking_apply_runs_off_the_loop(tmp_path):
+    threads = []
+
+    def apply(session):
+        threads.append(threading.current_thread())
+        return session.params["ssid"] == "home"
+
+    _, status = _serve(tmp_path, lambda client: client.commission(FIELDS, CurveType.CURVE25519), apply=apply)
+    assert status is CommissioningStatus.JOINED
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_undecryptable_payloads_rotate_the_key_once_per_interval(tmp_path):
+    now = [0.0]
+
+    async def client_main(client):
+        keys = [await client.read_public_key()]
+        for _ in range(3):
+            with pytest.raises(RequestRefusedError):
+                await client.write_payload(os.urandom(32) + os.urandom(12) + os.urandom(32))
+            keys.append(await client.read_public_key())
+        now[0] += 10.0
+        with pytest.raises(RequestRefusedError):
+            await client.write_payload(os.urandom(32) + os.urandom(12) + os.urandom(32))
+        keys.append(await client.read_public_key())
+        return keys
+
+    server, keys = _serve(tmp_path, client_main, rotation_interval=10.0, clock=lambda: now[0])
+    assert len(set(keys)) == 3
+    assert keys[1] == keys[2] == keys[3]
+    assert server.stats()["rotations"] == 2
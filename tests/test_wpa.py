@@ -0,0 +1,81 @@
+import asyncio
+import hashlib
+
+import pytest
+
+from bluebird.network.apply import NetworkApplier
+from bluebird.network.fake import FakeWpaSupplicant
+from bluebird.network.wpa import WpaSupplicantBackend
+from bluebird.util import CommissioningFields
+
+NETWORKS = {"home": "hunter222", "old": "oldpassword"}
+
+
+async def _attempts(path, supplicant, *fields_list, timeout=2.0):
+    applier = NetworkApplier(WpaSupplicantBackend(path, poll_interval=0.005, save_config=False), timeout=timeout)
+    try:
+        return [await applier.apply(fields) for fields in fields_list]
+    finally:
+        await applier.aclose()
+
+
+def _run(tmp_path, latency, *fields_list, setup=None, timeout=2.0):
+    async def main():
+        path = str(tmp_path / "wlan0")
+        supplicant = await FakeWpaSupplicant(latency, NETWORKS).start(path)
+        try:
+            if setup is not None:
+                setup(supplicant)
+            return supplicant, await _attempts(path, supplicant, *fields_list, timeout=timeout)
+        finally:
+            supplicant.close()
+    return asyncio.run(main())
+
+
+def test_join_is_verified_and_country_applied(tmp_path):
+    supplicant, [result] = _run(tmp_path, 0.01, CommissioningFields("home", "hunter222", hidden=True, country="de"))
+    assert result.joined and result.address is not None
+    assert supplicant.country == "DE"
+    assert supplicant.blocks[0]["scan_ssid"] == "1"
+
+
+def test_rejected_credentials_remove_the_network(tmp_path):
+    supplicant, [result] = _run(tmp_path, 0.01, CommissioningFields("home", "wrongpassword"))
+    assert not result.joined and "rejected" in result.error
+    assert supplicant.blocks == {}
+
+
+def test_failed_join_re_enables_previous_networks(tmp_path):
+    def setup(supplicant):
+        for ssid in ("old", "parked"):
+            network_id = supplicant.handle("ADD_NETWORK")
+            supplicant.handle(f"SET_NETWORK {network_id} ssid {ssid.encode().hex()}")
+        supplicant.disabled.add(1)  # disabled by the user before commissioning
+
+    supplicant, results = _run(
+        tmp_path, 0.01, CommissioningFields("home", "wrongpassword"), CommissioningFields("home", "hunter222"),
+        setup=setup,
+    )
+    assert [r.joined for r in results] == [False, True]
+    assert supplicant.disabled == {1}
+    assert sorted(supplicant.blocks) == [0, 1, 3]
+
+
+def test_timeout_removes_the_network(tmp_path):
+    supplicant, [result] = _run(tmp_path, 5.0, CommissioningFields("home", "hunter222"), timeout=0.1)
+    assert not result.joined and "within" in result.error
+    assert supplicant.blocks == {}
+
+
+def test_raw_psk_is_sent_unquoted(tmp_path):
+    raw = hashlib.pbkdf2_hmac("sha1", b"hunter222", b"home", 4096, 32).hex()
+    supplicant, [result] = _run(tmp_path, 0.01, CommissioningFields("home", raw))
+    assert result.joined
+    assert supplicant.blocks[0]["psk"] == raw
+
+
+@pytest.mark.parametrize("password", ["short", "p" * 64, "g" * 64, "p" * 65])
+def test_password_of_invalid_length_is_rejected_up_front(tmp_path, password):
+    supplicant, [result] = _run(tmp_path, 0.01, CommissioningFields("home", password, country="de"))
+    assert not result.joined and "passphrase" in result.error
+    assert supplicant.blocks == {} and supplicant.country is None